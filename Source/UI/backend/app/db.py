@@ -2,11 +2,15 @@
 Database connection and query utilities
 """
 import os
+import threading
+import time
+from contextlib import closing
 import psycopg2
+import psycopg2.extras
 import pandas as pd
-from typing import Optional, Any, Dict, List
+from typing import Callable, Optional, Any, Dict, List, Tuple
 import logging
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 
 from .schemas import (
@@ -30,9 +34,19 @@ from .db_models import (
     ResourceTypeDAO,
     RawDataDAO,
 )
+from .json_compat import loads
 
 logger = logging.getLogger(__name__)
 
+
+def _register_json_decoders() -> None:
+    """Decode json/jsonb results (zone geometries, json_agg rows) with the shared loads()."""
+    psycopg2.extras.register_default_json(globally=True, loads=loads)
+    psycopg2.extras.register_default_jsonb(globally=True, loads=loads)
+
+
+_register_json_decoders()
+
 # Database configuration from environment variables
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -42,6 +56,74 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'flood_password')
 }
 
+# Connection pool sizing for the SQLAlchemy engine. Endpoints run their
+# (blocking) queries through asyncio.to_thread, whose default executor has
+# min(32, CPUs + 4) workers, so the steady pool matches that concurrency and
+# bursts beyond it don't queue on checkout.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', str(min(32, (os.cpu_count() or 1) + 4))))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+# Per-query cap for the interactive readers (fetch_records); writes and the
+# bulk raw_data loads run without one. 0 disables it.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000'))
+# Reads that aggregate a whole table into one payload (the /zones-geo
+# FeatureCollection over every ZIP polygon) get a longer cap of their own.
+DB_BULK_READ_TIMEOUT_MS = int(os.getenv('DB_BULK_READ_TIMEOUT_MS', '60000'))
+
+# raw_data changes at most daily, so the frames read from it are cached for
+# RAW_DATA_CACHE_TTL seconds and keyed on get_raw_data_version(), so new or
+# rewritten rows invalidate them immediately, even when another process
+# (scripts/load_raw_dataset.py) wrote them.
+RAW_DATA_CACHE_TTL = float(os.getenv('RAW_DATA_CACHE_TTL', '900'))
+_RAW_DATA_CACHE: Dict[str, Tuple[float, Tuple[Any, ...], pd.DataFrame]] = {}
+_RAW_DATA_CACHE_LOCK = threading.Lock()
+
+# Zone and resource-type metadata is read on every dispatch but only changes
+# through the bulk-update endpoints, which clear this cache after writing.
+METADATA_CACHE_TTL = float(os.getenv('METADATA_CACHE_TTL', '60'))
+_METADATA_CACHE: Dict[Any, Tuple[float, List[Dict[str, Any]]]] = {}
+_METADATA_CACHE_LOCK = threading.Lock()
+
+# Hot lookups are prepared once per pooled connection so PostgreSQL skips
+# parse/plan on every call (get_prediction runs once per day and lead time
+# during historical backfills). Each variant has fixed SQL text; optional
+# filters pick a statement rather than being formatted into the query.
+_PREDICTION_COLUMNS = (
+    "date, days_ahead, predicted_level, lower_bound_80, upper_bound_80, "
+    "flood_probability, model_version, model_type, created_at"
+)
+PREPARED_STATEMENTS = {
+    'get_prediction': (
+        "(date, integer) AS "
+        "SELECT predicted_level, lower_bound_80, upper_bound_80, flood_probability, days_ahead, created_at, date "
+        "FROM predictions WHERE date = $1 AND days_ahead = $2 LIMIT 1"
+    ),
+    'get_latest_prediction': (
+        f"AS SELECT {_PREDICTION_COLUMNS} FROM predictions "
+        "ORDER BY created_at DESC LIMIT 1"
+    ),
+    'get_latest_prediction_by_lead': (
+        f"(integer) AS SELECT {_PREDICTION_COLUMNS} FROM predictions "
+        "WHERE days_ahead = $1 ORDER BY created_at DESC LIMIT 1"
+    ),
+}
+
+
+def _prepare_statements(dbapi_connection, connection_record) -> None:
+    """PREPARE the hot lookups on a freshly opened pooled connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, body in PREPARED_STATEMENTS.items():
+            cursor.execute(f"PREPARE {name} {body}")
+        dbapi_connection.commit()
+    except Exception as e:
+        # Leave the connection usable; the EXECUTE callers log their own errors
+        dbapi_connection.rollback()
+        logger.warning(f"Failed to prepare statements: {e}")
+    finally:
+        cursor.close()
+
+
 # Global SQLAlchemy engine variable
 _engine: Optional[Engine] = None
 
@@ -61,27 +143,75 @@ def get_sqlalchemy_engine() -> Engine:
         )
         _engine = create_engine(
             db_url,
-            pool_pre_ping=True,
-            pool_recycle=300,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_pre_ping=True,  # Drop connections the server closed while idle
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_use_lifo=True,  # Reuse warm connections; lets idle extras time out
             echo=False  # Set to True for SQL logging in development
         )
-        logger.info("Created SQLAlchemy engine")
+        event.listen(_engine, "connect", _prepare_statements)
+        logger.info(f"Created SQLAlchemy engine (pool_size={DB_POOL_SIZE}, max_overflow={DB_MAX_OVERFLOW})")
     return _engine
 
 
+def get_pool_status() -> Dict[str, Any]:
+    """Snapshot of the SQLAlchemy connection pool, for spotting checkout pressure."""
+    pool = get_sqlalchemy_engine().pool
+    return {
+        'pool_size': pool.size(),
+        'max_overflow': DB_MAX_OVERFLOW,
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'status': pool.status(),
+    }
+
+
+def fetch_records(query: str, params: Optional[Any] = None,
+                  timeout_ms: int = DB_STATEMENT_TIMEOUT_MS) -> List[Dict[str, Any]]:
+    """
+    Run a SELECT on a pooled DBAPI connection and return the rows as dicts.
+
+    Skips the DataFrame round-trip of pd.read_sql_query for wide rows that
+    are consumed as plain dicts anyway; NULLs come back as None and json/jsonb
+    columns are already decoded by psycopg2.
+
+    The query is cancelled after ``timeout_ms`` milliseconds (0 for no limit).
+    """
+    conn = get_sqlalchemy_engine().raw_connection()
+    try:
+        cursor = conn.cursor()
+        try:
+            if timeout_ms:
+                # Scoped to this transaction, which the pool rolls back on return
+                cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
+            cursor.execute(query, params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    finally:
+        # Returns the connection to the pool
+        conn.close()
+
+
 def get_connection():
     """
-    Create database connection
-    
+    Check out a database connection from the engine's pool
+
+    The connection is already open (with the hot statements prepared), and
+    calling close() on it hands it back to the pool instead of closing the
+    socket, so callers keep their connect/close pattern.
+
     Returns:
-        psycopg2 connection object
-    
+        pooled psycopg2 connection (DBAPI proxy)
+
     Raises:
         Exception: If connection fails
     """
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
+        return get_sqlalchemy_engine().raw_connection()
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
         raise
@@ -102,27 +232,8 @@ def test_connection() -> bool:
         return False
 
 
-def get_last_30_days_raw_data() -> Optional[pd.DataFrame]:
-    """
-    Fetch last 30 days of raw data from database
-
-    Returns:
-        DataFrame with columns matching the schema:
-        - date
-        - daily_precip
-        - daily_temp_avg
-        - daily_snowfall
-        - daily_humidity
-        - daily_wind
-        - soil_deep_30d
-        - target_level_max
-        - hermann_level
-        - grafton_level
-
-        Returns None if query fails
-    """
-
-    query = """
+# Column list shared by the raw_data readers
+_RAW_DATA_SELECT = """
         SELECT
             date,
             daily_precip,
@@ -134,9 +245,20 @@ def get_last_30_days_raw_data() -> Optional[pd.DataFrame]:
             target_level_max,
             hermann_level,
             grafton_level
-        FROM raw_data
-        ORDER BY date DESC
-        LIMIT 30
+        FROM raw_data"""
+
+
+def _fetch_last_30_days_raw_data() -> Optional[pd.DataFrame]:
+    """Query the last 30 days of raw data (uncached)"""
+
+    # Take the newest 30 rows, then let Postgres hand them back oldest first
+    query = f"""
+        SELECT * FROM (
+            {_RAW_DATA_SELECT}
+            ORDER BY date DESC
+            LIMIT 30
+        ) AS recent
+        ORDER BY date ASC
     """
 
     try:
@@ -146,9 +268,6 @@ def get_last_30_days_raw_data() -> Optional[pd.DataFrame]:
         # Read into DataFrame
         df = pd.read_sql_query(query, engine)
 
-        # Reverse order (oldest first)
-        df = df.iloc[::-1].reset_index(drop=True)
-
         # Convert date column to datetime
         df['date'] = pd.to_datetime(df['date'])
 
@@ -161,10 +280,99 @@ def get_last_30_days_raw_data() -> Optional[pd.DataFrame]:
         return None
 
 
-def get_all_raw_data() -> Optional[pd.DataFrame]:
+def _fetch_all_raw_data() -> Optional[pd.DataFrame]:
+    """Query all available raw data (uncached)"""
+
+    query = f"""
+        {_RAW_DATA_SELECT}
+        ORDER BY date ASC
+    """
+
+    try:
+        # Use SQLAlchemy engine to avoid pandas warning
+        engine = get_sqlalchemy_engine()
+
+        # Read into DataFrame
+        df = pd.read_sql_query(query, engine)
+
+        # Convert date column to datetime
+        df['date'] = pd.to_datetime(df['date'])
+
+        logger.info(f"Retrieved {len(df)} days of all historical data from database")
+
+        return df
+
+    except Exception as e:
+        logger.error(f"Failed to fetch all raw data: {e}")
+        return None
+
+
+def _cached_raw_data(key: str, loader: Callable[[], Optional[pd.DataFrame]],
+                     version: Optional[Tuple[Any, ...]] = None) -> Optional[pd.DataFrame]:
+    """
+    Return a copy of a cached raw_data frame, reloading it when stale.
+
+    version is a get_raw_data_version() result the caller already holds;
+    it is looked up here when not given.
+    """
+    if version is None:
+        version = get_raw_data_version()
+    if version is None:
+        # Empty table or failed lookup: nothing safe to key on
+        return loader()
+
+    now = time.monotonic()
+    with _RAW_DATA_CACHE_LOCK:
+        entry = _RAW_DATA_CACHE.get(key)
+    if entry is not None and entry[1] == version and now - entry[0] < RAW_DATA_CACHE_TTL:
+        return entry[2].copy()
+
+    df = loader()
+    if df is not None:
+        with _RAW_DATA_CACHE_LOCK:
+            _RAW_DATA_CACHE[key] = (now, version, df)
+        return df.copy()
+    return df
+
+
+def clear_raw_data_cache() -> None:
+    """Drop cached raw_data frames (called after raw_data is written)."""
+    with _RAW_DATA_CACHE_LOCK:
+        _RAW_DATA_CACHE.clear()
+
+
+def get_last_30_days_raw_data(version: Optional[Tuple[Any, ...]] = None) -> Optional[pd.DataFrame]:
+    """
+    Fetch last 30 days of raw data from database
+
+    Args:
+        version: get_raw_data_version() result, when the caller already has one
+
+    Returns:
+        DataFrame with columns matching the schema:
+        - date
+        - daily_precip
+        - daily_temp_avg
+        - daily_snowfall
+        - daily_humidity
+        - daily_wind
+        - soil_deep_30d
+        - target_level_max
+        - hermann_level
+        - grafton_level
+
+        Returns None if query fails
+    """
+    return _cached_raw_data('last_30_days', _fetch_last_30_days_raw_data, version)
+
+
+def get_all_raw_data(version: Optional[Tuple[Any, ...]] = None) -> Optional[pd.DataFrame]:
     """
     Fetch all available raw data from database
 
+    Args:
+        version: get_raw_data_version() result, when the caller already has one
+
     Returns:
         DataFrame with columns matching the schema:
         - date
@@ -180,39 +388,41 @@ def get_all_raw_data() -> Optional[pd.DataFrame]:
 
         Returns None if query fails
     """
+    return _cached_raw_data('all', _fetch_all_raw_data, version)
 
-    query = """
-        SELECT
-            date,
-            daily_precip,
-            daily_temp_avg,
-            daily_snowfall,
-            daily_humidity,
-            daily_wind,
-            soil_deep_30d,
-            target_level_max,
-            hermann_level,
-            grafton_level
-        FROM raw_data
+
+def get_raw_data_page(limit: Optional[int], offset: int = 0,
+                      as_of_date: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Fetch one page of raw data, oldest first
+
+    LIMIT/OFFSET run in SQL, so only the requested rows are read (the
+    cached full-history frame is left alone).
+
+    Args:
+        limit: Maximum number of rows, or None for all remaining rows
+        offset: Number of rows to skip
+        as_of_date: Optional ISO date; only rows up to and including it are paged
+
+    Returns:
+        DataFrame with the get_all_raw_data columns, or None if the query fails
+    """
+    where = "WHERE date <= %s" if as_of_date else ""
+    query = f"""
+        {_RAW_DATA_SELECT}
+        {where}
         ORDER BY date ASC
+        LIMIT %s OFFSET %s
     """
+    params = ((as_of_date,) if as_of_date else ()) + (limit, offset)
 
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
         engine = get_sqlalchemy_engine()
-
-        # Read into DataFrame
-        df = pd.read_sql_query(query, engine)
-
-        # Convert date column to datetime
+        df = pd.read_sql_query(query, engine, params=params)
         df['date'] = pd.to_datetime(df['date'])
-
-        logger.info(f"Retrieved {len(df)} days of all historical data from database")
-
         return df
-
     except Exception as e:
-        logger.error(f"Failed to fetch all raw data: {e}")
+        logger.error(f"Failed to fetch raw data page: {e}")
         return None
 
 
@@ -246,6 +456,31 @@ def get_last_raw_data_date() -> Optional[str]:
         return None
 
 
+def get_raw_data_version() -> Optional[Tuple[Any, ...]]:
+    """
+    Change marker for the raw_data table
+
+    Both writers (insert_raw_data_batch and scripts/load_raw_dataset.py) stamp
+    created_at on insert and on ON CONFLICT updates, so rewriting existing
+    dates moves the marker even though MAX(date) stays put; the row count
+    catches deletes.
+
+    Returns:
+        (last date, last write time, row count), or None if the table is
+        empty or the lookup fails
+    """
+    query = "SELECT MAX(date) AS last_date, MAX(created_at) AS last_write, COUNT(*) AS row_count FROM raw_data"
+
+    try:
+        row = fetch_records(query)[0]
+        if not row['row_count']:
+            return None
+        return (row['last_date'], row['last_write'], row['row_count'])
+    except Exception as e:
+        logger.error(f"Failed to get raw data version: {e}")
+        return None
+
+
 def insert_prediction(forecast_date: str, predicted_level: float, flood_probability: float, days_ahead: int = 1,
                       lower_bound_80: Optional[float] = None, upper_bound_80: Optional[float] = None,
                       model_version: Optional[str] = None, model_type: Optional[str] = None) -> None:
@@ -275,64 +510,57 @@ def insert_prediction(forecast_date: str, predicted_level: float, flood_probabil
         model_type=model_type
     )
 
-    # Use update-then-insert pattern to avoid relying on an ON CONFLICT
-    # unique constraint. This safely upserts the prediction row.
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
+    # A batch of one shares the multi-row upsert path
+    insert_predictions([prediction_insert])
 
-        # The schema uses `date` and `days_ahead` as column names (see
-        # UI/database/init/01-schema.sql). Use those column names in SQL but
-        # return both `date` and `forecast_date` keys for compatibility.
-        update_q = """
-            UPDATE predictions
-            SET predicted_level = %s,
-                lower_bound_80 = %s,
-                upper_bound_80 = %s,
-                flood_probability = %s,
-                model_version = %s,
-                model_type = %s,
-                created_at = CURRENT_TIMESTAMP
-            WHERE date = %s AND days_ahead = %s
-        """
-
-        cursor.execute(update_q, (
-            prediction_insert.predicted_level,
-            prediction_insert.lower_bound_80,
-            prediction_insert.upper_bound_80,
-            prediction_insert.flood_probability,
-            prediction_insert.model_version,
-            prediction_insert.model_type,
-            prediction_insert.forecast_date,
-            prediction_insert.days_ahead,
-        ))
-
-        if cursor.rowcount == 0:
-            insert_q = """
-                INSERT INTO predictions (
-                    date, days_ahead, model_version,
-                    predicted_level, lower_bound_80, upper_bound_80,
-                    flood_probability, model_type
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(insert_q, (
-                prediction_insert.forecast_date,
-                prediction_insert.days_ahead,
-                prediction_insert.model_version,
-                prediction_insert.predicted_level,
-                prediction_insert.lower_bound_80,
-                prediction_insert.upper_bound_80,
-                prediction_insert.flood_probability,
-                prediction_insert.model_type,
-            ))
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+def insert_predictions(records: List[PredictionInsert]) -> int:
+    """
+    Upsert several predictions in one round-trip and one commit.
 
-        logger.info(f"Upserted prediction for {forecast_date} (days_ahead={days_ahead})")
+    Rows go out as a single multi-row INSERT ... ON CONFLICT via
+    execute_values, instead of a statement (and commit) per prediction.
+
+    Returns:
+        Number of rows written
+    """
+    if not records:
+        return 0
+
+    query = """
+        INSERT INTO predictions (
+            date, days_ahead, model_version,
+            predicted_level, lower_bound_80, upper_bound_80,
+            flood_probability, model_type
+        ) VALUES %s
+        ON CONFLICT (date, days_ahead) DO UPDATE SET
+            predicted_level = EXCLUDED.predicted_level,
+            lower_bound_80 = EXCLUDED.lower_bound_80,
+            upper_bound_80 = EXCLUDED.upper_bound_80,
+            flood_probability = EXCLUDED.flood_probability,
+            model_version = EXCLUDED.model_version,
+            model_type = EXCLUDED.model_type,
+            created_at = CURRENT_TIMESTAMP
+    """
+    values = [
+        (
+            record.forecast_date, record.days_ahead, record.model_version,
+            record.predicted_level, record.lower_bound_80, record.upper_bound_80,
+            record.flood_probability, record.model_type,
+        )
+        for record in records
+    ]
+
+    try:
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            psycopg2.extras.execute_values(cursor, query, values, page_size=500)
+            conn.commit()
+
+        # rowcount only covers the last execute_values page
+        logger.info(f"Upserted {len(values)} predictions")
+        return len(values)
     except Exception as e:
-        logger.error(f"Failed to insert prediction: {e}")
+        logger.error(f"Failed to insert predictions: {e}")
         raise
 
 
@@ -357,9 +585,10 @@ def get_prediction_history(limit: int = 90) -> pd.DataFrame | None:
         return None
 
 
-def get_prediction_history_with_actuals(limit: int = 90) -> pd.DataFrame | None:
+def get_prediction_history_with_actuals(limit: int = 90, offset: int = 0) -> pd.DataFrame | None:
     """
     Return recent predictions joined with actual observed values (from raw_data).
+    ``limit``/``offset`` page through the history, newest first.
 
     The result includes:
       - forecast_date
@@ -373,6 +602,8 @@ def get_prediction_history_with_actuals(limit: int = 90) -> pd.DataFrame | None:
     """
     # Use actual schema column names (`date`, `days_ahead`) but return
     # a column named `forecast_date` for compatibility with callers.
+    # The page of predictions is picked first so raw_data is only joined
+    # against the rows actually returned.
     query = """
         SELECT
             p.date AS forecast_date,
@@ -385,16 +616,21 @@ def get_prediction_history_with_actuals(limit: int = 90) -> pd.DataFrame | None:
             p.model_version,
             p.model_type,
             p.created_at
-        FROM predictions p
+        FROM (
+            SELECT date, days_ahead, predicted_level, lower_bound_80, upper_bound_80,
+                   flood_probability, model_version, model_type, created_at
+            FROM predictions
+            ORDER BY created_at DESC
+            LIMIT %s OFFSET %s
+        ) p
         LEFT JOIN raw_data rd ON rd.date = p.date
         ORDER BY p.created_at DESC
-        LIMIT %s
     """
 
     try:
         # Use SQLAlchemy engine to avoid pandas warning
         engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine, params=(limit,))
+        df = pd.read_sql_query(query, engine, params=(limit, offset))
         return df
     except Exception as e:
         logger.error(f"Failed to fetch prediction history with actuals: {e}")
@@ -408,22 +644,14 @@ def get_prediction(forecast_date: str, days_ahead: int) -> Optional[dict]:
     queries the actual columns and returns both `date` and
     `forecast_date` keys for compatibility.
     """
-    query = """
-        SELECT predicted_level, lower_bound_80, upper_bound_80, flood_probability, days_ahead, created_at, date
-        FROM predictions
-        WHERE date = %s AND days_ahead = %s
-        LIMIT 1
-    """
+    query = "EXECUTE get_prediction(%s, %s)"
 
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
-        engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine, params=(forecast_date, days_ahead))
-
-        if df.empty:
+        rows = fetch_records(query, (forecast_date, days_ahead))
+        if not rows:
             return None
 
-        row = df.iloc[0]
+        row = rows[0]
         # Provide both names to callers: `date` and `forecast_date`, and
         # `days_ahead` and `lead_time_days` where useful.
         return {
@@ -442,32 +670,40 @@ def get_prediction(forecast_date: str, days_ahead: int) -> Optional[dict]:
         return None
 
 
-def get_latest_prediction(days_ahead: Optional[int] = None) -> Optional[dict]:
-    """Return the most recent prediction record (optionally filtered by lead time)."""
-    clauses = []
-    params = []
-    if days_ahead is not None:
-        clauses.append("days_ahead = %s")
-        params.append(days_ahead)
+def get_cached_prediction_keys(lead_times: List[int]) -> Optional[set]:
+    """
+    Return every cached ``(date, days_ahead)`` pair for the given lead times.
 
-    where_clause = f"WHERE {' AND '.join(clauses)}" if clauses else ''
-    query = f"""
-        SELECT date, days_ahead, predicted_level, lower_bound_80, upper_bound_80, flood_probability, model_version, model_type, created_at
-        FROM predictions
-        {where_clause}
-        ORDER BY created_at DESC
-        LIMIT 1
+    One scan of the primary key instead of a point lookup per window and
+    lead time; dates are ISO ``YYYY-MM-DD`` strings. Returns None on failure
+    so callers can fall back to per-row lookups.
     """
+    query = "SELECT date, days_ahead FROM predictions WHERE days_ahead = ANY(%s)"
 
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
-        engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine, params=tuple(params) if params else None)
+        # Backfill-only scan over every cached key; not an interactive read
+        rows = fetch_records(query, (list(lead_times),), timeout_ms=0)
+        return {(row['date'].isoformat(), int(row['days_ahead'])) for row in rows}
+    except Exception as e:
+        logger.error(f"Failed to fetch cached prediction keys: {e}")
+        return None
 
-        if df.empty:
+
+def get_latest_prediction(days_ahead: Optional[int] = None) -> Optional[dict]:
+    """Return the most recent prediction record (optionally filtered by lead time)."""
+    if days_ahead is not None:
+        query = "EXECUTE get_latest_prediction_by_lead(%s)"
+        params = (days_ahead,)
+    else:
+        query = "EXECUTE get_latest_prediction"
+        params = None
+
+    try:
+        rows = fetch_records(query, params)
+        if not rows:
             return None
 
-        row = df.iloc[0]
+        row = rows[0]
         return {
             'forecast_date': str(row['date']),
             'date': str(row['date']),
@@ -485,71 +721,121 @@ def get_latest_prediction(days_ahead: Optional[int] = None) -> Optional[dict]:
         return None
 
 
-def get_all_zones() -> List[Dict[str, Any]]:
-    """Fetch zone metadata from the database."""
-    query = """
+_ZONE_SCORE_COLUMNS = ('river_proximity', 'elevation_risk', 'pop_density', 'crit_infra_score')
+
+
+def _cached_metadata(key: Any, loader: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Return copies of cached metadata rows, reloading them after METADATA_CACHE_TTL."""
+    now = time.monotonic()
+    with _METADATA_CACHE_LOCK:
+        entry = _METADATA_CACHE.get(key)
+    if entry is not None and now - entry[0] < METADATA_CACHE_TTL:
+        return [dict(row) for row in entry[1]]
+
+    rows = loader()
+    if rows:
+        # Empty results double as the error fallback, so they aren't cached
+        with _METADATA_CACHE_LOCK:
+            _METADATA_CACHE[key] = (now, rows)
+        return [dict(row) for row in rows]
+    return rows
+
+
+def clear_metadata_cache() -> None:
+    """Drop cached zone/resource-type rows (called after either table is written)."""
+    with _METADATA_CACHE_LOCK:
+        _METADATA_CACHE.clear()
+
+
+def get_all_zones(vulnerability_weights: Optional[Dict[str, float]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch zone metadata from the database (cached for METADATA_CACHE_TTL seconds).
+
+    Args:
+        vulnerability_weights: Optional map of score column to weight. When
+            given, each row also carries a ``vulnerability`` score computed
+            in SQL as the weighted sum of those columns.
+
+    Returns:
+        Zone rows, or None if the database read failed (never cached)
+    """
+    key = ('zones', tuple(sorted(vulnerability_weights.items())) if vulnerability_weights else None)
+    return _cached_metadata(key, lambda: _fetch_all_zones(vulnerability_weights))
+
+
+def _fetch_all_zones(vulnerability_weights: Optional[Dict[str, float]] = None) -> Optional[List[Dict[str, Any]]]:
+    """Uncached read behind get_all_zones."""
+    params = None
+    vulnerability_column = ""
+    if vulnerability_weights:
+        params = {}
+        terms = []
+        for column, weight in vulnerability_weights.items():
+            if column not in _ZONE_SCORE_COLUMNS:
+                raise ValueError(f"Unknown zone score column: {column}")
+            terms.append(f"%(w_{column})s * {column}::float8")
+            params[f"w_{column}"] = float(weight)
+        vulnerability_column = f"({' + '.join(terms)}) AS vulnerability,"
+
+    # The DECIMAL scores are cast to float8 server-side so they arrive as
+    # Python floats instead of per-row Decimal objects, and NULLs are
+    # defaulted there too so the rows are returned exactly as fetched.
+    query = f"""
         SELECT
+            {vulnerability_column}
             zone_id,
             name,
-            river_proximity,
-            elevation_risk,
-            pop_density,
-            crit_infra_score,
-            hospital_count,
-            critical_infra
+            COALESCE(river_proximity::float8, 0.0) AS river_proximity,
+            COALESCE(elevation_risk::float8, 0.0) AS elevation_risk,
+            COALESCE(pop_density::float8, 0.0) AS pop_density,
+            COALESCE(crit_infra_score::float8, 0.0) AS crit_infra_score,
+            COALESCE(hospital_count, 0) AS hospital_count,
+            COALESCE(critical_infra, FALSE) AS critical_infra
         FROM zones
         ORDER BY zone_id
     """
 
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
-        engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine)
-        if df.empty:
-            return []
-        df = df.fillna({
-            'river_proximity': 0.0,
-            'elevation_risk': 0.0,
-            'pop_density': 0.0,
-            'crit_infra_score': 0.0,
-            'hospital_count': 0,
-            'critical_infra': False,
-        })
-        records = df.to_dict(orient="records")
-        normalized = []
-        for row in records:
-            normalized.append({str(k): v for k, v in row.items()})
-        return normalized
+        return fetch_records(query, params)
     except Exception as e:
         logger.error(f"Failed to fetch zones: {e}")
-        return []
+        return None
 
 
 def get_all_resource_types() -> List[Dict[str, Any]]:
-    """Fetch all resource types from the database."""
+    """Fetch all resource types from the database (cached for METADATA_CACHE_TTL seconds)."""
+    return _cached_metadata('resource_types', _fetch_all_resource_types)
+
+
+def _fetch_all_resource_types() -> List[Dict[str, Any]]:
+    """Uncached read behind get_all_resource_types."""
+    # Postgres builds the response rows itself; psycopg2 decodes the json
+    # array straight into a list of dicts, so no DataFrame round-trip.
     query = """
-        SELECT
-            resource_id,
-            name,
-            description,
-            icon,
-            display_order,
-            capacity
+        SELECT COALESCE(
+            json_agg(
+                json_build_object(
+                    'resource_id', resource_id,
+                    'name', name,
+                    'description', description,
+                    'icon', icon,
+                    'display_order', display_order,
+                    'capacity', capacity
+                )
+                ORDER BY display_order
+            ),
+            '[]'::json
+        )
         FROM resource_types
-        ORDER BY display_order
     """
 
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
-        engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine)
-        if df.empty:
-            return []
-        records = df.to_dict(orient="records")
-        normalized = []
-        for row in records:
-            normalized.append({str(k): v for k, v in row.items()})
-        return normalized
+        # Released on every path, so a failed read can't hold a pooled connection
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(query)
+            result = cursor.fetchone()
+
+        return result[0] if result and result[0] else []
     except Exception as e:
         logger.error(f"Failed to fetch resource types: {e}")
         return []
@@ -568,29 +854,26 @@ def get_all_resource_types_typed() -> List[ResourceType]:
 def insert_zone(zone: ZoneInsert) -> bool:
     """Insert a new zone into the database."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            query = """
+                INSERT INTO zones (
+                    zone_id, name, river_proximity, elevation_risk, pop_density,
+                    crit_infra_score, hospital_count, critical_infra
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (
+                zone.zone_id,
+                zone.name,
+                zone.river_proximity,
+                zone.elevation_risk,
+                zone.pop_density,
+                zone.crit_infra_score,
+                zone.hospital_count,
+                zone.critical_infra
+            ))
 
-        query = """
-            INSERT INTO zones (
-                zone_id, name, river_proximity, elevation_risk, pop_density,
-                crit_infra_score, hospital_count, critical_infra
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (
-            zone.zone_id,
-            zone.name,
-            zone.river_proximity,
-            zone.elevation_risk,
-            zone.pop_density,
-            zone.crit_infra_score,
-            zone.hospital_count,
-            zone.critical_infra
-        ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+        clear_metadata_cache()
 
         logger.info(f"Inserted zone: {zone.zone_id}")
         return True
@@ -602,26 +885,23 @@ def insert_zone(zone: ZoneInsert) -> bool:
 def insert_resource_type(resource: ResourceTypeInsert) -> bool:
     """Insert a new resource type into the database."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            query = """
+                INSERT INTO resource_types (
+                    resource_id, name, description, icon, display_order, capacity
+                ) VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (
+                resource.resource_id,
+                resource.name,
+                resource.description,
+                resource.icon,
+                resource.display_order,
+                resource.capacity
+            ))
 
-        query = """
-            INSERT INTO resource_types (
-                resource_id, name, description, icon, display_order, capacity
-            ) VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (
-            resource.resource_id,
-            resource.name,
-            resource.description,
-            resource.icon,
-            resource.display_order,
-            resource.capacity
-        ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+        clear_metadata_cache()
 
         logger.info(f"Inserted resource type: {resource.resource_id}")
         return True
@@ -636,43 +916,41 @@ def insert_raw_data_batch(records: List[RawDataInsert]) -> int:
         return 0
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            query = """
+                INSERT INTO raw_data (
+                    date, daily_precip, daily_temp_avg, daily_snowfall,
+                    daily_humidity, daily_wind, soil_deep_30d,
+                    target_level_max, hermann_level, grafton_level
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (date) DO UPDATE SET
+                    daily_precip = EXCLUDED.daily_precip,
+                    daily_temp_avg = EXCLUDED.daily_temp_avg,
+                    daily_snowfall = EXCLUDED.daily_snowfall,
+                    daily_humidity = EXCLUDED.daily_humidity,
+                    daily_wind = EXCLUDED.daily_wind,
+                    soil_deep_30d = EXCLUDED.soil_deep_30d,
+                    target_level_max = EXCLUDED.target_level_max,
+                    hermann_level = EXCLUDED.hermann_level,
+                    grafton_level = EXCLUDED.grafton_level,
+                    created_at = NOW()
+            """
 
-        query = """
-            INSERT INTO raw_data (
-                date, daily_precip, daily_temp_avg, daily_snowfall,
-                daily_humidity, daily_wind, soil_deep_30d,
-                target_level_max, hermann_level, grafton_level
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (date) DO UPDATE SET
-                daily_precip = EXCLUDED.daily_precip,
-                daily_temp_avg = EXCLUDED.daily_temp_avg,
-                daily_snowfall = EXCLUDED.daily_snowfall,
-                daily_humidity = EXCLUDED.daily_humidity,
-                daily_wind = EXCLUDED.daily_wind,
-                soil_deep_30d = EXCLUDED.soil_deep_30d,
-                target_level_max = EXCLUDED.target_level_max,
-                hermann_level = EXCLUDED.hermann_level,
-                grafton_level = EXCLUDED.grafton_level
-        """
-
-        values = [
-            (
-                record.date, record.daily_precip, record.daily_temp_avg,
-                record.daily_snowfall, record.daily_humidity, record.daily_wind,
-                record.soil_deep_30d, record.target_level_max,
-                record.hermann_level, record.grafton_level
-            )
-            for record in records
-        ]
+            values = [
+                (
+                    record.date, record.daily_precip, record.daily_temp_avg,
+                    record.daily_snowfall, record.daily_humidity, record.daily_wind,
+                    record.soil_deep_30d, record.target_level_max,
+                    record.hermann_level, record.grafton_level
+                )
+                for record in records
+            ]
 
-        cursor.executemany(query, values)
-        inserted_count = cursor.rowcount
+            cursor.executemany(query, values)
+            inserted_count = cursor.rowcount
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+        clear_raw_data_cache()
 
         logger.info(f"Inserted/updated {inserted_count} raw data records")
         return inserted_count
@@ -684,20 +962,15 @@ def insert_raw_data_batch(records: List[RawDataInsert]) -> int:
 def get_threshold_config(config_name: str = 'default') -> Optional[ThresholdConfig]:
     """Get threshold configuration from the database."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        query = """
-            SELECT flood_minor, flood_moderate, flood_major,
-                   critical_probability, warning_probability, advisory_probability
-            FROM threshold_config
-            WHERE config_name = %s
-        """
-        cursor.execute(query, (config_name,))
-        result = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            query = """
+                SELECT flood_minor, flood_moderate, flood_major,
+                       critical_probability, warning_probability, advisory_probability
+                FROM threshold_config
+                WHERE config_name = %s
+            """
+            cursor.execute(query, (config_name,))
+            result = cursor.fetchone()
 
         if result:
             return ThresholdConfig(
@@ -717,85 +990,83 @@ def get_threshold_config(config_name: str = 'default') -> Optional[ThresholdConf
         return None
 
 
-def update_threshold_config(thresholds: ThresholdConfig, config_name: str = 'default', updated_by: str = 'system') -> bool:
-    """Update threshold configuration in the database."""
+def create_threshold_config(thresholds: ThresholdConfig, config_name: str = 'default', updated_by: str = 'system') -> bool:
+    """Create a new threshold configuration in the database."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            query = """
+                INSERT INTO threshold_config
+                (config_name, flood_minor, flood_moderate, flood_major,
+                 critical_probability, warning_probability, advisory_probability, updated_by)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (
+                config_name,
+                thresholds.flood_minor,
+                thresholds.flood_moderate,
+                thresholds.flood_major,
+                thresholds.critical_probability,
+                thresholds.warning_probability,
+                thresholds.advisory_probability,
+                updated_by
+            ))
 
-        query = """
-            UPDATE threshold_config
-            SET
-                flood_minor = %s,
-                flood_moderate = %s,
-                flood_major = %s,
-                critical_probability = %s,
-                warning_probability = %s,
-                advisory_probability = %s,
-                updated_by = %s
-            WHERE config_name = %s
-        """
-        cursor.execute(query, (
-            thresholds.flood_minor,
-            thresholds.flood_moderate,
-            thresholds.flood_major,
-            thresholds.critical_probability,
-            thresholds.warning_probability,
-            thresholds.advisory_probability,
-            updated_by,
-            config_name
-        ))
-
-        rows_affected = cursor.rowcount
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
 
-        if rows_affected > 0:
-            logger.info(f"Updated threshold configuration '{config_name}'")
-            return True
-        else:
-            logger.warning(f"No threshold configuration found for '{config_name}'")
-            return False
+        logger.info(f"Created threshold configuration '{config_name}'")
+        return True
 
     except Exception as e:
-        logger.error(f"Failed to update threshold configuration: {e}")
+        logger.error(f"Failed to create threshold configuration: {e}")
         return False
 
 
-def create_threshold_config(thresholds: ThresholdConfig, config_name: str = 'default', updated_by: str = 'system') -> bool:
-    """Create a new threshold configuration in the database."""
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
+def upsert_threshold_config(
+    thresholds: ThresholdConfig, config_name: str = 'default', updated_by: str = 'system'
+) -> Optional[str]:
+    """
+    Create or update a threshold configuration in one statement.
 
-        query = """
-            INSERT INTO threshold_config
-            (config_name, flood_minor, flood_moderate, flood_major,
-             critical_probability, warning_probability, advisory_probability, updated_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (
-            config_name,
-            thresholds.flood_minor,
-            thresholds.flood_moderate,
-            thresholds.flood_major,
-            thresholds.critical_probability,
-            thresholds.warning_probability,
-            thresholds.advisory_probability,
-            updated_by
-        ))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+    Returns ``"created"`` or ``"updated"``, or None on failure.
+    """
+    # xmax is 0 only for a freshly inserted row version
+    query = """
+        INSERT INTO threshold_config
+        (config_name, flood_minor, flood_moderate, flood_major,
+         critical_probability, warning_probability, advisory_probability, updated_by)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (config_name) DO UPDATE SET
+            flood_minor = EXCLUDED.flood_minor,
+            flood_moderate = EXCLUDED.flood_moderate,
+            flood_major = EXCLUDED.flood_major,
+            critical_probability = EXCLUDED.critical_probability,
+            warning_probability = EXCLUDED.warning_probability,
+            advisory_probability = EXCLUDED.advisory_probability,
+            updated_by = EXCLUDED.updated_by
+        RETURNING (xmax = 0) AS inserted
+    """
+    try:
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(query, (
+                config_name,
+                thresholds.flood_minor,
+                thresholds.flood_moderate,
+                thresholds.flood_major,
+                thresholds.critical_probability,
+                thresholds.warning_probability,
+                thresholds.advisory_probability,
+                updated_by
+            ))
+            inserted = cursor.fetchone()[0]
+            conn.commit()
 
-        logger.info(f"Created threshold configuration '{config_name}'")
-        return True
+        action = "created" if inserted else "updated"
+        logger.info(f"{action.capitalize()} threshold configuration '{config_name}'")
+        return action
 
     except Exception as e:
-        logger.error(f"Failed to create threshold configuration: {e}")
-        return False
+        logger.error(f"Failed to upsert threshold configuration: {e}")
+        return None
 
 
 def ensure_default_threshold_config() -> ThresholdConfig:
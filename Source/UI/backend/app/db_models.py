@@ -1,7 +1,8 @@
 """
 Pydantic models for database operations and type safety.
 """
-from datetime import datetime
+import re
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional, Union
 import pandas as pd
 from pydantic import BaseModel, Field, validator
@@ -13,6 +14,10 @@ from .schemas import (
     PredictionRecord,
 )
 
+# Same shapes strptime('%Y-%m-%d') accepts (month/day may be unpadded); the
+# calendar check is left to date().
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
 
 class DatabaseQueryParams(BaseModel):
     """Parameters for database queries with validation."""
@@ -36,8 +41,11 @@ class PredictionInsert(BaseModel):
     @validator('forecast_date')
     @classmethod
     def validate_date(cls, v):
+        match = _ISO_DATE_RE.fullmatch(v)
         try:
-            datetime.strptime(v, '%Y-%m-%d')
+            if match is None:
+                raise ValueError
+            date(*map(int, match.groups()))
             return v
         except ValueError:
             raise ValueError('Date must be in YYYY-MM-DD format')
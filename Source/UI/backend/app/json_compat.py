@@ -0,0 +1,39 @@
+"""
+JSON encoding and decoding shared by the API, the database layer and the data fetcher.
+
+orjson is optional: when it is installed dumps/loads run in C, otherwise they
+fall back to the stdlib json module.
+"""
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads(data: Any) -> Any:
+    """Decode a JSON document from str or bytes."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode obj as compact UTF-8 JSON bytes.
+
+    default is called for values neither encoder handles natively. numpy
+    scalars are encoded directly by orjson and passed to default otherwise.
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        obj,
+        default=default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
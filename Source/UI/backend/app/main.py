@@ -1,77 +1,63 @@
 """
 FastAPI backend for flood prediction system
 """
-import json
+import asyncio
+import hashlib
+import itertools
 import logging
 import threading
+import time
+from contextlib import asynccontextmanager, closing
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
 import pandas as pd
 import numpy as np
-from app.db import get_sqlalchemy_engine
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
+from .json_compat import dumps, loads
 
-class SafeJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that safely handles special float values"""
 
-    def default(self, obj):
-        # Handle numpy types
-        if isinstance(obj, np.generic):
-            try:
-                return obj.item()
-            except (ValueError, OverflowError):
-                return None
+def _json_default(obj):
+    """Encode numpy scalars and date/time values the JSON encoders don't handle."""
+    if isinstance(obj, np.generic):
+        try:
+            return obj.item()
+        except (ValueError, OverflowError):
+            return None
+    if hasattr(obj, 'isoformat') and callable(obj.isoformat):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _safe_floats(obj):
+    """Replace NaN, infinities and floats outside +/-1e100 in nested dicts/lists with None."""
+    if isinstance(obj, dict):
+        return {k: _safe_floats(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_safe_floats(v) for v in obj]
+    if isinstance(obj, float) and not (-1e100 <= obj <= 1e100):
+        return None
+    return obj
 
-        # Handle pandas Timestamp
-        if hasattr(obj, 'isoformat') and callable(obj.isoformat):
-            return obj.isoformat()
-
-        return super().default(obj)
-
-    def encode(self, obj):
-        # Override encode to handle special float values
-        def _safe_floats(o):
-            if isinstance(o, dict):
-                return {k: _safe_floats(v) for k, v in o.items()}
-            elif isinstance(o, list):
-                return [_safe_floats(v) for v in o]
-            elif isinstance(o, float):
-                # Check for problematic float values
-                if o != o:  # NaN
-                    return None
-                if o in (float('inf'), float('-inf')):  # Infinity
-                    return None
-                if not (-1e100 <= o <= 1e100):  # Out of reasonable range
-                    return None
-                return o
-            else:
-                return o
 
-        return super().encode(_safe_floats(obj))
+def _dumps_json(content) -> bytes:
+    """Serialize content to JSON bytes, writing non-finite and out-of-range floats as null."""
+    return dumps(_safe_floats(content), default=_json_default)
 
 
 class SafeJSONResponse(JSONResponse):
-    """Custom JSONResponse that uses SafeJSONEncoder"""
+    """Custom JSONResponse that nulls unsafe floats and uses orjson when available"""
 
     def render(self, content) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-            cls=SafeJSONEncoder,
-        ).encode("utf-8")
-
-from .prediction.data_fetcher import DataFetcher
+        return _dumps_json(content)
+
+from .prediction.data_fetcher import GAUGES, get_latest_data
 from .schemas import (
     PredictionResponse,
-    Prediction,
     FloodRisk,
     Forecast,
     PredictionInterval,
@@ -90,28 +76,35 @@ from .schemas import (
     HealthResponse,
     ApiResponse,
     GeoJsonFeatureCollection,
-    GeoJsonFeature,
     ResourceType,
     HistoricalPredictionResults,
     HistoricalPredictionSummary,
 )
 from .db import (
+    DB_BULK_READ_TIMEOUT_MS,
+    clear_metadata_cache,
+    ensure_default_threshold_config,
+    fetch_records,
     get_all_zones,
     get_all_resource_types,
     get_last_30_days_raw_data,
     get_all_raw_data,
     get_last_raw_data_date,
+    get_raw_data_page,
+    get_raw_data_version,
     get_latest_prediction,
+    get_pool_status,
     get_prediction,
     get_prediction_history,
     get_prediction_history_with_actuals,
+    upsert_threshold_config,
 )
-from .prediction_service import predict_next_days, predict_all_historical
+from .prediction_service import predict_next_days, predict_all_historical, warm_predictors
 from .rule_based import (
     RESOURCE_TYPES,
+    VULNERABILITY_WEIGHTS,
     build_dispatch_plan,
-    build_zones_from_data,
-    compute_pf_by_zone_from_global,
+    zones_for_global_pf,
 )
 import os
 
@@ -123,18 +116,50 @@ SCRIPTS_DIR = os.environ.get('SCRIPTS_DIR', os.path.join(REPO_ROOT, 'UI', 'scrip
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Preload prediction models and bootstrap the default threshold row so the
+    first requests don't pay either cost.
+    """
+    # Model loading and the threshold upsert are independent, so they run on
+    # separate worker threads and startup waits for the slower one only.
+    startup = [asyncio.to_thread(ensure_default_threshold_config)]
+    if os.environ.get('PRELOAD_MODELS', 'true').lower() in ('1', 'true', 'yes'):
+        startup.append(asyncio.to_thread(warm_predictors, [1, 2, 3]))
+    results = await asyncio.gather(*startup)
+    if len(results) > 1:
+        logger.info(f"Preloaded predictors for lead times: {results[1]}")
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Flood Prediction API",
     description="Predicts Mississippi River levels at St. Louis for 1-3 days ahead",
     version="1.0.0",
-    default_response_class=SafeJSONResponse
+    default_response_class=SafeJSONResponse,
+    lifespan=lifespan
 )
 
 # Simple in-memory job store for background tasks
 JOB_STORE: Dict[str, Dict[str, Any]] = {}
 JOB_STORE_LOCK = threading.Lock()
 
+# Short-lived cache for /predict responses. Database-backed predictions only
+# change when raw_data is written, so entries are keyed on the raw_data
+# version (get_raw_data_version) as well as the request and expire after
+# PREDICT_CACHE_TTL seconds.
+PREDICT_CACHE_TTL = float(os.environ.get('PREDICT_CACHE_TTL', '30'))
+PREDICT_CACHE: Dict[Tuple[Optional[str], str], Tuple[float, PredictionResponse]] = {}
+PREDICT_CACHE_LOCK = threading.Lock()
+
+# Model inference is CPU-bound and synchronous; run it in worker threads and cap
+# how many requests may be inferring at once so a burst can't oversubscribe the CPU.
+PREDICTION_CONCURRENCY = max(1, int(os.environ.get('PREDICTION_CONCURRENCY', os.cpu_count() or 1)))
+PREDICTION_SEMAPHORE = asyncio.Semaphore(PREDICTION_CONCURRENCY)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -154,6 +179,32 @@ IMPACT_COLOR_MAP = {
 DEFAULT_IMPACT_COLOR = "#94a3b8"
 
 
+_VULN_BINS = np.array([0.33, 0.66])
+_VULN_CATEGORIES = np.array(["LOW", "MEDIUM", "HIGH"])
+
+
+def _vuln_categories(vulnerabilities: Dict[str, float]) -> Dict[str, str]:
+    """Simple vulnerability category per zone: LOW / MEDIUM / HIGH (one np.digitize pass)"""
+    if not vulnerabilities:
+        return {}
+    values = np.fromiter(vulnerabilities.values(), dtype=np.float64, count=len(vulnerabilities))
+    categories = _VULN_CATEGORIES[np.digitize(values, _VULN_BINS)]
+    return dict(zip(vulnerabilities.keys(), categories.tolist()))
+
+
+def _zone_metrics(zones, pf_by_zone: Dict[str, float]) -> Dict[str, Tuple[float, float, float]]:
+    """Rounded (pf, vulnerability, impact factor) per zone, computed as arrays in one pass."""
+    if not zones:
+        return {}
+    zone_ids = [zone.id for zone in zones]
+    count = len(zone_ids)
+    pf = np.round(np.fromiter((pf_by_zone.get(zone_id, 0.0) for zone_id in zone_ids), dtype=np.float64, count=count), 4)
+    vulnerability = np.round(np.fromiter((zone.vulnerability for zone in zones), dtype=np.float64, count=count), 3)
+    # Impact factor (iz) = pf * vulnerability
+    impact = np.round(pf * vulnerability, 4)
+    return dict(zip(zone_ids, zip(pf.tolist(), vulnerability.tolist(), impact.tolist())))
+
+
 def _aggregate_resource_units(dispatch: List[Dict[str, Any]]) -> Dict[str, int]:
     totals: Dict[str, int] = {rtype: 0 for rtype in RESOURCE_TYPES}
     for zone in dispatch:
@@ -162,6 +213,20 @@ def _aggregate_resource_units(dispatch: List[Dict[str, Any]]) -> Dict[str, int]:
     return totals
 
 
+async def _cancel_pending(*tasks: asyncio.Future) -> None:
+    """Cancel tasks a handler started but won't await, and let them settle."""
+    for task in tasks:
+        task.cancel()
+    # Collects each outcome, so no "exception was never retrieved" warnings
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_predictions(raw_data: pd.DataFrame, lead_times: List[int]):
+    """Run predict_next_days off the event loop, bounded by PREDICTION_SEMAPHORE."""
+    async with PREDICTION_SEMAPHORE:
+        return await asyncio.to_thread(predict_next_days, raw_data, lead_times=lead_times)
+
+
 def _safe_df_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     Convert a pandas DataFrame into a JSON-serializable list of dicts, sanitizing
@@ -217,17 +282,18 @@ def _safe_df_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
 
         return x
 
-    # Apply conversion to all values
+    # Apply conversion to all values. itertuples yields plain tuples in column
+    # order, avoiding the per-row Series that iterrows builds.
+    columns = [str(col) for col in df2.columns]
     records = []
-    for idx, (_, row) in enumerate(df2.iterrows()):
+    for idx, values in enumerate(df2.itertuples(index=False, name=None)):
         converted_row = {}
-        for key, value in row.items():
+        for key, value in zip(columns, values):
             try:
-                converted_val = _convert_value(value)
-                converted_row[str(key)] = converted_val
+                converted_row[key] = _convert_value(value)
             except Exception as e:
                 logger.warning(f"Error converting value at row {idx}, column {key}: {e}, value: {value}")
-                converted_row[str(key)] = None
+                converted_row[key] = None
         records.append(converted_row)
 
     return records
@@ -251,49 +317,158 @@ async def root():
         }
     )
 
+
+def _load_raw_data(as_of_date: Optional[str] = None, version: Optional[Tuple[Any, ...]] = None) -> pd.DataFrame:
+    """
+    Load the raw_data history, keeping only rows up to as_of_date when given.
+
+    version is passed through to get_all_raw_data (see get_raw_data_version).
+
+    Raises:
+        HTTPException: 404 if there is no raw data, 400 if as_of_date is not a date
+    """
+    data = get_all_raw_data(version)
+    if data is None or data.empty:
+        raise HTTPException(status_code=404, detail="No raw data found")
+    if as_of_date:
+        try:
+            filter_date = pd.to_datetime(as_of_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        data = data[data['date'] <= filter_date]
+    return data
+
+
+def _load_raw_data_page(as_of_date: Optional[str], limit: Optional[int], offset: int) -> pd.DataFrame:
+    """
+    Load one page of raw_data (oldest first) with the paging done in SQL.
+
+    Raises:
+        HTTPException: 404 if there is no raw data, 400 if as_of_date is not a date
+    """
+    filter_date = None
+    if as_of_date:
+        try:
+            filter_date = pd.to_datetime(as_of_date).date().isoformat()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    data = get_raw_data_page(limit, offset, filter_date)
+    # An empty first page means the table itself is empty; later pages may run dry
+    if data is None or (data.empty and offset == 0 and filter_date is None):
+        raise HTTPException(status_code=404, detail="No raw data found")
+    return data
+
+
+NDJSON_CHUNK_ROWS = 500
+
+
+def _record_chunks(df: pd.DataFrame, chunk_rows: int = NDJSON_CHUNK_ROWS):
+    """Yield JSON-safe records a slice of the DataFrame at a time."""
+    for start in range(0, len(df), chunk_rows):
+        yield _safe_df_records(df.iloc[start:start + chunk_rows])
+
+
+def _ndjson_lines(df: pd.DataFrame, chunk_rows: int = NDJSON_CHUNK_ROWS):
+    """Yield one JSON line per DataFrame row, sanitizing a slice at a time."""
+    for records in _record_chunks(df, chunk_rows):
+        for record in records:
+            yield _dumps_json(record) + b"\n"
+
+
+def _api_response_parts(message: str) -> Tuple[bytes, bytes]:
+    """Encoded ApiResponse envelope split around ``data.rows`` (which is left out)."""
+    envelope = ApiResponse(success=True, message=message).model_dump()
+    fields = list(envelope)
+    at = fields.index("data")
+    # The fields on either side of ``data`` are encoded as their own objects
+    # and joined around {"rows": ...} in model field order
+    before = _dumps_json({name: envelope[name] for name in fields[:at]})
+    after = _dumps_json({name: envelope[name] for name in fields[at + 1:]})
+    return before[:-1] + b',"data":{"rows":', b'},' + after[1:]
+
+
+def _api_response_rows(message: str, df: pd.DataFrame, chunk_rows: int = NDJSON_CHUNK_ROWS):
+    """
+    Yield an ApiResponse body with ``data.rows`` encoded a slice at a time, so
+    only one chunk of converted records is held in memory.
+
+    The envelope head goes out with the first chunk, so priming the generator
+    (see _primed_stream) encodes real rows.
+    """
+    head, tail = _api_response_parts(message)
+    opening = head + b'['
+    separator = b""
+    for records in _record_chunks(df, chunk_rows):
+        if records:
+            # Drop the list brackets so chunks splice into one array
+            yield opening + separator + _dumps_json(records)[1:-1]
+            opening = b""
+            separator = b","
+    yield opening + b"]" + tail
+
+
+def _primed_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Produce the first chunk of a streamed body before the response starts.
+
+    A StreamingResponse commits to 200 before its body is generated, so the
+    first chunk is encoded in the handler: a frame that can't be serialized
+    becomes a 500 rather than a 200 with a truncated body.
+    """
+    chunks = iter(chunks)
+    try:
+        first = next(chunks, b"")
+    except Exception as e:
+        logger.error(f"Failed to encode response body: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to encode response: {e}")
+    return itertools.chain((first,), chunks)
+
+
 @app.get("/raw-data", response_model=ApiResponse)
 async def raw_data(
     as_of_date: Optional[str] = Query(
         None,
         description="Filter data as if we were on this date (YYYY-MM-DD format). If not provided, shows all data."
-    )
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        "json",
+        description="'json' for the wrapped ApiResponse, 'ndjson' to stream one row per line."
+    ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=10000,
+        description="Maximum number of rows to return (oldest first). If not provided, returns all rows."
+    ),
+    offset: int = Query(0, ge=0, description="Number of rows to skip before returning results")
 ):
     """Return raw sensor data from the database.
 
     Args:
         as_of_date: Optional date to filter data as if we were on this date.
                    If provided, only shows data up to this date.
+        format: 'ndjson' streams rows as newline-delimited JSON; the default
+                streams the same ApiResponse body chunk by chunk.
+        limit, offset: Optional page of rows to return; only that page is read from the database.
     """
-    if as_of_date:
-        # Filter data up to the specified date
-        data = get_all_raw_data()
-        if data is None or data.empty:
-            raise HTTPException(status_code=404, detail="No raw data found")
-
-        # Parse the date and filter
-        try:
-            filter_date = pd.to_datetime(as_of_date)
-            # Only keep data up to the specified date
-            data = data[data['date'] <= filter_date]
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    if offset or limit is not None:
+        data = await asyncio.to_thread(_load_raw_data_page, as_of_date, limit, offset)
     else:
-        # Get all data instead of just last 30 days
-        data = get_all_raw_data()
-        if data is None or data.empty:
-            raise HTTPException(status_code=404, detail="No raw data found")
+        data = await asyncio.to_thread(_load_raw_data, as_of_date)
 
-    return ApiResponse(
-        success=True,
-        message="Raw data retrieved successfully",
-        data={"rows": _safe_df_records(data)}
+    if format == "ndjson":
+        return StreamingResponse(_primed_stream(_ndjson_lines(data)), media_type="application/x-ndjson")
+
+    return StreamingResponse(
+        _primed_stream(_api_response_rows("Raw data retrieved successfully", data)),
+        media_type="application/json",
     )
 
 
 @app.get("/raw-data/last-date", response_model=ApiResponse)
 async def last_raw_data_date():
     """Return the date of the last row in the raw_data table."""
-    last_date = get_last_raw_data_date()
+    last_date = await asyncio.to_thread(get_last_raw_data_date)
     if last_date is None:
         raise HTTPException(status_code=404, detail="No raw data found")
     return ApiResponse(
@@ -304,52 +479,25 @@ async def last_raw_data_date():
 
 
 @app.get("/prediction-history", response_model=ApiResponse)
-async def prediction_history(limit: int = Query(90, ge=1, le=1000)):
+async def prediction_history(
+    limit: int = Query(90, ge=1, le=1000),
+    offset: int = Query(0, ge=0, description="Number of most recent predictions to skip (for paging)"),
+):
     """Return recent stored predictions (all horizons) joined with observed values for comparison."""
-    df = get_prediction_history_with_actuals(limit=limit)
+    df = await asyncio.to_thread(get_prediction_history_with_actuals, limit=limit, offset=offset)
     if df is None or df.empty:
         raise HTTPException(status_code=404, detail="No prediction history found")
 
-    # Use python's built-in json to manually serialize and handle problematic values
-    import json as pyjson
-
-    # Convert DataFrame to a list of dictionaries and handle problematic values
-    records = []
-    for _, row in df.iterrows():
-        record = {}
-        for col in df.columns:
-            val = row[col]
-            # Handle problematic values
-            if pd.isna(val) or val in (np.inf, -np.inf):
-                record[col] = None
-            elif isinstance(val, np.generic):
-                try:
-                    record[col] = val.item()
-                except (ValueError, OverflowError):
-                    record[col] = None
-            elif isinstance(val, float):
-                # Check for out-of-range values that can't be JSON serialized
-                if not (-1e100 <= val <= 1e100):
-                    record[col] = None
-                else:
-                    record[col] = val
-            elif hasattr(val, 'isoformat'):  # datetime objects
-                record[col] = val.isoformat()
-            else:
-                record[col] = val
-        records.append(record)
-
-    # Manually create JSON string
-    json_data = pyjson.dumps({
+    # Missing values (NaN/NaT) become None here; out-of-range floats, numpy
+    # scalars and timestamps are left to the response encoder, so rows skip
+    # FastAPI's jsonable_encoder.
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    return SafeJSONResponse(content={
         "success": True,
         "message": "Prediction history retrieved successfully",
         "data": {"rows": records}
     })
 
-    # Return a plain response with manually serialized JSON
-    from fastapi.responses import Response
-    return Response(content=json_data, media_type="application/json")
-
 
 @app.post("/predict-all", response_model=Union[JobStatus, HistoricalPredictionResults])
 async def predict_all(
@@ -493,16 +641,12 @@ async def predict_all(
                 else:
                     summary_dict[key] = value
 
-            predictions_by_lead_time = {}
-            for lead, preds in results.get('predictions_by_lead_time', {}).items():
-                predictions_by_lead_time[lead] = [Prediction(**p) for p in preds]
-
             return HistoricalPredictionResults(
                 status="completed",
                 timestamp=datetime.now().isoformat(),
                 lead_times=lead_time_list,
                 total_predictions=results.get('total_predictions', 0),
-                predictions_by_lead_time=predictions_by_lead_time,
+                predictions_by_lead_time=results.get('predictions_by_lead_time', {}),
                 skipped_cached=results.get('skipped_cached', 0),
                 errors=results.get('errors', []),
                 summary=summary_dict,
@@ -560,9 +704,9 @@ async def script_predict_all_status():
         if not os.path.exists(status_file):
             raise HTTPException(status_code=404, detail='No status file found')
         try:
-            with open(status_file, 'r') as fh:
+            with open(status_file, 'rb') as fh:
                 data = fh.read()
-            return json.loads(data)
+            return loads(data)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -641,162 +785,178 @@ async def rule_based_dispatch(
 
     last_prediction_summary: Optional[Dict[str, Any]] = None
 
-    # Get prediction based on as_of_date or latest
-    if as_of_date:
-        # When as_of_date is provided, generate fresh predictions using data up to that date
-        # (same behavior as /predict endpoint to ensure consistency)
-        logger.info(f"Generating fresh predictions for as_of_date={as_of_date}, lead_time={lead_time}")
-        try:
-            from datetime import datetime, timedelta
-            # Validate date format
-            base_date = datetime.strptime(as_of_date, '%Y-%m-%d')
+    # Zones and resource types don't depend on the prediction; start both reads
+    # now on separate pooled connections so they overlap with the prediction
+    # lookup below instead of adding sequential round-trips after it.
+    zones_task = asyncio.ensure_future(asyncio.to_thread(get_all_zones, VULNERABILITY_WEIGHTS))
+    resources_task = asyncio.ensure_future(asyncio.to_thread(get_all_resource_types))
 
-            # Get raw data up to the as_of_date (same logic as /predict endpoint)
-            raw_data = get_all_raw_data()
-            if raw_data is None or raw_data.empty:
-                raise HTTPException(status_code=404, detail="No raw data found")
+    async def _require_zone_rows() -> List[Dict[str, Any]]:
+        # Awaited before any prediction is generated so a request that can't
+        # produce a plan fails without loading raw data or running the models.
+        rows = await zones_task
+        if not rows:
+            raise HTTPException(status_code=500, detail="No zone metadata available")
+        return rows
 
-            # Filter data up to the as_of_date
-            filter_date = pd.to_datetime(as_of_date)
-            raw_data = raw_data[raw_data['date'] <= filter_date]
+    try:
+        # Get prediction based on as_of_date or latest
+        if as_of_date:
+            await _require_zone_rows()
+            # When as_of_date is provided, generate fresh predictions using data up to that date
+            # (same behavior as /predict endpoint to ensure consistency)
+            logger.info(f"Generating fresh predictions for as_of_date={as_of_date}, lead_time={lead_time}")
+            try:
+                from datetime import datetime, timedelta
+                # Validate date format
+                base_date = datetime.strptime(as_of_date, '%Y-%m-%d')
 
-            if len(raw_data) < 30:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient data for {as_of_date}: need 30 days, got {len(raw_data)}"
-                )
+                # Get raw data up to the as_of_date (same logic as /predict endpoint)
+                raw_data = await asyncio.to_thread(_load_raw_data, as_of_date)
 
-            # Generate fresh prediction using the prediction service
-            from .prediction_service import predict_next_days
-            predictions = predict_next_days(raw_data, lead_times=[lead_time])
+                if len(raw_data) < 30:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Insufficient data for {as_of_date}: need 30 days, got {len(raw_data)}"
+                    )
 
-            if not predictions or len(predictions) == 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to generate prediction for historical date"
-                )
+                # Generate fresh prediction using the prediction service
+                predictions = await _run_predictions(raw_data, [lead_time])
 
-            # Convert to dict format compatible with downstream processing
-            pred = predictions[0]
-            if hasattr(pred, "model_dump"):
-                pred = pred.model_dump()
+                if not predictions or len(predictions) == 0:
+                    raise HTTPException(
+                        status_code=500,
+                        detail="Failed to generate prediction for historical date"
+                    )
 
-            latest = pred
+                # Convert to dict format compatible with downstream processing
+                pred = predictions[0]
+                if hasattr(pred, "model_dump"):
+                    pred = pred.model_dump()
 
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid as_of_date format. Use YYYY-MM-DD")
-        except Exception as e:
-            logger.error(f"Failed to generate prediction for {as_of_date}: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to generate prediction: {str(e)}")
-    else:
-        # Get latest prediction (existing behavior)
-        latest = get_latest_prediction(days_ahead=lead_time)
+                latest = pred
 
-    # Use explicit override if provided
-    if global_pf is not None:
-        try:
-            global_pf = float(global_pf)
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid global_pf value")
-        global_pf = max(0.0, min(1.0, global_pf))
-    else:
-        # If there's no cached prediction for this lead time, attempt to generate
-        # one by running the prediction pipeline on the last 30 days of data.
-        if latest is None:
-            logger.info("No cached prediction for %s-day horizon; attempting to generate one", lead_time)
-            raw_data = get_last_30_days_raw_data()
-            if raw_data is None or len(raw_data) < 30:
-                raise HTTPException(
-                    status_code=404,
-                    detail=(
-                        f"No cached prediction found for the {lead_time}-day horizon and insufficient raw data to generate prediction "
-                        f"(need 30 days). Provide `global_pf` override or populate predictions."
-                    ),
-                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid as_of_date format. Use YYYY-MM-DD")
+            except Exception as e:
+                logger.error(f"Failed to generate prediction for {as_of_date}: {e}")
+                raise HTTPException(status_code=500, detail=f"Failed to generate prediction: {str(e)}")
+        else:
+            # Get latest prediction (existing behavior)
+            latest = await asyncio.to_thread(get_latest_prediction, days_ahead=lead_time)
 
-            # Generate prediction(s) for requested lead time and cache them
+        # Use explicit override if provided
+        if global_pf is not None:
             try:
-                preds = predict_next_days(raw_data, lead_times=[lead_time])
-                logger.info("Generated predictions for lead_time=%s: %s", lead_time, preds)
-            except Exception as e:
-                logger.error("Failed to generate predictions on-the-fly: %s", e)
-                raise HTTPException(status_code=500, detail=f"Failed to generate prediction: {e}")
+                global_pf = float(global_pf)
+            except Exception:
+                raise HTTPException(status_code=400, detail="Invalid global_pf value")
+            global_pf = max(0.0, min(1.0, global_pf))
+        else:
+            # If there's no cached prediction for this lead time, attempt to generate
+            # one by running the prediction pipeline on the last 30 days of data.
+            if latest is None:
+                logger.info("No cached prediction for %s-day horizon; attempting to generate one", lead_time)
+                raw_data = await asyncio.to_thread(get_last_30_days_raw_data)
+                if raw_data is None or len(raw_data) < 30:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=(
+                            f"No cached prediction found for the {lead_time}-day horizon and insufficient raw data "
+                            f"to generate prediction (need 30 days). "
+                            f"Provide `global_pf` override or populate predictions."
+                        ),
+                    )
+
+                # Generate prediction(s) for requested lead time and cache them
+                await _require_zone_rows()
+                try:
+                    preds = await _run_predictions(raw_data, [lead_time])
+                    logger.info("Generated predictions for lead_time=%s: %s", lead_time, preds)
+                except Exception as e:
+                    logger.error("Failed to generate predictions on-the-fly: %s", e)
+                    raise HTTPException(status_code=500, detail=f"Failed to generate prediction: {e}")
 
-            # Re-fetch latest after generation
-            latest = get_latest_prediction(days_ahead=lead_time)
+                # Re-fetch latest after generation
+                latest = await asyncio.to_thread(get_latest_prediction, days_ahead=lead_time)
 
-        if latest is None:
-            # If still missing, fail explicitly
-            raise HTTPException(
-                status_code=404,
-                detail=f"No cached prediction available for the {lead_time}-day horizon",
-            )
+            if latest is None:
+                # If still missing, fail explicitly
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No cached prediction available for the {lead_time}-day horizon",
+                )
 
-        # Handle both cached predictions and fresh predictions (from predict_next_days)
-        if as_of_date and 'forecast' in latest:
-            # Fresh prediction structure from predict_next_days
-            forecast = latest.get('forecast', {})
-            flood_risk = latest.get('flood_risk', {})
-
-            selected_level = forecast.get('median')
-            level_source = "median"
-            selected_probability = flood_risk.get('probability', 0.0)
-
-            # Apply scenario adjustments to fresh predictions
-            prediction_interval = latest.get('prediction_interval_80pct', {})
-            if scenario == RuleScenario.BEST and prediction_interval.get('lower') is not None:
-                selected_level = prediction_interval.get('lower')
-                level_source = "prediction_interval_lower"
-            elif scenario == RuleScenario.WORST and prediction_interval.get('upper') is not None:
-                selected_level = prediction_interval.get('upper')
-                level_source = "prediction_interval_upper"
-
-            last_prediction_summary = {
-                "predicted_level": selected_level,
-                "lower_bound_80": prediction_interval.get('lower'),
-                "upper_bound_80": prediction_interval.get('upper'),
-                "flood_probability": selected_probability,
-                "days_ahead": lead_time,
-                "lead_time_days": lead_time,
-                "date": as_of_date,
-                "forecast_date": (datetime.strptime(as_of_date, '%Y-%m-%d') + timedelta(days=lead_time)).strftime('%Y-%m-%d'),
-                "scenario": scenario.value,
-                "selected_level": selected_level,
-                "selected_level_source": level_source,
-                "selected_probability": selected_probability,
-            }
-        else:
-            # Cached prediction structure (existing behavior)
-            selected_level, level_source, selected_probability = _resolve_prediction_from_cached(latest, scenario)
-            last_prediction_summary = {
-                **latest,
-                "scenario": scenario.value,
-                "selected_level": selected_level,
-                "selected_level_source": level_source,
-                "selected_probability": selected_probability,
-            }
+            # Handle both cached predictions and fresh predictions (from predict_next_days)
+            if as_of_date and 'forecast' in latest:
+                # Fresh prediction structure from predict_next_days
+                forecast = latest.get('forecast', {})
+                flood_risk = latest.get('flood_risk', {})
+
+                selected_level = forecast.get('median')
+                level_source = "median"
+                selected_probability = flood_risk.get('probability', 0.0)
+
+                # Apply scenario adjustments to fresh predictions
+                prediction_interval = latest.get('prediction_interval_80pct', {})
+                if scenario == RuleScenario.BEST and prediction_interval.get('lower') is not None:
+                    selected_level = prediction_interval.get('lower')
+                    level_source = "prediction_interval_lower"
+                elif scenario == RuleScenario.WORST and prediction_interval.get('upper') is not None:
+                    selected_level = prediction_interval.get('upper')
+                    level_source = "prediction_interval_upper"
+
+                last_prediction_summary = {
+                    "predicted_level": selected_level,
+                    "lower_bound_80": prediction_interval.get('lower'),
+                    "upper_bound_80": prediction_interval.get('upper'),
+                    "flood_probability": selected_probability,
+                    "days_ahead": lead_time,
+                    "lead_time_days": lead_time,
+                    "date": as_of_date,
+                    "forecast_date": (
+                        datetime.strptime(as_of_date, '%Y-%m-%d') + timedelta(days=lead_time)
+                    ).strftime('%Y-%m-%d'),
+                    "scenario": scenario.value,
+                    "selected_level": selected_level,
+                    "selected_level_source": level_source,
+                    "selected_probability": selected_probability,
+                }
+            else:
+                # Cached prediction structure (existing behavior)
+                selected_level, level_source, selected_probability = _resolve_prediction_from_cached(latest, scenario)
+                last_prediction_summary = {
+                    **latest,
+                    "scenario": scenario.value,
+                    "selected_level": selected_level,
+                    "selected_level_source": level_source,
+                    "selected_probability": selected_probability,
+                }
 
-        global_pf = max(0.0, min(1.0, selected_probability))
-        logger.debug(
-            "Rule-based dispatch scenario=%s used level=%.2f (%s) with pf=%.3f",
-            scenario.value,
-            selected_level,
-            level_source,
-            selected_probability,
-        )
+            global_pf = max(0.0, min(1.0, selected_probability))
+            logger.debug(
+                "Rule-based dispatch scenario=%s used level=%.2f (%s) with pf=%.3f",
+                scenario.value,
+                selected_level,
+                level_source,
+                selected_probability,
+            )
 
-    zone_rows = get_all_zones()
-    if not zone_rows:
-        raise HTTPException(status_code=500, detail="No zone metadata available")
+        zone_rows = await _require_zone_rows()
+        resource_data = await resources_task
+    except BaseException:
+        # Early exits (HTTPException included) must not orphan the metadata reads
+        await _cancel_pending(zones_task, resources_task)
+        raise
 
-    pf_by_zone = compute_pf_by_zone_from_global(zone_rows, global_pf)
-    zones = build_zones_from_data(zone_rows, pf_by_zone)
+    pf_by_zone, zones = zones_for_global_pf(zone_rows, global_pf)
     zone_lookup = {zone.id: zone for zone in zones}
+    zone_metrics = _zone_metrics(zones, pf_by_zone)
+    vuln_categories = _vuln_categories({zone_id: metrics[1] for zone_id, metrics in zone_metrics.items()})
     
     # Get resource capacities if using optimizer
     resource_capacities = None
     if use_optimizer:
-        resource_data = get_all_resource_types()
         resource_capacities = {r["resource_id"]: r.get("capacity", 0) for r in resource_data}
     # Force fuzzy heuristic allocation regardless of the `mode` query param.
     # The optimizer path (`use_optimizer=True`) is still respected.
@@ -823,29 +983,14 @@ async def rule_based_dispatch(
         impact_key = impact if isinstance(impact, str) else ""
         impact_color = IMPACT_COLOR_MAP.get(impact_key, DEFAULT_IMPACT_COLOR)
 
-        pf_val = round(pf_by_zone.get(zone_id, 0.0), 4)
         zone_meta = zone_lookup.get(zone_id)
-        vulnerability = round(zone_meta.vulnerability, 3) if zone_meta else None
         is_critical_infra = zone_meta.is_critical_infra if zone_meta else None
+        if zone_id in zone_metrics:
+            pf_val, vulnerability, impact_factor = zone_metrics[zone_id]
+        else:
+            pf_val, vulnerability, impact_factor = round(pf_by_zone.get(zone_id, 0.0), 4), None, 0.0
 
-        # Impact factor (iz) = pf * vulnerability
-        try:
-            vuln_val = float(vulnerability or 0.0)
-            impact_factor = round(pf_val * vuln_val, 4)
-        except Exception:
-            impact_factor = None
-
-        # Simple vulnerability category: LOW / MEDIUM / HIGH
-        def _vuln_category(v: Optional[float]) -> Optional[str]:
-            if v is None:
-                return None
-            if v < 0.33:
-                return "LOW"
-            if v < 0.66:
-                return "MEDIUM"
-            return "HIGH"
-
-        vulnerability_category = _vuln_category(vulnerability)
+        vulnerability_category = vuln_categories.get(zone_id)
 
         allocation_model = Allocation(
             zone_id=zone_id,
@@ -874,8 +1019,7 @@ async def rule_based_dispatch(
     total_allocated_units = sum(zone.get("units_allocated", 0) for zone in dispatch)
 
     # Get resource type metadata
-    resource_metadata_raw = get_all_resource_types()
-    resource_metadata = {r["resource_id"]: ResourceType(**r) for r in resource_metadata_raw}
+    resource_metadata = {r["resource_id"]: ResourceType(**r) for r in resource_data}
 
     # Extract fairness level if using optimizer
     fairness_level = None
@@ -911,30 +1055,49 @@ async def rule_based_dispatch(
     )
 
 
+# Zone metadata only changes through the admin endpoints, so dashboards may
+# reuse a response briefly and then revalidate it against the ETag.
+ZONES_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header lists ``etag`` (weak or strong) or ``*``."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
 @app.get("/zones", response_model=ApiResponse)
-async def zones():
+async def zones(if_none_match: Optional[str] = Header(None)):
     """
     Return zones from the database (without geometry) to drive UI lists/filters.
-    """
-    from .db import get_connection
-    query = """
-        SELECT zone_id, name, river_proximity, elevation_risk, pop_density,
-               crit_infra_score, hospital_count, critical_infra
-        FROM zones
-        ORDER BY zone_id
+
+    Responses carry an ETag over the zone rows; a matching If-None-Match gets
+    an empty 304 instead of the payload.
     """
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
-        engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine)
-        return ApiResponse(
-            success=True,
-            message="Zones retrieved successfully",
-            data={"rows": _safe_df_records(df)}
-        )
+        # Shared TTL-cached reader: plain dict rows with float scores, so
+        # repeat requests skip both the query and the DataFrame round-trip
+        rows = await asyncio.to_thread(get_all_zones)
+        if rows is None:
+            # A failed read must not be tagged and cached as an empty list
+            raise HTTPException(status_code=500, detail="Failed to load zones: database unavailable")
+        rows_json = _dumps_json(rows)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load zones: {e}")
 
+    # The envelope carries a timestamp, so only the rows go into the tag
+    etag = f'"{hashlib.blake2b(rows_json, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": ZONES_CACHE_CONTROL}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    head, tail = _api_response_parts("Zones retrieved successfully")
+    return Response(head + rows_json + tail, media_type="application/json", headers=headers)
+
 
 @app.get("/resource-types", response_model=ApiResponse)
 async def resource_types():
@@ -942,7 +1105,7 @@ async def resource_types():
     Return all available resource types with metadata (name, description, icon).
     """
     try:
-        resources = get_all_resource_types()
+        resources = await asyncio.to_thread(get_all_resource_types)
         if not resources:
             raise HTTPException(status_code=404, detail="No resource types found")
         return ApiResponse(
@@ -966,20 +1129,24 @@ async def update_resource_capacities(update: ResourceCapacityUpdate):
     from .db import get_connection
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        updated_count = 0
-        for resource_id, capacity in update.capacities.items():
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            # One UPDATE joined against a VALUES list instead of a round-trip
+            # per resource type
+            rows = list(update.capacities.items())
+            placeholders = ", ".join(["(%s, %s::integer)"] * len(rows))
             cursor.execute(
-                "UPDATE resource_types SET capacity = %s WHERE resource_id = %s",
-                (capacity, resource_id)
+                f"""
+                UPDATE resource_types AS r
+                SET capacity = v.capacity
+                FROM (VALUES {placeholders}) AS v(resource_id, capacity)
+                WHERE r.resource_id = v.resource_id
+                """,
+                [value for row in rows for value in row]
             )
-            updated_count += cursor.rowcount
+            updated_count = cursor.rowcount
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+        clear_metadata_cache()
 
         logger.info(f"Updated {updated_count} resource capacities")
 
@@ -998,76 +1165,75 @@ async def update_resource_capacities(update: ResourceCapacityUpdate):
         raise HTTPException(status_code=500, detail=f"Failed to update capacities: {e}")
 
 
+# The gauge rows are static, so they are encoded once and spliced into each
+# response's (timestamped) envelope
+_GAUGE_ROWS_JSON = _dumps_json(list(GAUGES))
+
+
 @app.get("/gauges", response_model=ApiResponse)
 async def gauges():
     """
-    Return fixed gauge locations (from DataFetcher config).
+    Return fixed gauge locations (from the DataFetcher station config).
     """
-    fetcher = DataFetcher()
-    gauges = []
-    for key, station in fetcher.stations.items():
-        gauges.append({
-            "id": key,
-            "name": station["name"],
-            "lat": station["lat"],
-            "lon": station["lon"],
-            "usgs_id": station["id"],
-        })
-    return ApiResponse(
-        success=True,
-        message="Gauges retrieved successfully",
-        data={"rows": gauges}
-    )
+    head, tail = _api_response_parts("Gauges retrieved successfully")
+    return Response(content=head + _GAUGE_ROWS_JSON + tail, media_type="application/json")
+
+
+# Postgres assembles the finished FeatureCollection and hands it back as one
+# text value, so the payload is never decoded, rebuilt as models and
+# re-encoded in Python. Only the geometry member of the stored feature is
+# used; the no-geometry variant skips reading the JSONB column entirely.
+# Both variants are built once rather than per request.
+_ZONES_GEO_SQL_TEMPLATE = """
+    SELECT json_build_object(
+        'type', 'FeatureCollection',
+        'features', COALESCE(json_agg(json_build_object(
+            'type', 'Feature',
+            'geometry', {geometry_column},
+            'properties', json_build_object(
+                'zone_id', zz.zone_id,
+                'name', z.name,
+                'river_proximity', z.river_proximity::float8,
+                'elevation_risk', z.elevation_risk::float8,
+                'pop_density', z.pop_density::float8,
+                'crit_infra_score', z.crit_infra_score::float8,
+                'hospital_count', z.hospital_count,
+                'critical_infra', COALESCE(z.critical_infra, false)
+            )
+        )), '[]'::json)
+    )::text AS feature_collection
+    FROM zip_geojson zg
+    JOIN zip_zones zz ON zz.zip_code = zg.zip_code
+    LEFT JOIN zones z ON z.zone_id = zz.zone_id
+"""
+_ZONES_GEO_SQL = {
+    True: _ZONES_GEO_SQL_TEMPLATE.format(
+        geometry_column=(
+            "CASE WHEN jsonb_typeof(zg.geojson) = 'object' "
+            "THEN COALESCE(zg.geojson->'geometry', zg.geojson) ELSE '{}'::jsonb END"
+        )
+    ),
+    False: _ZONES_GEO_SQL_TEMPLATE.format(geometry_column="NULL"),
+}
 
 
 @app.get("/zones-geo", response_model=GeoJsonFeatureCollection)
-async def zones_geo():
+async def zones_geo(
+    geometry: Literal["full", "none"] = Query(
+        "full",
+        description="'full' returns ZIP polygons; 'none' returns only zone properties (much smaller payload)",
+    )
+):
     """
     Return GeoJSON features for zones using zip_geojson joined with zones/zip_zones.
     """
-    from .db import get_connection
-    query = """
-        SELECT
-            zg.geojson,
-            zz.zone_id,
-            z.name,
-            z.river_proximity,
-            z.elevation_risk,
-            z.pop_density,
-            z.crit_infra_score,
-            z.hospital_count,
-            z.critical_infra
-        FROM zip_geojson zg
-        JOIN zip_zones zz ON zz.zip_code = zg.zip_code
-        LEFT JOIN zones z ON z.zone_id = zz.zone_id
-    """
+    include_geometry = geometry == "full"
     try:
-        # Use SQLAlchemy engine to avoid pandas warning
-        engine = get_sqlalchemy_engine()
-        df = pd.read_sql_query(query, engine)
-
-        features = []
-        for _, row in df.iterrows():
-            geo = row["geojson"]
-            if isinstance(geo, str):
-                geo = json.loads(geo)
-            # Normalize to Feature shape
-            feature = GeoJsonFeature(
-                geometry=geo.get("geometry", geo if isinstance(geo, dict) else {}),
-                properties={
-                    "zone_id": row["zone_id"],
-                    "name": row["name"],
-                    "river_proximity": float(row["river_proximity"]) if row["river_proximity"] is not None else None,
-                    "elevation_risk": float(row["elevation_risk"]) if row["elevation_risk"] is not None else None,
-                    "pop_density": float(row["pop_density"]) if row["pop_density"] is not None else None,
-                    "crit_infra_score": float(row["crit_infra_score"]) if row["crit_infra_score"] is not None else None,
-                    "hospital_count": int(row["hospital_count"]) if row["hospital_count"] is not None else None,
-                    "critical_infra": bool(row["critical_infra"]) if row["critical_infra"] is not None else False,
-                },
-            )
-            features.append(feature)
-
-        return GeoJsonFeatureCollection(features=features)
+        rows = await asyncio.to_thread(
+            fetch_records, _ZONES_GEO_SQL[include_geometry], timeout_ms=DB_BULK_READ_TIMEOUT_MS
+        )
+        # Already-serialized GeoJSON: returned as-is, bypassing response_model
+        return Response(content=rows[0]["feature_collection"], media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load zone geometries: {e}")
 
@@ -1100,30 +1266,34 @@ async def predict(
     try:
         logger.info(f"Prediction request received (use_real_time_api={use_real_time_api}, as_of_date={as_of_date})")
 
+        # Serve repeated database-backed requests from cache while the
+        # underlying data is unchanged. The one raw_data version lookup also
+        # keys the raw_data frame cache below.
+        cache_key = None
+        raw_data_version = None
+        if not use_real_time_api:
+            raw_data_version = await asyncio.to_thread(get_raw_data_version)
+            if raw_data_version is not None and PREDICT_CACHE_TTL > 0:
+                cache_key = (as_of_date, raw_data_version)
+                with PREDICT_CACHE_LOCK:
+                    cached = PREDICT_CACHE.get(cache_key)
+                if cached is not None and time.monotonic() - cached[0] < PREDICT_CACHE_TTL:
+                    logger.info(f"Serving cached prediction response for {cache_key}")
+                    return cached[1]
+
         # Get input data
         if use_real_time_api:
             logger.info("Fetching data from real-time APIs...")
-            from Programs.data_fetcher import get_latest_data
             raw_data = get_latest_data()
             data_source = "real-time APIs (USGS, Open-Meteo)"
         else:
             logger.info("Fetching data from database...")
             if as_of_date:
-                # Get all data and filter up to as_of_date
-                raw_data = get_all_raw_data()
-                if raw_data is None or raw_data.empty:
-                    raise HTTPException(status_code=404, detail="No raw data found")
-
-                # Parse the date and filter
-                try:
-                    filter_date = pd.to_datetime(as_of_date)
-                    raw_data = raw_data[raw_data['date'] <= filter_date]
-                    data_source = f"database (raw_data table as of {as_of_date})"
-                except ValueError:
-                    raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+                raw_data = await asyncio.to_thread(_load_raw_data, as_of_date, raw_data_version)
+                data_source = f"database (raw_data table as of {as_of_date})"
             else:
                 # Get all data for full historical view
-                raw_data = get_all_raw_data()
+                raw_data = await asyncio.to_thread(get_all_raw_data, raw_data_version)
                 data_source = "database (raw_data table)"
 
         if raw_data is None or len(raw_data) < 30:
@@ -1135,7 +1305,7 @@ async def predict(
         logger.info(f"Retrieved {len(raw_data)} days of data from {data_source}")
 
         # Generate predictions for 1, 2, and 3 days (now returns Pydantic models directly)
-        predictions = predict_next_days(raw_data, lead_times=[1, 2, 3])
+        predictions = await _run_predictions(raw_data, [1, 2, 3])
 
         logger.info(f"Successfully generated {len(predictions)} predictions")
 
@@ -1144,9 +1314,17 @@ async def predict(
             timestamp=datetime.now().isoformat(),
             use_real_time_api=use_real_time_api,
             data_source=data_source,
-            predictions=[pred.model_dump() for pred in predictions]
+            predictions=predictions
         )
 
+        if cache_key is not None:
+            now = time.monotonic()
+            with PREDICT_CACHE_LOCK:
+                # Drop expired entries so the cache stays bounded
+                for key in [k for k, (ts, _) in PREDICT_CACHE.items() if now - ts >= PREDICT_CACHE_TTL]:
+                    del PREDICT_CACHE[key]
+                PREDICT_CACHE[cache_key] = (now, response)
+
         return response
 
     except HTTPException:
@@ -1159,6 +1337,13 @@ async def predict(
         )
 
 
+# Zone columns the parameters endpoint may write
+_ZONE_UPDATE_FIELDS = frozenset({
+    'river_proximity', 'elevation_risk', 'pop_density', 'crit_infra_score',
+    'hospital_count', 'critical_infra', 'name',
+})
+
+
 @app.put("/zones/parameters", response_model=ApiResponse)
 async def update_zone_parameters(update: ZoneParametersUpdate):
     """
@@ -1167,30 +1352,26 @@ async def update_zone_parameters(update: ZoneParametersUpdate):
     from .db import get_connection
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        updated_count = 0
-        for zone_id, params in update.zones.items():
-            # Build dynamic update query
-            set_clauses = []
-            values = []
-
-            for field, value in params.items():
-                if field in ['river_proximity', 'elevation_risk', 'pop_density', 'crit_infra_score',
-                           'hospital_count', 'critical_infra', 'name']:
-                    set_clauses.append(f"{field} = %s")
-                    values.append(value)
-
-            if set_clauses:
-                values.append(zone_id)
-                query = f"UPDATE zones SET {', '.join(set_clauses)} WHERE zone_id = %s"
-                cursor.execute(query, values)
-                updated_count += cursor.rowcount
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with closing(get_connection()) as conn, closing(conn.cursor()) as cursor:
+            updated_count = 0
+            for zone_id, params in update.zones.items():
+                # Build dynamic update query
+                set_clauses = []
+                values = []
+
+                for field, value in params.items():
+                    if field in _ZONE_UPDATE_FIELDS:
+                        set_clauses.append(f"{field} = %s")
+                        values.append(value)
+
+                if set_clauses:
+                    values.append(zone_id)
+                    query = f"UPDATE zones SET {', '.join(set_clauses)} WHERE zone_id = %s"
+                    cursor.execute(query, values)
+                    updated_count += cursor.rowcount
+
+            conn.commit()
+        clear_metadata_cache()
 
         logger.info(f"Updated parameters for {updated_count} zones")
 
@@ -1215,14 +1396,14 @@ async def get_thresholds():
     Get current flood threshold configuration.
     """
     try:
-        from .db import get_threshold_config, ensure_default_threshold_config
+        from .db import get_threshold_config
 
         # Get threshold configuration from database
-        thresholds = get_threshold_config('default')
+        thresholds = await asyncio.to_thread(get_threshold_config, 'default')
 
         # If no configuration exists, create default one
         if thresholds is None:
-            thresholds = ensure_default_threshold_config()
+            thresholds = await asyncio.to_thread(ensure_default_threshold_config)
 
         return ApiResponse(
             success=True,
@@ -1242,21 +1423,10 @@ async def update_thresholds(update: ThresholdConfig):
     Update flood threshold configuration.
     """
     try:
-        from .db import update_threshold_config, create_threshold_config, get_threshold_config
-
-        # Check if configuration exists
-        existing_config = get_threshold_config('default')
+        # One INSERT ... ON CONFLICT instead of probing for the row first
+        action = await asyncio.to_thread(upsert_threshold_config, update, 'default', 'administrator')
 
-        if existing_config:
-            # Update existing configuration
-            success = update_threshold_config(update, 'default', 'administrator')
-            action = "updated"
-        else:
-            # Create new configuration
-            success = create_threshold_config(update, 'default', 'administrator')
-            action = "created"
-
-        if success:
+        if action is not None:
             logger.info(f"Successfully {action} threshold configuration")
             return ApiResponse(
                 success=True,
@@ -1268,7 +1438,7 @@ async def update_thresholds(update: ThresholdConfig):
         else:
             raise HTTPException(
                 status_code=500,
-                detail=f"Failed to {action.rstrip('d')} threshold configuration"
+                detail="Failed to save threshold configuration"
             )
 
     except Exception as e:
@@ -1276,13 +1446,23 @@ async def update_thresholds(update: ThresholdConfig):
         raise HTTPException(status_code=500, detail=f"Failed to update thresholds: {e}")
 
 
+@app.get("/debug/pool", response_model=ApiResponse)
+async def debug_pool():
+    """Report database connection pool usage."""
+    try:
+        status = get_pool_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read pool status: {e}")
+    return ApiResponse(success=True, message="Pool status retrieved successfully", data=status)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health():
     """Health check endpoint"""
     try:
         # Try to connect to database
         from .db import test_connection
-        db_healthy = test_connection()
+        db_healthy = await asyncio.to_thread(test_connection)
 
         status = "healthy" if db_healthy else "degraded"
         db_status = "connected" if db_healthy else "disconnected"
@@ -0,0 +1,22 @@
+"""
+Optional numba JIT for the numeric kernels in app.prediction and app.rule_based.
+
+numba is optional: when it is installed njit() compiles the decorated function
+eagerly for its signature, otherwise the function is left as plain Python.
+"""
+from typing import Callable
+
+try:
+    from numba import njit as _numba_njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def njit(signature: str) -> Callable[[Callable], Callable]:
+    """Decorator compiling a kernel for signature (cached on disk), or a no-op without numba."""
+    def decorate(func: Callable) -> Callable:
+        if not HAS_NUMBA:
+            return func
+        return _numba_njit(signature, cache=True)(func)
+    return decorate
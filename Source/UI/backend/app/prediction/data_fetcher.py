@@ -10,36 +10,59 @@ from datetime import datetime, timedelta
 import time
 import urllib3
 
+from ..json_compat import loads
+
 # Suppress SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# USGS station IDs with coordinates
+STATIONS = {
+    'target': {
+        'id': '07010000',
+        'name': 'Mississippi River at St. Louis, MO',
+        'lat': 38.6270,
+        'lon': -90.1994
+    },
+    'hermann': {
+        'id': '06934500',
+        'name': 'Missouri River at Hermann, MO',
+        'lat': 38.7098,
+        'lon': -91.4385
+    },
+    'grafton': {
+        'id': '05587450',
+        'name': 'Mississippi River at Grafton, IL',
+        'lat': 38.9680,
+        'lon': -90.4290
+    },
+}
+
+
+def _parse_json(response):
+    """Decode a JSON HTTP response body."""
+    return loads(response.content)
+
+
+# Gauge rows served by the API, derived once from the station config
+GAUGES = tuple(
+    {
+        'id': key,
+        'name': station['name'],
+        'lat': station['lat'],
+        'lon': station['lon'],
+        'usgs_id': station['id'],
+    }
+    for key, station in STATIONS.items()
+)
+
+
 class DataFetcher:
     """
     Fetches real-time data from USGS and weather APIs
     """
     
     def __init__(self):
-        # USGS station IDs with coordinates
-        self.stations = {
-            'target': {
-                'id': '07010000',
-                'name': 'Mississippi River at St. Louis, MO',
-                'lat': 38.6270,
-                'lon': -90.1994
-            },
-            'hermann': {
-                'id': '06934500',
-                'name': 'Missouri River at Hermann, MO',
-                'lat': 38.7098,
-                'lon': -91.4385
-            },
-            'grafton': {
-                'id': '05587450',
-                'name': 'Mississippi River at Grafton, IL',
-                'lat': 38.9680,
-                'lon': -90.4290
-            },
-        }
+        self.stations = STATIONS
         
         # Coordinates for St. Louis (for weather data)
         self.weather_lat = 38.6270
@@ -111,7 +134,7 @@ class DataFetcher:
         try:
             response = requests.get(url, params=params, verify=False, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = _parse_json(response)
             
             daily = data['daily']
             
@@ -161,17 +184,21 @@ class DataFetcher:
                 
                 response = requests.get(url, params=params, timeout=30)
                 response.raise_for_status()
-                data = response.json()
+                data = _parse_json(response)
                 
                 # Parse response
                 if 'value' in data and 'timeSeries' in data['value'] and data['value']['timeSeries']:
                     vals_list = data['value']['timeSeries'][0]['values'][0]['value']
                     
                     if vals_list:
-                        # Load 15-minute data
-                        temp_df = pd.DataFrame(vals_list)
-                        temp_df['value'] = pd.to_numeric(temp_df['value'], errors='coerce')
-                        temp_df['dateTime'] = pd.to_datetime(temp_df['dateTime']).dt.tz_localize(None)
+                        # Load 15-minute data. Build the two typed columns directly
+                        # rather than letting pandas infer a frame from ~3k dicts
+                        # (which also drags along the unused 'qualifiers' lists).
+                        temp_df = pd.DataFrame({
+                            'value': pd.to_numeric([v['value'] for v in vals_list], errors='coerce'),
+                            'dateTime': pd.to_datetime([v['dateTime'] for v in vals_list], cache=True),
+                        }, copy=False)
+                        temp_df['dateTime'] = temp_df['dateTime'].dt.tz_localize(None)
                         
                         # Resample to daily mean (matches training data)
                         temp_df['date'] = temp_df['dateTime'].dt.floor('D')
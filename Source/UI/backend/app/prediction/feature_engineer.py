@@ -6,6 +6,40 @@ import numpy as np
 import os
 from pathlib import Path
 
+from ..numba_compat import njit
+
+
+@njit("Tuple((float64[::1], float64[::1]))(float64[::1], int64[::1], int64[::1])")
+def _window_stats(values, starts, stops):
+    """
+    NaN-skipping sum and mean of values[starts[k]:stops[k]] for every k.
+
+    Mirrors pandas Series.sum()/.mean(): an all-NaN window sums to 0.0 and
+    has a NaN mean.
+    """
+    n = starts.shape[0]
+    sums = np.empty(n, dtype=np.float64)
+    means = np.empty(n, dtype=np.float64)
+    for k in range(n):
+        total = 0.0
+        count = 0
+        for i in range(starts[k], stops[k]):
+            v = values[i]
+            if not np.isnan(v):
+                total += v
+                count += 1
+        sums[k] = total
+        means[k] = total / count if count > 0 else np.nan
+    return sums, means
+
+
+def _windows(ranges, n):
+    """Convert inclusive (start, end) index pairs into clipped start/stop arrays."""
+    starts = np.array([max(0, a) for a, _ in ranges], dtype=np.int64)
+    stops = np.array([min(n, b + 1) for _, b in ranges], dtype=np.int64)
+    return starts, stops
+
+
 class FeatureEngineer:
     """
     Automatically creates all lag features and moving averages
@@ -88,35 +122,68 @@ class FeatureEngineer:
         latest_idx = len(df) - 1
         
         features = {}
+        n = len(df)
+
+        # Pull each column out once as a contiguous float64 array
+        cols = {
+            c: df[c].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+            for c in ['grafton_level', 'hermann_level', 'target_level_max', 'daily_precip',
+                      'daily_temp_avg', 'daily_snowfall', 'daily_humidity', 'daily_wind',
+                      'soil_deep_30d']
+        }
+        precip = cols['daily_precip']
         
         # =====================================================================
         # STEP 1: GENERATE ALL POSSIBLE FEATURES
         # =====================================================================
         
         # Current station levels
-        features['grafton_level'] = df.loc[latest_idx, 'grafton_level']
-        features['hermann_level'] = df.loc[latest_idx, 'hermann_level']
+        features['grafton_level'] = cols['grafton_level'][latest_idx]
+        features['hermann_level'] = cols['hermann_level'][latest_idx]
         
         # Current weather
-        features['daily_precip'] = df.loc[latest_idx, 'daily_precip']
-        features['daily_temp_avg'] = df.loc[latest_idx, 'daily_temp_avg']
-        features['daily_snowfall'] = df.loc[latest_idx, 'daily_snowfall']
-        features['daily_humidity'] = df.loc[latest_idx, 'daily_humidity']
-        features['daily_wind'] = df.loc[latest_idx, 'daily_wind']
+        features['daily_precip'] = precip[latest_idx]
+        features['daily_temp_avg'] = cols['daily_temp_avg'][latest_idx]
+        features['daily_snowfall'] = cols['daily_snowfall'][latest_idx]
+        features['daily_humidity'] = cols['daily_humidity'][latest_idx]
+        features['daily_wind'] = cols['daily_wind'][latest_idx]
+
+        # Window bounds are inclusive (start, end) index pairs; the lagged
+        # windows end at lag_idx + 1, matching the label-based slices the
+        # models were trained against.
+        lags = [lag for lag in range(1, 11) if latest_idx - lag >= 0]
+        precip_ranges = [
+            (latest_idx - 6, latest_idx),
+            (latest_idx - 13, latest_idx),
+            (latest_idx - 29, latest_idx),
+            (latest_idx - 1, latest_idx),
+        ]
+        soil_ranges = [(latest_idx - 29, latest_idx)]
+        for lag in lags:
+            lag_idx = latest_idx - lag
+            precip_ranges += [
+                (lag_idx - 6, lag_idx + 1),
+                (lag_idx - 13, lag_idx + 1),
+                (lag_idx - 29, lag_idx + 1),
+            ]
+            soil_ranges.append((lag_idx - 29, lag_idx + 1))
+
+        precip_sums, _ = _window_stats(precip, *_windows(precip_ranges, n))
+        _, soil_means = _window_stats(cols['soil_deep_30d'], *_windows(soil_ranges, n))
         
         # Precipitation windows
-        features['precip_7d'] = df.loc[max(0, latest_idx-6):latest_idx+1, 'daily_precip'].sum()
-        features['precip_14d'] = df.loc[max(0, latest_idx-13):latest_idx+1, 'daily_precip'].sum()
-        features['precip_30d'] = df.loc[max(0, latest_idx-29):latest_idx+1, 'daily_precip'].sum()
+        features['precip_7d'] = precip_sums[0]
+        features['precip_14d'] = precip_sums[1]
+        features['precip_30d'] = precip_sums[2]
         
         # Soil moisture
-        features['soil_deep_30d'] = df.loc[max(0, latest_idx-29):latest_idx+1, 'soil_deep_30d'].mean()
+        features['soil_deep_30d'] = soil_means[0]
         
         # Heavy rain indicator
         if latest_idx >= 1:
-            precip_48h = df.loc[latest_idx-1:latest_idx+1, 'daily_precip'].sum()
+            precip_48h = precip_sums[3]
         else:
-            precip_48h = df.loc[latest_idx, 'daily_precip']
+            precip_48h = precip[latest_idx]
         features['heavy_rain_48h'] = 1 if precip_48h > 15 else 0
         
         # Generate ALL possible lag features (up to 10 days to cover 2-day and 3-day models)
@@ -124,23 +191,21 @@ class FeatureEngineer:
             lag_idx = latest_idx - lag
             
             if lag_idx >= 0:
+                k = lags.index(lag)
+
                 # Station lags
-                features[f'hermann_lag{lag}d'] = df.loc[lag_idx, 'hermann_level']
-                features[f'grafton_lag{lag}d'] = df.loc[lag_idx, 'grafton_level']
-                features[f'target_lag{lag}d'] = df.loc[lag_idx, 'target_level_max']
+                features[f'hermann_lag{lag}d'] = cols['hermann_level'][lag_idx]
+                features[f'grafton_lag{lag}d'] = cols['grafton_level'][lag_idx]
+                features[f'target_lag{lag}d'] = cols['target_level_max'][lag_idx]
                 
                 # Weather lags
-                features[f'daily_precip_lag{lag}d'] = df.loc[lag_idx, 'daily_precip']
+                features[f'daily_precip_lag{lag}d'] = precip[lag_idx]
                 
                 # Precipitation window lags
-                start_7d = max(0, lag_idx - 6)
-                start_14d = max(0, lag_idx - 13)
-                start_30d = max(0, lag_idx - 29)
-                
-                features[f'precip_7d_lag{lag}d'] = df.loc[start_7d:lag_idx+1, 'daily_precip'].sum()
-                features[f'precip_14d_lag{lag}d'] = df.loc[start_14d:lag_idx+1, 'daily_precip'].sum()
-                features[f'precip_30d_lag{lag}d'] = df.loc[start_30d:lag_idx+1, 'daily_precip'].sum()
-                features[f'soil_deep_30d_lag{lag}d'] = df.loc[start_30d:lag_idx+1, 'soil_deep_30d'].mean()
+                features[f'precip_7d_lag{lag}d'] = precip_sums[4 + 3 * k]
+                features[f'precip_14d_lag{lag}d'] = precip_sums[5 + 3 * k]
+                features[f'precip_30d_lag{lag}d'] = precip_sums[6 + 3 * k]
+                features[f'soil_deep_30d_lag{lag}d'] = soil_means[1 + k]
             else:
                 # Set to NaN if not enough history
                 features[f'hermann_lag{lag}d'] = np.nan
@@ -153,10 +218,12 @@ class FeatureEngineer:
                 features[f'soil_deep_30d_lag{lag}d'] = np.nan
         
         # Moving averages (3, 7, 14 days)
-        for window in [3, 7, 14]:
-            start_idx = max(0, latest_idx - window + 1)
-            features[f'hermann_ma{window}d'] = df.loc[start_idx:latest_idx+1, 'hermann_level'].mean()
-            features[f'grafton_ma{window}d'] = df.loc[start_idx:latest_idx+1, 'grafton_level'].mean()
+        ma_windows = _windows([(latest_idx - w + 1, latest_idx) for w in [3, 7, 14]], n)
+        _, hermann_ma = _window_stats(cols['hermann_level'], *ma_windows)
+        _, grafton_ma = _window_stats(cols['grafton_level'], *ma_windows)
+        for i, window in enumerate([3, 7, 14]):
+            features[f'hermann_ma{window}d'] = hermann_ma[i]
+            features[f'grafton_ma{window}d'] = grafton_ma[i]
         
         # =====================================================================
         # STEP 2: FILTER TO ONLY FEATURES NEEDED BY MODEL (in correct order)
@@ -5,11 +5,37 @@ import xgboost as xgb
 import tensorflow as tf
 from tensorflow.keras.models import load_model
 from scipy.stats import norm
-from scipy.interpolate import interp1d
 from datetime import datetime
 from pathlib import Path
 from .feature_engineer import FeatureEngineer
 from .data_fetcher import get_latest_data
+from ..numba_compat import njit
+
+
+@njit("float64(float64, float64, float64, float64)")
+def _prob_below(q10, q50, q90, threshold):
+    """
+    Piecewise-linear P(level <= threshold) from the (q10, q50, q90) ensemble.
+
+    Same result as np.interp over the knots stably sorted by level, without
+    allocating the three-element arrays on every call.
+    """
+    xs = [q10, q50, q90]
+    fs = [0.10, 0.50, 0.90]
+    # Stable insertion sort, so crossed quantiles keep their original order
+    for i in range(1, 3):
+        j = i
+        while j > 0 and xs[j - 1] > xs[j]:
+            xs[j - 1], xs[j] = xs[j], xs[j - 1]
+            fs[j - 1], fs[j] = fs[j], fs[j - 1]
+            j -= 1
+    if threshold < xs[0]:
+        return fs[0]
+    if threshold >= xs[2]:
+        return fs[2]
+    j = 0 if threshold < xs[1] else 1
+    slope = (fs[j + 1] - fs[j]) / (xs[j + 1] - xs[j])
+    return slope * (threshold - xs[j]) + fs[j]
 
 
 class _PatchedInputLayer(tf.keras.layers.InputLayer):
@@ -125,10 +151,7 @@ class FloodPredictorV2:
         elif threshold >= q90:
             return 0.05
         else:
-            quantiles = np.array([0.10, 0.50, 0.90])
-            levels = np.array([q10, q50, q90])
-            interp_func = interp1d(levels, quantiles, kind='linear', fill_value='extrapolate')
-            prob_below = float(interp_func(threshold))
+            prob_below = float(_prob_below(q10, q50, q90, threshold))
             return 1.0 - np.clip(prob_below, 0.0, 1.0)
     
     def predict_live(self):
@@ -3,14 +3,17 @@ Prediction service - integrates FloodPredictorV2 with database/API
 """
 import sys
 import os
+import threading
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional, Callable, Union
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Sequence, Union
 from datetime import datetime, timedelta
 import logging
 from pathlib import Path
 
 from .prediction.inference_api import FloodPredictorV2
-from .db import insert_prediction, get_prediction
+from .db import insert_predictions, get_prediction
 from .schemas import (
     Prediction,
     Forecast,
@@ -33,6 +36,19 @@ def _model_dir_for_lead(lead_time: int) -> Path:
     return MODEL_BASE_DIR / f"L{lead_time}d" / "models"
 
 
+def _summary_stats(values: List[Optional[float]]) -> Dict[str, Optional[float]]:
+    """min/max/mean/median of the non-None values (all None when there are none)."""
+    arr = np.array([v for v in values if v is not None], dtype=np.float64)
+    if arr.size == 0:
+        return {"min": None, "max": None, "mean": None, "median": None}
+    return {
+        "min": float(arr.min()),
+        "max": float(arr.max()),
+        "mean": float(arr.mean()),
+        "median": float(np.median(arr)),
+    }
+
+
 def _missing_model_files(lead_time: int) -> List[str]:
     """Return the list of missing model files for a given lead time."""
     model_dir = _model_dir_for_lead(lead_time)
@@ -57,6 +73,45 @@ def _missing_model_files(lead_time: int) -> List[str]:
     return missing
 
 
+# Loading the XGBoost/Bayesian/LSTM bundle takes far longer than a single
+# inference, so each lead time is loaded once per process and then shared.
+# The lock keeps concurrent first requests from loading the same models twice;
+# inference itself does not mutate predictor state and is safe to share.
+_PREDICTOR_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _load_predictor(lead_time: int) -> FloodPredictorV2:
+    return FloodPredictorV2(
+        lead_time_days=lead_time,
+        model_dir=str(_model_dir_for_lead(lead_time))
+    )
+
+
+def get_predictor(lead_time: int) -> FloodPredictorV2:
+    """Return the process-wide FloodPredictorV2 for a lead time, loading it on first use."""
+    with _PREDICTOR_LOCK:
+        return _load_predictor(lead_time)
+
+
+def warm_predictors(lead_times: Sequence[int] = (1, 2, 3)) -> List[int]:
+    """Preload predictors for the given lead times, skipping those without model files.
+
+    Returns the lead times that were loaded successfully.
+    """
+    loaded = []
+    for lead_time in lead_times:
+        if _missing_model_files(lead_time):
+            logger.warning(f"Skipping predictor warm-up for L{lead_time}d: model files missing")
+            continue
+        try:
+            get_predictor(lead_time)
+            loaded.append(lead_time)
+        except Exception as e:
+            logger.warning(f"Failed to warm predictor for L{lead_time}d: {e}")
+    return loaded
+
+
 def _create_flood_risk(probability: float, threshold: float = 30.0) -> FloodRisk:
     """Create a FloodRisk model from probability."""
     return FloodRisk(
@@ -154,13 +209,16 @@ def _naive_fallback_prediction(raw_data: pd.DataFrame, lead_time: int) -> Dict[s
     return result
 
 
-def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3]) -> List[Prediction]:
+def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3],
+                      cache_sink: Optional[List[PredictionInsert]] = None) -> List[Prediction]:
     """
     Generate predictions for multiple lead times
     
     Args:
         raw_data: DataFrame with 30 days of historical data
         lead_times: List of lead times in days (e.g., [1, 2, 3])
+        cache_sink: If given, fresh predictions are appended here for the
+            caller to write back instead of being written immediately
     
     Returns:
         List of prediction dictionaries, each containing:
@@ -172,6 +230,8 @@ def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3])
     """
     
     predictions = []
+    # Fresh predictions are written back together once every lead time is done
+    to_cache: List[PredictionInsert] = []
     
     # Get base date (last date in raw data)
     base_date = pd.to_datetime(raw_data['date'].iloc[-1])
@@ -210,10 +270,7 @@ def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3])
                 try:
                     missing = _missing_model_files(lead_time)
                     if not missing:
-                        predictor = FloodPredictorV2(
-                            lead_time_days=lead_time,
-                            model_dir=str(_model_dir_for_lead(lead_time))
-                        )
+                        predictor = get_predictor(lead_time)
                         # Compute full result (intervals, model breakdown)
                         result = predictor.predict_from_raw_data(raw_data)
 
@@ -342,11 +399,8 @@ def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3])
                 })
                 continue
 
-            # Initialize predictor for this lead time (models guaranteed to exist)
-            predictor = FloodPredictorV2(
-                lead_time_days=lead_time,
-                model_dir=str(_model_dir_for_lead(lead_time))
-            )
+            # Reuse the loaded predictor for this lead time (models guaranteed to exist)
+            predictor = get_predictor(lead_time)
 
             # Generate prediction
             result = predictor.predict_from_raw_data(raw_data)
@@ -365,22 +419,20 @@ def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3])
             
             logger.info(f"✓ {lead_time}-day prediction: {result['forecast']['median']} ft")
             
-            # Save to cache (database) - store median forecast and flood probability
+            # Queue for the cache (database) - median forecast and flood probability
             try:
                 pi = result.get('prediction_interval_80pct') or {}
                 lower = pi.get('lower') if isinstance(pi, dict) else None
                 upper = pi.get('upper') if isinstance(pi, dict) else None
 
-                insert_prediction(
-                    forecast_date.strftime('%Y-%m-%d'),
-                    float(result['forecast']['median']),
-                    float(result['flood_risk']['probability']),
+                to_cache.append(PredictionInsert(
+                    forecast_date=forecast_date.strftime('%Y-%m-%d'),
+                    predicted_level=float(result['forecast']['median']),
+                    flood_probability=float(result['flood_risk']['probability']),
                     days_ahead=lead_time,
                     lower_bound_80=lower,
                     upper_bound_80=upper,
-                    model_version=None,
-                    model_type=None,
-                )
+                ))
             except Exception as e:
                 logger.warning(f"Failed to cache prediction for {forecast_date}: {e}")
             
@@ -395,6 +447,14 @@ def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3])
                 'flood_risk': None
             })
     
+    if cache_sink is not None:
+        cache_sink.extend(to_cache)
+    elif to_cache:
+        try:
+            insert_predictions(to_cache)
+        except Exception as e:
+            logger.warning(f"Failed to cache {len(to_cache)} predictions: {e}")
+
     # Convert all predictions to Pydantic models
     typed_predictions = [_create_prediction_from_dict(pred) for pred in predictions]
     return typed_predictions
@@ -402,6 +462,9 @@ def predict_next_days(raw_data: pd.DataFrame, lead_times: List[int] = [1, 2, 3])
 
 from typing import Callable, Optional
 
+# Backfill predictions are written back in pages of this many rows
+HISTORICAL_CACHE_PAGE_SIZE = 500
+
 
 def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool = True,
                             on_progress: Optional[Callable[[dict], None]] = None,
@@ -427,8 +490,7 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
         - summary: Summary statistics
     """
 
-    from .db import get_all_raw_data, get_prediction
-    import numpy as np
+    from .db import get_all_raw_data, get_cached_prediction_keys, get_prediction
 
     logger.info(f"Starting historical prediction for all data (lead_times={lead_times}, skip_cached={skip_cached})")
 
@@ -458,6 +520,10 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
         "summary": {}
     }
 
+    # Load the cached (date, lead time) keys once rather than probing the
+    # database for every window; None falls back to per-row lookups.
+    cached_keys = get_cached_prediction_keys(lead_times) if skip_cached else None
+
     # Process each possible 30-day window
     # Start from index 29 (0-based, so 30 days of data available)
     total_windows = max(0, len(all_data) - 29)
@@ -486,10 +552,24 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
             # Progress callback should not break job execution
             pass
 
+    # Fresh predictions from every window, flushed a page at a time
+    pending_cache: List[PredictionInsert] = []
+
+    def _flush_cache():
+        if not pending_cache:
+            return
+        batch = pending_cache[:]
+        pending_cache.clear()
+        try:
+            insert_predictions(batch)
+        except Exception as e:
+            logger.warning(f"Failed to cache {len(batch)} predictions: {e}")
+
     _maybe_report_progress("Starting")
 
     for i in range(29, len(all_data)):
         if cancel_check and cancel_check():
+            _flush_cache()
             results['errors'].append('Cancelled by user')
             _maybe_report_progress('Cancelled')
             results['summary']['cancelled'] = True
@@ -504,6 +584,7 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
             # Generate predictions for each lead time
             for lead_time in lead_times:
                 if cancel_check and cancel_check():
+                    _flush_cache()
                     results['errors'].append('Cancelled by user')
                     _maybe_report_progress('Cancelled')
                     results['summary']['cancelled'] = True
@@ -512,8 +593,12 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
 
                 # Skip if prediction exists and skip_cached is True
                 if skip_cached:
-                    cached = get_prediction(forecast_date.strftime('%Y-%m-%d'), lead_time)
-                    if cached is not None:
+                    forecast_key = forecast_date.strftime('%Y-%m-%d')
+                    if cached_keys is not None:
+                        is_cached = (forecast_key, lead_time) in cached_keys
+                    else:
+                        is_cached = get_prediction(forecast_key, lead_time) is not None
+                    if is_cached:
                         results["skipped_cached"] += 1
                         completed_steps += 1
                         _maybe_report_progress(f"Skipped cached {forecast_date.date()} +{lead_time}d")
@@ -521,7 +606,9 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
 
                 # Generate prediction using existing function
                 try:
-                    predictions = predict_next_days(window_data, lead_times=[lead_time])
+                    predictions = predict_next_days(window_data, lead_times=[lead_time], cache_sink=pending_cache)
+                    if len(pending_cache) >= HISTORICAL_CACHE_PAGE_SIZE:
+                        _flush_cache()
                     if predictions and len(predictions) > 0:
                         pred = predictions[0]
                         # If `predict_next_days` returned a Pydantic model, convert
@@ -550,27 +637,20 @@ def predict_all_historical(lead_times: List[int] = [1, 2, 3], skip_cached: bool
             results["errors"].append(error_msg)
             continue
 
+    _flush_cache()
+
     # Generate summary statistics
     for lead_time in lead_times:
         preds = results["predictions_by_lead_time"][lead_time]
         if preds:
-            medians = [p.get('forecast', {}).get('median') for p in preds if p.get('forecast', {}).get('median') is not None]
-            probabilities = [p.get('flood_risk', {}).get('probability') for p in preds if p.get('flood_risk', {}).get('probability') is not None]
+            # One lookup per prediction; each series is then reduced as an array
+            medians = [(p.get('forecast') or {}).get('median') for p in preds]
+            probabilities = [(p.get('flood_risk') or {}).get('probability') for p in preds]
 
             results["summary"][f"lead_time_{lead_time}"] = {
                 "count": len(preds),
-                "median_predictions": {
-                    "min": min(medians) if medians else None,
-                    "max": max(medians) if medians else None,
-                    "mean": np.mean(medians) if medians else None,
-                    "median": np.median(medians) if medians else None
-                },
-                "flood_probabilities": {
-                    "min": min(probabilities) if probabilities else None,
-                    "max": max(probabilities) if probabilities else None,
-                    "mean": np.mean(probabilities) if probabilities else None,
-                    "median": np.median(probabilities) if probabilities else None
-                }
+                "median_predictions": _summary_stats(medians),
+                "flood_probabilities": _summary_stats(probabilities),
             }
 
     # Final completion message
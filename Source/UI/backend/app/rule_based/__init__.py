@@ -1,5 +1,10 @@
 from .allocations import RESOURCE_TYPES, build_dispatch_plan, get_resource_types
-from .zones import build_zones_from_data, compute_pf_by_zone_from_global
+from .zones import (
+    VULNERABILITY_WEIGHTS,
+    build_zones_from_data,
+    compute_pf_by_zone_from_global,
+    zones_for_global_pf,
+)
 from ..schemas import Zone
 
 __all__ = [
@@ -7,6 +12,8 @@ __all__ = [
     "RESOURCE_TYPES",
     "get_resource_types",
     "build_dispatch_plan",
+    "VULNERABILITY_WEIGHTS",
     "build_zones_from_data",
     "compute_pf_by_zone_from_global",
+    "zones_for_global_pf",
 ]
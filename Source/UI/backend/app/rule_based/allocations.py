@@ -1,6 +1,10 @@
+from bisect import bisect_right
 from typing import Dict, List, Optional
 import logging
 
+import numpy as np
+
+from ..numba_compat import njit
 from ..schemas import Zone as ZoneModel
 
 logger = logging.getLogger(__name__)
@@ -81,24 +85,42 @@ def recommend_resources_proportional(zone: ZoneModel, total_units: int, iz: floa
 
 # CRISP MODE
 
+# Impact factor thresholds (inclusive lower bounds) of each level after NORMAL
+_IMPACT_THRESHOLDS = (0.3, 0.6, 0.7)
+_IMPACT_LEVEL_NAMES = ("NORMAL", "ADVISORY", "WARNING", "CRITICAL")
+
+
 def classify_impact(pf: float, vulnerability: float) -> str:
-    iz = pf * vulnerability
-    if iz < 0.3:
-        return "NORMAL"
-    if iz < 0.6:
-        return "ADVISORY"
-    if iz < 0.7:
-        return "WARNING"
-    return "CRITICAL"
+    return _IMPACT_LEVEL_NAMES[bisect_right(_IMPACT_THRESHOLDS, pf * vulnerability)]
+
+
+# The same thresholds as np.digitize bins, for classifying many zones at once
+_IMPACT_BINS = np.array(_IMPACT_THRESHOLDS)
+_IMPACT_LEVELS = np.array(_IMPACT_LEVEL_NAMES)
+
+
+def classify_impacts(zones: List[ZoneModel]) -> Dict[str, str]:
+    """Vectorized classify_impact: map each zone id to its impact level."""
+    if not zones:
+        return {}
+    iz = np.array([z.pf * z.vulnerability for z in zones], dtype=np.float64)
+    levels = _IMPACT_LEVELS[np.digitize(iz, _IMPACT_BINS)]
+    return dict(zip((z.id for z in zones), levels.tolist()))
+
+
+# Share of total units per non-critical impact level; anything else is
+# treated as CRITICAL, boosted for zones with critical infrastructure.
+_CRISP_FRACTIONS = {
+    "NORMAL": 0.0,
+    "ADVISORY": 0.1,
+    "WARNING": 0.3,
+}
 
 
 def _crisp_fraction(impact: str, is_critical_infra: bool) -> float:
-    if impact == "NORMAL":
-        return 0.0
-    if impact == "ADVISORY":
-        return 0.1
-    if impact == "WARNING":
-        return 0.3
+    fraction = _CRISP_FRACTIONS.get(impact)
+    if fraction is not None:
+        return fraction
     return 0.6 if is_critical_infra else 0.5
 
 
@@ -119,6 +141,9 @@ def recommend_resources_crisp(zone: ZoneModel, total_units: int) -> Dict:
 
 # FUZZY MODE
 
+# The kernels below are compiled with numba when it is installed; each is
+# compiled as it is defined, so callers pick up the compiled inner kernels.
+@njit("float64(float64, float64, float64, float64)")
 def _tri_mf(x: float, a: float, b: float, c: float) -> float:
     if x <= a or x >= c:
         return 0.0
@@ -129,6 +154,7 @@ def _tri_mf(x: float, a: float, b: float, c: float) -> float:
     return (c - x) / (c - b)
 
 
+@njit("float64(float64, boolean)")
 def _fuzzy_fraction(iz: float, is_critical_infra: bool) -> float:
     mu_normal = _tri_mf(iz, 0.0, 0.0, 0.3)
     mu_advisory = _tri_mf(iz, 0.2, 0.45, 0.7)
@@ -150,6 +176,16 @@ def _fuzzy_fraction(iz: float, is_critical_infra: bool) -> float:
     return max(0.0, min(base, 0.6))
 
 
+@njit("float64[::1](float64[::1], boolean[::1])")
+def _fuzzy_fractions(iz: np.ndarray, critical_infra: np.ndarray) -> np.ndarray:
+    """_fuzzy_fraction for every zone's impact factor and critical-infra flag."""
+    n = iz.shape[0]
+    fractions = np.empty(n, dtype=np.float64)
+    for k in range(n):
+        fractions[k] = _fuzzy_fraction(iz[k], critical_infra[k])
+    return fractions
+
+
 def recommend_resources_fuzzy(zone: ZoneModel, total_units: int) -> Dict:
     iz = zone.pf * zone.vulnerability
     units = int(round(total_units * _fuzzy_fraction(iz, zone.is_critical_infra)))
@@ -438,6 +474,8 @@ def _build_optimized_dispatch(
         fuzzy_need = recommend_resources_fuzzy(z, total_available)["units_allocated"]
         nominal_allocations[zone_id] = float(max(0, fuzzy_need))
 
+    impacts = classify_impacts(zones)
+
     # If every zone has 0 need (e.g., NORMAL everywhere), return empty allocation
     if sum(nominal_allocations.values()) <= 0:
         dispatch = []
@@ -445,7 +483,7 @@ def _build_optimized_dispatch(
             dispatch.append({
                 "zone_id": z.id,
                 "zone_name": z.name,
-                "impact_level": classify_impact(z.pf, z.vulnerability),
+                "impact_level": impacts[z.id],
                 "allocation_mode": "OPTIMIZED",
                 "units_allocated": 0,
                 "priority_index": priorities.get(z.id, {}).get("priority_index", 0.0),
@@ -519,7 +557,7 @@ def _build_optimized_dispatch(
         dispatch.append({
             "zone_id": zone_id,
             "zone_name": z.name,
-            "impact_level": classify_impact(z.pf, z.vulnerability),
+            "impact_level": impacts[z.id],
             "allocation_mode": "OPTIMIZED",
             "units_allocated": total_units_alloc,
             "priority_index": pr.get("priority_index", 0.0),
@@ -553,11 +591,14 @@ def _build_heuristic_dispatch(
         resource_units = {r: 0 for r in RESOURCE_TYPES}
 
         if pr and pr["resource_priority"] and units > 0:
+            # Round-robin over the priority list: every resource gets `base`
+            # units and the first `extra` in priority order get one more
             p_list = pr["resource_priority"]
-            i = 0
-            for _ in range(units):
-                resource_units[p_list[i % len(p_list)]] += 1
-                i += 1
+            base, extra = divmod(units, len(p_list))
+            for idx, resource_id in enumerate(p_list):
+                share = base + (1 if idx < extra else 0)
+                if share:
+                    resource_units[resource_id] += share
 
         dispatch.append(
             {
@@ -573,15 +614,14 @@ def _build_heuristic_dispatch(
 
 
 def _rebalance_units(
-    recs: List[Dict],
+    ordered: List[Dict],
     diff: int,
-    iz_map: Dict[str, float],
     max_units_per_zone: Optional[int] = None,
 ):
+    """Spread `diff` units over `ordered` (highest impact first), one unit per pass."""
     if diff == 0:
         return
 
-    ordered = sorted(recs, key=lambda r: iz_map.get(r["zone_id"], 0.0), reverse=True)
     direction = 1 if diff > 0 else -1
     remaining = abs(diff)
 
@@ -608,6 +648,40 @@ def _rebalance_units(
             break
 
 
+# Per-level crisp fractions indexed like _IMPACT_LEVELS (CRITICAL without
+# critical infrastructure); see _crisp_fraction for the scalar rule.
+_CRISP_FRACTION_TABLE = np.array([
+    _CRISP_FRACTIONS["NORMAL"],
+    _CRISP_FRACTIONS["ADVISORY"],
+    _CRISP_FRACTIONS["WARNING"],
+    0.5,
+])
+
+
+def _requested_units(zones: List[ZoneModel], iz: np.ndarray, total_units: int, mode: str) -> np.ndarray:
+    """Units each zone asks for under `mode`, computed for all zones at once."""
+    if mode == "proportional":
+        sum_iz = iz.sum()
+        if sum_iz <= 0:
+            return np.zeros(len(zones), dtype=np.int64)
+        return np.round(total_units * (iz / sum_iz)).astype(np.int64)
+
+    critical_infra = np.array([z.is_critical_infra for z in zones], dtype=bool)
+    if mode == "crisp":
+        level_idx = np.digitize(iz, _IMPACT_BINS)
+        fractions = _CRISP_FRACTION_TABLE[level_idx]
+        fractions = np.where((level_idx == len(_IMPACT_BINS)) & critical_infra, 0.6, fractions)
+        units = np.maximum(0, (total_units * fractions).astype(np.int64))
+        floor_one = level_idx > 0
+    else:
+        fractions = _fuzzy_fractions(iz, critical_infra)
+        units = np.round(total_units * fractions).astype(np.int64)
+        floor_one = iz >= 0.3
+
+    # Any zone above NORMAL gets at least one unit
+    return np.where(floor_one & (units == 0), 1, units)
+
+
 def allocate_resources(
     zones: List[ZoneModel],
     total_units: int,
@@ -618,33 +692,36 @@ def allocate_resources(
     if mode not in {"crisp", "fuzzy", "proportional"}:
         raise ValueError(f"Unknown mode {mode}")
 
-    iz_map = {z.id: z.pf * z.vulnerability for z in zones}
-
-    if mode == "proportional":
-        sum_iz = sum(iz_map.values())
-        recs = [
-            recommend_resources_proportional(z, total_units, iz_map[z.id], sum_iz)
-            for z in zones
-        ]
-    elif mode == "crisp":
-        recs = [recommend_resources_crisp(z, total_units) for z in zones]
-    else:
-        recs = [recommend_resources_fuzzy(z, total_units) for z in zones]
+    iz = np.array([z.pf * z.vulnerability for z in zones], dtype=np.float64)
+    units = _requested_units(zones, iz, total_units, mode)
 
     if mode in {"crisp", "fuzzy"}:
-        total_requested = sum(r["units_allocated"] for r in recs)
+        total_requested = int(units.sum())
         if total_requested > total_units:
             factor = total_units / total_requested
-            for r in recs:
-                if r["units_allocated"] > 0:
-                    r["units_allocated"] = max(1, int(r["units_allocated"] * factor))
+            scaled = np.maximum(1, (units * factor).astype(np.int64))
+            units = np.where(units > 0, scaled, units)
 
     if max_units_per_zone is not None:
-        for r in recs:
-            if r["units_allocated"] > max_units_per_zone:
-                r["units_allocated"] = max_units_per_zone
+        units = np.minimum(units, max_units_per_zone)
+
+    impacts = _IMPACT_LEVELS[np.digitize(iz, _IMPACT_BINS)].tolist()
+    allocation_mode = mode.upper()
+    recs = [
+        {
+            "zone_id": z.id,
+            "zone_name": z.name,
+            "impact_level": impact,
+            "allocation_mode": allocation_mode,
+            "units_allocated": zone_units,
+        }
+        for z, impact, zone_units in zip(zones, impacts, units.tolist())
+    ]
 
     diff = total_units - sum(r["units_allocated"] for r in recs)
-    _rebalance_units(recs, diff, iz_map, max_units_per_zone)
+    if diff:
+        # Highest impact first; a stable argsort keeps input order among ties
+        ordered = [recs[i] for i in np.argsort(-iz, kind="stable")]
+        _rebalance_units(ordered, diff, max_units_per_zone)
 
     return recs
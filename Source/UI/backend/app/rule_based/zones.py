@@ -1,4 +1,7 @@
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
 
 from ..schemas import Zone as ZoneModel
 
@@ -10,33 +13,34 @@ def _ensure_float(value: Any) -> float:
         return 0.0
 
 
+# Vulnerability is a weighted sum of the zone attributes. get_all_zones can
+# evaluate the same weights in SQL so rows arrive already scored.
+VULNERABILITY_WEIGHTS: Dict[str, float] = {
+    "river_proximity": 0.35,
+    "elevation_risk": 0.25,
+    "pop_density": 0.25,
+    "crit_infra_score": 0.15,
+}
+
+
 def compute_vulnerability(attrs: Dict[str, Any]) -> float:
-    return (
-        0.35 * attrs.get("river_proximity", 0.0)
-        + 0.25 * attrs.get("elevation_risk", 0.0)
-        + 0.25 * attrs.get("pop_density", 0.0)
-        + 0.15 * attrs.get("crit_infra_score", 0.0)
-    )
+    return sum(weight * attrs.get(attr, 0.0) for attr, weight in VULNERABILITY_WEIGHTS.items())
 
 
 def compute_pf_by_zone_from_global(rows: List[Dict[str, Any]], global_pf: float) -> Dict[str, float]:
-    proximities = [
-        _ensure_float(row.get("river_proximity"))
-        for row in rows
-        if row.get("river_proximity") is not None
-    ]
-    max_river = max(proximities) if proximities else 1.0
-
-    pf_by_zone: Dict[str, float] = {}
-    for row in rows:
-        zone_id = row.get("zone_id")
-        if not isinstance(zone_id, str):
-            continue
-        rp_norm = _ensure_float(row.get("river_proximity")) / max_river if max_river > 0 else 0.0
-        weight = 0.5 + 0.5 * rp_norm
-        pf_by_zone[zone_id] = min(1.0, global_pf * weight)
+    # Scale every zone at once: weight = 0.5 + 0.5 * proximity / max proximity
+    proximity = np.array([_ensure_float(row.get("river_proximity")) for row in rows], dtype=np.float64)
+    present = np.array([row.get("river_proximity") is not None for row in rows], dtype=bool)
+    max_river = float(proximity[present].max()) if present.any() else 1.0
 
-    return pf_by_zone
+    rp_norm = proximity / max_river if max_river > 0 else np.zeros_like(proximity)
+    pf = np.minimum(1.0, global_pf * (0.5 + 0.5 * rp_norm))
+
+    return {
+        row["zone_id"]: zone_pf
+        for row, zone_pf in zip(rows, pf.tolist())
+        if isinstance(row.get("zone_id"), str)
+    }
 
 
 def build_zones_from_data(rows: List[Dict[str, Any]], pf_by_zone: Dict[str, float]) -> List[ZoneModel]:
@@ -53,7 +57,9 @@ def build_zones_from_data(rows: List[Dict[str, Any]], pf_by_zone: Dict[str, floa
             "pop_density": _ensure_float(row.get("pop_density")),
             "crit_infra_score": _ensure_float(row.get("crit_infra_score")),
         }
-        vulnerability = compute_vulnerability(attrs)
+        vulnerability = row.get("vulnerability")
+        if vulnerability is None:
+            vulnerability = compute_vulnerability(attrs)
         hospital_count = int(row.get("hospital_count") or 0)
         is_critical = bool(row.get("critical_infra") or hospital_count > 0)
         pf = pf_by_zone.get(zone_id, 0.0)
@@ -74,3 +80,29 @@ def build_zones_from_data(rows: List[Dict[str, Any]], pf_by_zone: Dict[str, floa
         )
 
     return zones
+
+
+@lru_cache(maxsize=256)
+def _zones_for_global_pf(
+    row_items: Tuple[Tuple[Tuple[str, Any], ...], ...], global_pf: float
+) -> Tuple[Dict[str, float], Tuple[ZoneModel, ...]]:
+    rows = [dict(items) for items in row_items]
+    pf_by_zone = compute_pf_by_zone_from_global(rows, global_pf)
+    return pf_by_zone, tuple(build_zones_from_data(rows, pf_by_zone))
+
+
+def zones_for_global_pf(rows: List[Dict[str, Any]], global_pf: float) -> Tuple[Dict[str, float], List[ZoneModel]]:
+    """
+    compute_pf_by_zone_from_global followed by build_zones_from_data, memoized
+    on the zone rows and global pf (dashboards poll with the same values).
+
+    The returned Zone objects are shared between calls and must not be mutated.
+    """
+    try:
+        key = tuple(tuple(row.items()) for row in rows)
+        pf_by_zone, zones = _zones_for_global_pf(key, float(global_pf))
+    except TypeError:
+        # Unhashable row values: build without the cache
+        pf_by_zone = compute_pf_by_zone_from_global(rows, global_pf)
+        return pf_by_zone, build_zones_from_data(rows, pf_by_zone)
+    return dict(pf_by_zone), list(zones)
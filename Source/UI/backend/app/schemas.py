@@ -1,6 +1,7 @@
 """
 Pydantic schemas for type safety and validation across the backend.
 """
+from bisect import bisect_right
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from enum import Enum
@@ -118,6 +119,15 @@ class PredictionInterval(BaseModel):
     width: float = Field(ge=0.0)
 
 
+# Probability thresholds (inclusive lower bounds) and the band each one opens
+_RISK_THRESHOLDS = (0.3, 0.7)
+_RISK_BANDS = (
+    (RiskLevel.LOW, '🟢'),
+    (RiskLevel.MODERATE, '🟡'),
+    (RiskLevel.HIGH, '🔴'),
+)
+
+
 class FloodRisk(BaseModel):
     """Model for flood risk assessment."""
     probability: float = Field(ge=0.0, le=1.0)
@@ -129,15 +139,7 @@ class FloodRisk(BaseModel):
     def derive_risk_level(cls, values):
         """Derive risk level and indicator from probability."""
         prob = values.get('probability', 0.0)
-        if prob >= 0.7:
-            values['risk_level'] = RiskLevel.HIGH
-            values['risk_indicator'] = '🔴'
-        elif prob >= 0.3:
-            values['risk_level'] = RiskLevel.MODERATE
-            values['risk_indicator'] = '🟡'
-        else:
-            values['risk_level'] = RiskLevel.LOW
-            values['risk_indicator'] = '🟢'
+        values['risk_level'], values['risk_indicator'] = _RISK_BANDS[bisect_right(_RISK_THRESHOLDS, prob)]
         return values
 
 
@@ -329,7 +331,10 @@ class DispatchRequest(BaseModel):
 
 class ResourceCapacityUpdate(BaseModel):
     """Model for updating resource capacity."""
-    capacities: Dict[str, int] = Field(description="Map of resource_id to new capacity")
+    capacities: Dict[str, int] = Field(
+        min_length=1, max_length=200,
+        description="Map of resource_id to new capacity"
+    )
 
     @field_validator('capacities')
     @classmethod
@@ -342,7 +347,10 @@ class ResourceCapacityUpdate(BaseModel):
 
 class ZoneParametersUpdate(BaseModel):
     """Model for updating zone parameters."""
-    zones: Dict[str, Dict[str, Any]] = Field(description="Map of zone_id to updated parameters")
+    zones: Dict[str, Dict[str, Any]] = Field(
+        min_length=1, max_length=200,
+        description="Map of zone_id to updated parameters"
+    )
 
     @field_validator('zones')
     @classmethod
@@ -432,7 +440,7 @@ class ApiResponse(BaseModel):
 class GeoJsonFeature(BaseModel):
     """Model for GeoJSON feature."""
     type: str = Field(default="Feature")
-    geometry: Dict[str, Any]
+    geometry: Optional[Dict[str, Any]] = None
     properties: Dict[str, Any]
 
 
@@ -457,7 +465,9 @@ class HistoricalPredictionResults(BaseModel):
     timestamp: Optional[str] = None
     lead_times: List[int]
     total_predictions: int = Field(ge=0)
-    predictions_by_lead_time: Dict[int, List[Prediction]]
+    # Each payload was validated as a Prediction when it was generated (and
+    # carries the extra base_date/window_start keys), so it isn't re-parsed
+    predictions_by_lead_time: Dict[int, List[Dict[str, Any]]]
     skipped_cached: int = Field(ge=0)
     errors: List[str]
     summary: Dict[str, HistoricalPredictionSummary]
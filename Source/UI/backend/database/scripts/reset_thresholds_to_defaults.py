@@ -20,7 +20,9 @@ from datetime import datetime
 from pathlib import Path
 
 # Add the backend directory to the Python path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+BACKEND_DIR = str(Path(__file__).parent.parent.parent)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
 from app.db import get_connection
 
@@ -152,12 +152,18 @@ except Exception as e:
     exit 0
 }
 
+# Cache expiry is tested on a synthetic clock (time_travel fixture), never real waits
+if grep -rnE "(asyncio|time)\.sleep\(" tests/; then
+    print_error "Tests must not sleep; use the time_travel fixture instead"
+    exit 1
+fi
+
 # If test image builds successfully, run full test suite
 echo "Running full test suite in Docker..."
 docker run --rm \
     -v $(pwd):/app \
     flood-backend-tests \
-    pytest tests/ -v --tb=short --cov=app --cov-report=term-missing
+    pytest tests/ -v -n auto --dist=loadfile --tb=short --cov=app --cov-report=term-missing
 
 if [ $? -eq 0 ]; then
     print_status "All tests passed! 🎉"
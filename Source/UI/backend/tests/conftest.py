@@ -1,11 +1,16 @@
 """
 Pytest configuration and shared fixtures for the test suite.
 """
+import asyncio
+from functools import lru_cache
+from types import MappingProxyType
+
 import pytest
+import pytest_asyncio
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, Any
-from unittest.mock import Mock, MagicMock
+from unittest.mock import Mock, MagicMock, patch
 
 from app.schemas import (
     Zone,
@@ -29,11 +34,155 @@ from app.db_models import (
     ResourceTypeInsert,
     RawDataInsert,
 )
+from app import json_compat
+
+# uvloop is optional (uvicorn[standard] installs it for the server); when it
+# is available the tests' event loops run on it too
+try:
+    import uvloop
+    _HAS_UVLOOP = True
+except Exception:
+    _HAS_UVLOOP = False
+
+
+def loads(body):
+    """Decode a response (or raw JSON bytes) with the app's own decoder (orjson when installed)."""
+    return json_compat.loads(getattr(body, "content", body))
+
+
+def pytest_configure(config):
+    """Run the async tests on uvloop when it is installed."""
+    if _HAS_UVLOOP:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the one session-wide event loop."""
+    from pytest_asyncio import is_async_test
+
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+def _clear_app_caches():
+    from app.db import clear_metadata_cache, clear_raw_data_cache
+    from app.prediction_service import _load_predictor
+
+    _load_predictor.cache_clear()
+    clear_raw_data_cache()
+    clear_metadata_cache()
+
+
+@pytest.fixture(autouse=True)
+def reset_app_caches():
+    """
+    Drop cached predictors, raw_data frames and zone/resource-type rows so
+    patched models and database reads don't leak between tests.
+
+    One autouse fixture instead of one per cache keeps per-test fixture setup
+    to a single frame for the many tests that never touch the database.
+    """
+    _clear_app_caches()
+    yield
+    _clear_app_caches()
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """
+    One TestClient shared by the whole run.
+
+    Entering the client once keeps a single event-loop portal alive instead of
+    starting one per request. Startup runs with model preloading off and the
+    threshold bootstrap stubbed, since neither has a database or model files here.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app, backend_options={"use_uvloop": _HAS_UVLOOP})
+    with patch.dict('os.environ', {'PRELOAD_MODELS': 'false'}), \
+            patch('app.main.ensure_default_threshold_config'):
+        client.__enter__()
+    try:
+        yield client
+    finally:
+        client.__exit__(None, None, None)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client():
+    """
+    One in-process AsyncClient shared by the async tests.
+
+    Requests go straight to the ASGI app on the session event loop; the app's
+    lifespan is not run, so startup needs no stubbing here.
+    """
+    import httpx
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+class _JsonCache:
+    """Memoized GET-and-decode over a shared AsyncClient."""
+
+    def __init__(self, client):
+        self._client = client
+        self._cache = {}
+
+    async def get_json(self, path, params=None):
+        key = (path, frozenset((params or {}).items()))
+        if key not in self._cache:
+            response = await self._client.get(path, params=params)
+            response.raise_for_status()
+            self._cache[key] = loads(response)
+        return self._cache[key]
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api_cache(async_client):
+    """
+    Decoded GET bodies shared by the whole run, fetched once per URL and params.
+
+    Only for endpoints whose output doesn't depend on anything a test patches
+    (static config, the OpenAPI schema). Callers share the decoded object, so
+    treat it as read-only; non-2xx responses raise instead of being cached.
+    """
+    return _JsonCache(async_client)
+
+
+class _SyntheticClock:
+    """Stand-in for the time module whose monotonic() only moves on shift()."""
+
+    def __init__(self, start: float = 1_000.0):
+        self._now = start
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def shift(self, delta: timedelta) -> None:
+        self._now += delta.total_seconds()
 
 
 @pytest.fixture
-def sample_raw_data():
-    """Sample raw data for testing."""
+def time_travel():
+    """
+    Drive the app's TTL caches from a synthetic clock.
+
+    The caches age entries with time.monotonic(), so tests cross an expiry
+    with time_travel.shift(timedelta(...)) instead of sleeping.
+    """
+    clock = _SyntheticClock()
+    with patch('app.db.time', clock), patch('app.main.time', clock):
+        yield clock
+
+
+@lru_cache(maxsize=1)
+def _sample_raw_frame() -> pd.DataFrame:
+    """The 30-day raw_data frame the patched readers serve, built once per run."""
     dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
     data = []
     for i, date in enumerate(dates):
@@ -52,72 +201,85 @@ def sample_raw_data():
     return pd.DataFrame(data)
 
 
+@pytest.fixture
+def sample_raw_data():
+    """Sample raw data for testing (each test gets its own copy)."""
+    return _sample_raw_frame().copy()
+
+
+# Sample rows are built once as read-only mappings; the fixtures hand each
+# test its own shallow copies, so tests can still mutate what they get.
+_SAMPLE_ZONE_ROWS = (
+    MappingProxyType({
+        'zone_id': 'ZONE_001',
+        'name': 'Downtown St. Louis',
+        'river_proximity': 0.9,
+        'elevation_risk': 0.3,
+        'pop_density': 0.8,
+        'crit_infra_score': 0.7,
+        'hospital_count': 2,
+        'critical_infra': True,
+    }),
+    MappingProxyType({
+        'zone_id': 'ZONE_002',
+        'name': 'West End',
+        'river_proximity': 0.6,
+        'elevation_risk': 0.5,
+        'pop_density': 0.4,
+        'crit_infra_score': 0.3,
+        'hospital_count': 0,
+        'critical_infra': False,
+    }),
+    MappingProxyType({
+        'zone_id': 'ZONE_003',
+        'name': 'North County',
+        'river_proximity': 0.2,
+        'elevation_risk': 0.8,
+        'pop_density': 0.3,
+        'crit_infra_score': 0.2,
+        'hospital_count': 1,
+        'critical_infra': False,
+    }),
+)
+
+_SAMPLE_RESOURCE_TYPE_ROWS = (
+    MappingProxyType({
+        'resource_id': 'R1_UAV',
+        'name': 'UAV Surveillance',
+        'description': 'Unmanned aerial vehicles for reconnaissance',
+        'icon': 'drone',
+        'display_order': 1,
+        'capacity': 5,
+    }),
+    MappingProxyType({
+        'resource_id': 'R2_ENGINEERING',
+        'name': 'Engineering Teams',
+        'description': 'Civil engineering response teams',
+        'icon': 'engineering',
+        'display_order': 2,
+        'capacity': 10,
+    }),
+    MappingProxyType({
+        'resource_id': 'R3_PUMPS',
+        'name': 'Water Pumps',
+        'description': 'High-capacity water pumping equipment',
+        'icon': 'pump',
+        'display_order': 3,
+        'capacity': 15,
+    }),
+)
+
+
 @pytest.fixture
 def sample_zone_data():
     """Sample zone data for testing."""
-    return [
-        {
-            'zone_id': 'ZONE_001',
-            'name': 'Downtown St. Louis',
-            'river_proximity': 0.9,
-            'elevation_risk': 0.3,
-            'pop_density': 0.8,
-            'crit_infra_score': 0.7,
-            'hospital_count': 2,
-            'critical_infra': True,
-        },
-        {
-            'zone_id': 'ZONE_002',
-            'name': 'West End',
-            'river_proximity': 0.6,
-            'elevation_risk': 0.5,
-            'pop_density': 0.4,
-            'crit_infra_score': 0.3,
-            'hospital_count': 0,
-            'critical_infra': False,
-        },
-        {
-            'zone_id': 'ZONE_003',
-            'name': 'North County',
-            'river_proximity': 0.2,
-            'elevation_risk': 0.8,
-            'pop_density': 0.3,
-            'crit_infra_score': 0.2,
-            'hospital_count': 1,
-            'critical_infra': False,
-        },
-    ]
+    return [dict(row) for row in _SAMPLE_ZONE_ROWS]
 
 
 @pytest.fixture
 def sample_resource_types():
     """Sample resource types for testing."""
-    return [
-        {
-            'resource_id': 'R1_UAV',
-            'name': 'UAV Surveillance',
-            'description': 'Unmanned aerial vehicles for reconnaissance',
-            'icon': 'drone',
-            'display_order': 1,
-            'capacity': 5,
-        },
-        {
-            'resource_id': 'R2_ENGINEERING',
-            'name': 'Engineering Teams',
-            'description': 'Civil engineering response teams',
-            'icon': 'engineering',
-            'display_order': 2,
-            'capacity': 10,
-        },
-        {
-            'resource_id': 'R3_PUMPS',
-            'name': 'Water Pumps',
-            'description': 'High-capacity water pumping equipment',
-            'icon': 'pump',
-            'display_order': 3,
-            'capacity': 15,
-        },
-    ]
+    return [dict(row) for row in _SAMPLE_RESOURCE_TYPE_ROWS]
 
 
 @pytest.fixture
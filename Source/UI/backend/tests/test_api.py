@@ -1,6 +1,7 @@
 """
 Tests for FastAPI endpoints.
 """
+import asyncio
 import pytest
 import pandas as pd
 from unittest.mock import Mock, patch, AsyncMock
@@ -8,63 +9,56 @@ from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
 import json
 
+from app.json_compat import dumps
 from app.main import app
 from app.schemas import ResourceType
+from tests.conftest import loads
 
 
 class TestAPIEndpoints:
     """Test API endpoint functionality."""
 
-    def setup_method(self):
-        """Setup test client for each test."""
-        self.client = TestClient(app)
+    @pytest.fixture(autouse=True)
+    def _client(self, api_client):
+        """Use the session-wide test client."""
+        self.client = api_client
 
-    def test_root_endpoint(self):
+    async def test_root_endpoint(self, api_cache):
         """Test root endpoint."""
-        response = self.client.get("/")
-        assert response.status_code == 200
-
-        data = response.json()
+        data = await api_cache.get_json("/")
         assert data["success"] is True
         assert "data" in data
         assert data["data"]["status"] == "healthy"
         assert "version" in data["data"]
 
-    @patch('app.main.test_connection')
-    def test_health_endpoint_healthy(self, mock_test_conn):
-        """Test health endpoint with healthy database."""
-        mock_test_conn.return_value = True
-
-        response = self.client.get("/health")
-        assert response.status_code == 200
-
-        data = response.json()
-        assert data["status"] == "healthy"
-        assert data["database"] == "connected"
-
-    @patch('app.main.test_connection')
-    def test_health_endpoint_degraded(self, mock_test_conn):
-        """Test health endpoint with degraded database."""
-        mock_test_conn.return_value = False
-
-        response = self.client.get("/health")
+    @pytest.mark.parametrize("connection, status, database", [
+        (True, "healthy", "connected"),
+        (False, "degraded", "disconnected"),
+        (Exception("Database error"), "unhealthy", None),
+    ])
+    def test_health_endpoint(self, connection, status, database):
+        """Health reflects whether the database answers, and never fails the request."""
+        # /health imports test_connection from app.db at call time
+        mock_kwargs = {"side_effect": connection} if isinstance(connection, Exception) else {"return_value": connection}
+        with patch('app.db.test_connection', **mock_kwargs):
+            response = self.client.get("/health")
         assert response.status_code == 200
 
-        data = response.json()
-        assert data["status"] == "degraded"
-        assert data["database"] == "disconnected"
+        data = loads(response)
+        assert data["status"] == status
+        if database is None:
+            assert "error" in data
+        else:
+            assert data["database"] == database
 
-    @patch('app.main.test_connection')
-    def test_health_endpoint_unhealthy(self, mock_test_conn):
-        """Test health endpoint with database error."""
-        mock_test_conn.side_effect = Exception("Database error")
+    @patch('app.main.get_pool_status')
+    def test_debug_pool_endpoint(self, mock_pool_status):
+        """Pool usage is reported as ApiResponse data."""
+        mock_pool_status.return_value = {"pool_size": 8, "checked_out": 2, "overflow": -6}
 
-        response = self.client.get("/health")
+        response = self.client.get("/debug/pool")
         assert response.status_code == 200
-
-        data = response.json()
-        assert data["status"] == "unhealthy"
-        assert "error" in data
+        assert loads(response)["data"]["checked_out"] == 2
 
     @patch('app.main.get_last_30_days_raw_data')
     def test_raw_data_endpoint_success(self, mock_get_data, sample_raw_data):
@@ -74,7 +68,7 @@ class TestAPIEndpoints:
         response = self.client.get("/raw-data")
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["success"] is True
         assert "rows" in data["data"]
         assert len(data["data"]["rows"]) == 30
@@ -86,7 +80,130 @@ class TestAPIEndpoints:
 
         response = self.client.get("/raw-data")
         assert response.status_code == 404
-        assert "No raw data found" in response.json()["detail"]
+        assert "No raw data found" in loads(response)["detail"]
+
+    @patch('app.main.get_all_raw_data')
+    async def test_raw_data_endpoint_as_of_date(self, mock_get_data, async_client, sample_raw_data):
+        """as_of_date keeps rows up to that date; malformed dates are a 400."""
+        mock_get_data.return_value = sample_raw_data
+        cutoff = sample_raw_data['date'].iloc[9].strftime('%Y-%m-%d')
+
+        # Independent requests, so issue them together
+        filtered, malformed = await asyncio.gather(
+            async_client.get("/raw-data", params={"as_of_date": cutoff}),
+            async_client.get("/raw-data", params={"as_of_date": "not-a-date"}),
+        )
+        assert filtered.status_code == 200
+        assert len(loads(filtered)["data"]["rows"]) == 9
+        assert malformed.status_code == 400
+
+    @patch('app.main.get_all_raw_data')
+    def test_raw_data_endpoint_ndjson_stream(self, mock_get_data, sample_raw_data):
+        """format=ndjson streams one JSON object per row."""
+        mock_get_data.return_value = sample_raw_data
+
+        response = self.client.get("/raw-data?format=ndjson")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = response.content.splitlines()
+        assert len(lines) == len(sample_raw_data)
+        first = loads(lines[0])
+        assert set(first) == set(sample_raw_data.columns)
+
+    @patch('app.main.get_all_raw_data')
+    def test_raw_data_endpoint_invalid_format(self, mock_get_data):
+        """Unknown formats are rejected before any data is loaded."""
+        response = self.client.get("/raw-data?format=csv")
+        assert response.status_code == 422
+        mock_get_data.assert_not_called()
+
+    async def test_enumerated_query_options_in_schema(self, api_cache):
+        """Fixed option sets are published as enums rather than regex patterns."""
+        schema = await api_cache.get_json("/openapi.json")
+        params = {
+            p["name"]: p["schema"]
+            for path in ("/raw-data", "/zones-geo")
+            for p in schema["paths"][path]["get"]["parameters"]
+        }
+        assert params["format"]["enum"] == ["json", "ndjson"]
+        assert params["geometry"]["enum"] == ["full", "none"]
+
+    @patch('app.main.get_all_raw_data')
+    @patch('app.main.get_raw_data_page')
+    def test_raw_data_endpoint_paging(self, mock_get_page, mock_get_all, sample_raw_data):
+        """limit/offset are pushed into the query instead of slicing the full history."""
+        page = sample_raw_data.iloc[5:15].reset_index(drop=True)
+        mock_get_page.return_value = page
+
+        response = self.client.get("/raw-data?offset=5&limit=10&as_of_date=2025-12-10")
+        assert response.status_code == 200
+        rows = loads(response)["data"]["rows"]
+        assert len(rows) == 10
+        assert rows[0]["date"].startswith(page['date'].iloc[0].strftime('%Y-%m-%d'))
+        mock_get_page.assert_called_once_with(10, 5, "2025-12-10")
+        mock_get_all.assert_not_called()
+
+    @patch('app.main.get_raw_data_page')
+    def test_raw_data_endpoint_paging_past_end(self, mock_get_page, sample_raw_data):
+        """A page past the last row is empty; an empty first page means no data."""
+        mock_get_page.return_value = sample_raw_data.iloc[0:0]
+
+        assert loads(self.client.get("/raw-data?offset=500"))["data"]["rows"] == []
+        assert self.client.get("/raw-data?limit=10").status_code == 404
+
+    @pytest.mark.parametrize("fmt", ["json", "ndjson"])
+    @patch('app.main._safe_df_records', side_effect=ValueError("bad value"))
+    @patch('app.main.get_all_raw_data')
+    def test_raw_data_encoding_failure_is_500(self, mock_get_data, mock_records, fmt, sample_raw_data):
+        """Rows that can't be encoded fail the request before a 200 is sent."""
+        mock_get_data.return_value = sample_raw_data
+
+        response = self.client.get(f"/raw-data?format={fmt}")
+        assert response.status_code == 500
+        assert "Failed to encode response" in loads(response)["detail"]
+
+    def test_api_response_parts_ignore_rows_text_in_message(self):
+        """The envelope is assembled from its fields, not split on a text marker."""
+        from app.main import _api_response_parts
+
+        message = 'literal "rows":[] in the message'
+        head, tail = _api_response_parts(message)
+        body = loads(head + b'[1, 2]' + tail)
+        assert body["message"] == message
+        assert body["data"] == {"rows": [1, 2]}
+        assert list(body) == ["success", "message", "data", "error", "timestamp"]
+
+    def test_api_response_rows_splices_chunks(self):
+        """Chunked rows decode to the same ApiResponse as encoding all at once."""
+        import numpy as np
+        from app.main import _api_response_rows
+
+        df = pd.DataFrame({'level': [1.0, np.nan, 3.0, 4.0, 5.0]})
+        body = b"".join(_api_response_rows("ok", df, chunk_rows=2))
+
+        payload = loads(body)
+        assert payload["success"] is True
+        assert payload["message"] == "ok"
+        assert payload["data"] == {"rows": [
+            {'level': 1.0}, {'level': None}, {'level': 3.0}, {'level': 4.0}, {'level': 5.0},
+        ]}
+        assert "timestamp" in payload
+
+        empty = loads(b"".join(_api_response_rows("ok", df.iloc[:0])))
+        assert empty["data"] == {"rows": []}
+
+    def test_ndjson_lines_chunks_rows(self):
+        """Rows are sanitized slice by slice without dropping or reordering any."""
+        import numpy as np
+        from app.main import _ndjson_lines
+
+        df = pd.DataFrame({'level': [1.0, np.nan, 3.0, np.inf, 5.0]})
+        lines = list(_ndjson_lines(df, chunk_rows=2))
+
+        assert [loads(line) for line in lines] == [
+            {'level': 1.0}, {'level': None}, {'level': 3.0}, {'level': None}, {'level': 5.0},
+        ]
 
     @patch('app.main.get_prediction_history_with_actuals')
     def test_prediction_history_endpoint_success(self, mock_get_history):
@@ -106,14 +223,45 @@ class TestAPIEndpoints:
         mock_df = pd.DataFrame(history_data)
         mock_get_history.return_value = mock_df
 
-        response = self.client.get("/prediction-history?limit=10")
+        response = self.client.get("/prediction-history?limit=10&offset=20")
         assert response.status_code == 200
+        mock_get_history.assert_called_once_with(limit=10, offset=20)
 
-        data = response.json()
+        data = loads(response)
         assert data["success"] is True
         assert "rows" in data["data"]
         assert len(data["data"]["rows"]) == 10
 
+    @patch('app.main.get_prediction_history_with_actuals')
+    def test_prediction_history_serializes_missing_and_timestamps(self, mock_get_history):
+        """NaN/NaT become null and timestamps are ISO strings."""
+        import numpy as np
+        mock_get_history.return_value = pd.DataFrame({
+            'forecast_date': pd.to_datetime(['2024-05-01', None]),
+            'predicted_level': [12.5, np.inf],
+            'actual_level': [np.nan, 11.0],
+        })
+
+        response = self.client.get("/prediction-history")
+        assert response.status_code == 200
+        rows = loads(response)["data"]["rows"]
+        assert rows[0] == {'forecast_date': '2024-05-01T00:00:00', 'predicted_level': 12.5, 'actual_level': None}
+        assert rows[1] == {'forecast_date': None, 'predicted_level': None, 'actual_level': 11.0}
+
+    @patch('app.main.get_prediction_history_with_actuals')
+    def test_prediction_history_nulls_out_of_range_floats(self, mock_get_history):
+        """Floats beyond +/-1e100 are reported as null, like missing values."""
+        mock_get_history.return_value = pd.DataFrame({
+            'predicted_level': [1e101, -1e150, 1e100, 12.5],
+            'days_ahead': [1, 2, 3, 1],
+        })
+
+        response = self.client.get("/prediction-history")
+        assert response.status_code == 200
+        rows = loads(response)["data"]["rows"]
+        assert [row["predicted_level"] for row in rows] == [None, None, 1e100, 12.5]
+        assert [row["days_ahead"] for row in rows] == [1, 2, 3, 1]
+
     @patch('app.main.get_prediction_history_with_actuals')
     def test_prediction_history_endpoint_no_data(self, mock_get_history):
         """Test prediction history endpoint with no data."""
@@ -121,7 +269,7 @@ class TestAPIEndpoints:
 
         response = self.client.get("/prediction-history")
         assert response.status_code == 404
-        assert "No prediction history found" in response.json()["detail"]
+        assert "No prediction history found" in loads(response)["detail"]
 
     @patch('app.main.predict_all_historical')
     def test_predict_all_endpoint_sync(self, mock_predict_all):
@@ -153,11 +301,34 @@ class TestAPIEndpoints:
         )
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["status"] == "completed"
         assert data["total_predictions"] == 100
         assert len(data["predictions_by_lead_time"]) == 3
 
+    @patch('app.main.predict_all_historical')
+    def test_predict_all_passes_prediction_payloads_through(self, mock_predict_all):
+        """Already-validated prediction dicts are returned as generated."""
+        prediction = {
+            "lead_time_days": 1,
+            "forecast_date": "2025-12-11",
+            "forecast": {"median": 13.2},
+            "flood_risk": {"probability": 0.1},
+            "base_date": "2025-12-10",
+            "window_start": "2025-11-11",
+        }
+        mock_predict_all.return_value = {
+            "total_predictions": 1,
+            "predictions_by_lead_time": {1: [prediction]},
+            "skipped_cached": 0,
+            "errors": [],
+            "summary": {},
+        }
+
+        response = self.client.post("/predict-all?lead_times=1&run_in_background=false")
+        assert response.status_code == 200
+        assert loads(response)["predictions_by_lead_time"]["1"] == [prediction]
+
     @patch('app.main.predict_all_historical')
     def test_predict_all_endpoint_background(self, mock_predict_all):
         """Test predict-all endpoint in background mode."""
@@ -169,19 +340,11 @@ class TestAPIEndpoints:
         )
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["status"] == "started"
         assert "job_id" in data
         assert data["lead_times"] == [1, 2, 3]
 
-    def test_predict_all_endpoint_invalid_lead_times(self):
-        """Test predict-all endpoint with invalid lead times."""
-        response = self.client.post(
-            "/predict-all?lead_times=invalid&run_in_background=false"
-        )
-        assert response.status_code == 400
-        assert "Invalid lead_times format" in response.json()["detail"]
-
     @patch('app.main.JOB_STORE')
     def test_predict_all_status_endpoint(self, mock_job_store):
         """Test predict-all status endpoint."""
@@ -198,10 +361,20 @@ class TestAPIEndpoints:
         response = self.client.get("/predict-all/status/test_job_123")
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["job_id"] == "test_job_123"
         assert data["status"] == "running"
 
+    def test_script_status_file(self, tmp_path):
+        """The script status file is served as its decoded JSON."""
+        (tmp_path / "predict_all_status.json").write_text('{"percent": 12.5, "message": "Running"}')
+
+        with patch('app.main.SCRIPTS_DIR', str(tmp_path)):
+            response = self.client.get("/scripts/predict-all/status")
+
+        assert response.status_code == 200
+        assert loads(response) == {"percent": 12.5, "message": "Running"}
+
     @patch('app.main.JOB_STORE')
     def test_predict_all_status_not_found(self, mock_job_store):
         """Test predict-all status endpoint with job not found."""
@@ -209,19 +382,27 @@ class TestAPIEndpoints:
 
         response = self.client.get("/predict-all/status/nonexistent_job")
         assert response.status_code == 404
-        assert "Job not found" in response.json()["detail"]
-
-    @patch('app.main.get_latest_prediction')
-    @patch('app.main.get_all_zones')
-    @patch('app.main.build_dispatch_plan')
-    @patch('app.main.get_all_resource_types')
-    def test_rule_based_dispatch_endpoint(
-        self, mock_get_resources, mock_build_dispatch, mock_get_zones, mock_get_prediction,
-        sample_zone_data, sample_resource_types
-    ):
+        assert "Job not found" in loads(response)["detail"]
+
+    @pytest.fixture
+    def dispatch_readers(self, sample_zone_data, sample_resource_types):
+        """Patch the dispatch endpoint's readers once, preloaded with the sample rows."""
+        from types import SimpleNamespace
+        with patch('app.main.get_latest_prediction') as get_prediction, \
+                patch('app.main.get_all_zones', return_value=sample_zone_data) as get_zones, \
+                patch('app.main.build_dispatch_plan', return_value=[]) as build_dispatch, \
+                patch('app.main.get_all_resource_types', return_value=sample_resource_types) as get_resources:
+            yield SimpleNamespace(
+                get_prediction=get_prediction,
+                get_zones=get_zones,
+                build_dispatch=build_dispatch,
+                get_resources=get_resources,
+            )
+
+    def test_rule_based_dispatch_endpoint(self, dispatch_readers):
         """Test rule-based dispatch endpoint."""
         # Mock latest prediction
-        mock_get_prediction.return_value = {
+        dispatch_readers.get_prediction.return_value = {
             "flood_probability": 0.3,
             "predicted_level": 12.5,
             "lower_bound_80": 11.8,
@@ -229,9 +410,6 @@ class TestAPIEndpoints:
             "created_at": datetime.now().isoformat()
         }
 
-        mock_get_zones.return_value = sample_zone_data
-        mock_get_resources.return_value = sample_resource_types
-
         # Mock dispatch plan
         mock_dispatch = [
             {
@@ -243,14 +421,14 @@ class TestAPIEndpoints:
                 "resource_units": {"R1_UAV": 3, "R2_ENGINEERING": 4, "R3_PUMPS": 3},
             }
         ]
-        mock_build_dispatch.return_value = mock_dispatch
+        dispatch_readers.build_dispatch.return_value = mock_dispatch
 
         response = self.client.get(
             "/rule-based/dispatch?total_units=30&mode=fuzzy&lead_time=1"
         )
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["lead_time_days"] == 1
         assert data["total_units"] == 30
         assert data["global_flood_probability"] == 0.3
@@ -259,27 +437,42 @@ class TestAPIEndpoints:
         assert data["last_prediction"]["selected_probability"] == 0.3
         assert len(data["zones"]) == 1
         assert data["zones"][0]["zone_id"] == "ZONE_001"
+        # Resource types are fetched once and shared by capacities and metadata
+        dispatch_readers.get_resources.assert_called_once()
+        dispatch_readers.get_zones.assert_called_once()
 
-    @patch('app.main.get_latest_prediction')
-    @patch('app.main.get_all_zones')
-    @patch('app.main.build_dispatch_plan')
-    @patch('app.main.get_all_resource_types')
-    def test_rule_based_dispatch_best_scenario(
-        self, mock_get_resources, mock_build_dispatch, mock_get_zones, mock_get_prediction,
-        sample_zone_data, sample_resource_types
-    ):
+    def test_rule_based_dispatch_overlaps_reads(self, dispatch_readers, sample_zone_data):
+        """Zone metadata is already loading while the prediction lookup runs."""
+        import threading
+        zones_started = threading.Event()
+        overlapped = []
+
+        def _fake_zones(*args):
+            zones_started.set()
+            return sample_zone_data
+
+        def _fake_prediction(days_ahead):
+            overlapped.append(zones_started.wait(timeout=5))
+            return {"flood_probability": 0.3, "predicted_level": 12.5}
+
+        dispatch_readers.get_zones.side_effect = _fake_zones
+        dispatch_readers.get_prediction.side_effect = _fake_prediction
+
+        response = self.client.get("/rule-based/dispatch?lead_time=1")
+        assert response.status_code == 200
+        assert overlapped == [True]
+
+    def test_rule_based_dispatch_best_scenario(self, dispatch_readers):
         """Ensure scenario=best picks the lower PI bound."""
-        mock_get_prediction.return_value = {
+        dispatch_readers.get_prediction.return_value = {
             "flood_probability": 0.45,
             "predicted_level": 13.5,
             "lower_bound_80": 11.8,
             "upper_bound_80": 15.1,
             "created_at": datetime.now().isoformat()
         }
-        mock_get_zones.return_value = sample_zone_data
-        mock_get_resources.return_value = sample_resource_types
 
-        mock_build_dispatch.return_value = [
+        dispatch_readers.build_dispatch.return_value = [
             {"zone_id": "ZONE_007", "units_allocated": 5, "impact_level": "ADVISORY", "allocation_mode": "fuzzy"},
         ]
 
@@ -287,12 +480,25 @@ class TestAPIEndpoints:
             "/rule-based/dispatch?total_units=30&mode=fuzzy&lead_time=1&scenario=best"
         )
         assert response.status_code == 200
-        data = response.json()
+        data = loads(response)
         assert data["global_flood_probability"] == 0.45
         assert data["scenario"] == "best"
         assert data["last_prediction"]["selected_level"] == 11.8
         assert data["last_prediction"]["selected_level_source"] == "prediction_interval_lower"
 
+    @patch('app.main.get_last_30_days_raw_data', return_value=None)
+    def test_rule_based_dispatch_early_exit_settles_metadata_reads(self, mock_get_raw_data, dispatch_readers):
+        """An early 404 cancels and awaits the metadata reads it started."""
+        from app.main import _cancel_pending
+        dispatch_readers.get_prediction.return_value = None
+
+        with patch('app.main._cancel_pending', new=AsyncMock(wraps=_cancel_pending)) as mock_cancel:
+            response = self.client.get("/rule-based/dispatch?lead_time=1")
+
+        assert response.status_code == 404
+        mock_cancel.assert_awaited_once()
+        assert all(task.done() for task in mock_cancel.await_args.args)
+
     @patch('app.main.get_latest_prediction')
     def test_rule_based_dispatch_no_prediction(self, mock_get_prediction):
         """Test rule-based dispatch with no cached prediction."""
@@ -302,7 +508,7 @@ class TestAPIEndpoints:
             "/rule-based/dispatch?total_units=30&lead_time=1"
         )
         assert response.status_code == 404
-        assert "No cached prediction" in response.json()["detail"]
+        assert "No cached prediction" in loads(response)["detail"]
 
     @patch('app.main.get_latest_prediction')
     @patch('app.main.get_last_30_days_raw_data')
@@ -350,7 +556,28 @@ class TestAPIEndpoints:
 
         # Should have generated prediction and created dispatch plan
         mock_predict.assert_called_once()
-        assert response.json()["global_flood_probability"] == 0.2
+        assert loads(response)["global_flood_probability"] == 0.2
+
+    @patch('app.main.get_latest_prediction')
+    @patch('app.main.get_last_30_days_raw_data')
+    @patch('app.main.predict_next_days')
+    @patch('app.main.get_all_zones')
+    @patch('app.main.get_all_resource_types')
+    def test_rule_based_dispatch_without_zones_skips_generation(
+        self, mock_get_resources, mock_get_zones, mock_predict, mock_get_raw_data,
+        mock_get_prediction, sample_raw_data, sample_resource_types
+    ):
+        """With no zones there is nothing to plan, so no prediction is generated."""
+        mock_get_prediction.return_value = None
+        mock_get_raw_data.return_value = sample_raw_data
+        mock_get_zones.return_value = []
+        mock_get_resources.return_value = sample_resource_types
+
+        response = self.client.get("/rule-based/dispatch?total_units=30&lead_time=1")
+
+        assert response.status_code == 500
+        assert "No zone metadata" in loads(response)["detail"]
+        mock_predict.assert_not_called()
 
     def test_rule_based_dispatch_invalid_mode(self):
         """Test rule-based dispatch with invalid mode."""
@@ -361,31 +588,38 @@ class TestAPIEndpoints:
         # but we can test validation of other parameters
         assert response.status_code == 200  # FastAPI handles enum validation
 
-    def test_rule_based_dispatch_invalid_units(self):
-        """Test rule-based dispatch with invalid total_units."""
-        response = self.client.get(
-            "/rule-based/dispatch?total_units=0"  # Below minimum of 1
-        )
-        assert response.status_code == 422  # Validation error
-
-        response = self.client.get(
-            "/rule-based/dispatch?total_units=300"  # Above maximum of 200
-        )
-        assert response.status_code == 422  # Validation error
-
-    @patch('app.main.get_all_zones')
-    def test_zones_endpoint(self, mock_get_zones, sample_zone_data):
-        """Test zones endpoint."""
-        mock_get_zones.return_value = sample_zone_data
-
-        response = self.client.get("/zones")
+    @pytest.mark.parametrize("method, url, kwargs, status, detail", [
+        ("GET", "/nonexistent", {}, 404, None),
+        ("GET", "/raw-data?limit=0", {}, 422, None),
+        ("GET", "/rule-based/dispatch?total_units=0", {}, 422, None),  # Below minimum of 1
+        ("GET", "/rule-based/dispatch?total_units=300", {}, 422, None),  # Above maximum of 200
+        ("GET", "/zones-geo?geometry=wkb", {}, 422, None),
+        ("PUT", "/resource-types/capacities", {"json": {"capacities": {"R1_UAV": -5}}}, 422, None),
+        ("POST", "/predict-all?lead_times=invalid&run_in_background=false", {}, 400,
+         "Invalid lead_times format"),
+    ], ids=["unknown-route", "raw-data-limit", "units-low", "units-high", "geometry",
+            "negative-capacity", "lead-times"])
+    async def test_negative_paths(self, async_client, method, url, kwargs, status, detail):
+        """A single bad request is rejected with the expected status."""
+        response = await async_client.request(method, url, **kwargs)
+        assert response.status_code == status
+        if detail is not None:
+            assert detail in loads(response)["detail"]
+
+    @pytest.mark.parametrize("url, reader, rows_fixture, id_field, first_id", [
+        ("/zones", "get_all_zones", "sample_zone_data", "zone_id", "ZONE_001"),
+        ("/resource-types", "get_all_resource_types", "sample_resource_types", "resource_id", "R1_UAV"),
+    ])
+    def test_metadata_list_endpoints(self, request, url, reader, rows_fixture, id_field, first_id):
+        """Metadata endpoints wrap the reader's rows in an ApiResponse."""
+        with patch(f'app.main.{reader}', return_value=request.getfixturevalue(rows_fixture)):
+            response = self.client.get(url)
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["success"] is True
-        assert "rows" in data["data"]
         assert len(data["data"]["rows"]) == 3
-        assert data["data"]["rows"][0]["zone_id"] == "ZONE_001"
+        assert data["data"]["rows"][0][id_field] == first_id
 
     @patch('app.main.get_all_zones')
     def test_zones_endpoint_empty(self, mock_get_zones):
@@ -395,23 +629,38 @@ class TestAPIEndpoints:
         response = self.client.get("/zones")
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["success"] is True
         assert len(data["data"]["rows"]) == 0
 
-    @patch('app.main.get_all_resource_types')
-    def test_resource_types_endpoint(self, mock_get_resources, sample_resource_types):
-        """Test resource types endpoint."""
-        mock_get_resources.return_value = sample_resource_types
+    @patch('app.main.get_all_zones')
+    def test_zones_endpoint_etag_revalidation(self, mock_get_zones, sample_zone_data):
+        """A matching If-None-Match gets a bodiless 304; changed rows get a new tag."""
+        mock_get_zones.return_value = sample_zone_data
 
-        response = self.client.get("/resource-types")
-        assert response.status_code == 200
+        first = self.client.get("/zones")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "public, max-age=60, must-revalidate"
 
-        data = response.json()
-        assert data["success"] is True
-        assert "rows" in data["data"]
-        assert len(data["data"]["rows"]) == 3
-        assert data["data"]["rows"][0]["resource_id"] == "R1_UAV"
+        revalidated = self.client.get("/zones", headers={"If-None-Match": f"W/{etag}"})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        mock_get_zones.return_value = sample_zone_data[:1]
+        changed = self.client.get("/zones", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert len(loads(changed)["data"]["rows"]) == 1
+
+    @patch('app.db.fetch_records', side_effect=Exception("Database error"))
+    def test_zones_endpoint_error(self, mock_fetch):
+        """A failed zone query is a 500 without an ETag, not a cacheable empty list."""
+        response = self.client.get("/zones")
+        assert response.status_code == 500
+        assert "Failed to load zones" in loads(response)["detail"]
+        assert "etag" not in response.headers
+        mock_fetch.assert_called_once()
 
     @patch('app.main.get_all_resource_types')
     def test_resource_types_endpoint_no_data(self, mock_get_resources):
@@ -420,7 +669,7 @@ class TestAPIEndpoints:
 
         response = self.client.get("/resource-types")
         assert response.status_code == 404
-        assert "No resource types found" in response.json()["detail"]
+        assert "No resource types found" in loads(response)["detail"]
 
     @patch('app.main.get_connection')
     @patch('app.main.get_all_resource_types')
@@ -445,83 +694,178 @@ class TestAPIEndpoints:
         response = self.client.put("/resource-types/capacities", json=update_data)
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["success"] is True
         assert data["updated_count"] == 3
         assert "resources" in data["data"]
 
-    def test_update_resource_capacities_invalid_data(self):
-        """Test updating resource capacities with invalid data."""
-        # Negative capacity
-        update_data = {
-            "capacities": {
-                "R1_UAV": -5,  # Invalid negative capacity
-            }
-        }
+    @patch('app.db.get_connection')
+    @patch('app.main.get_all_resource_types')
+    def test_update_resource_capacities_single_statement(
+        self, mock_get_resources, mock_get_conn, sample_resource_types
+    ):
+        """All capacities are written with one UPDATE round-trip."""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.rowcount = 2
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_conn.return_value = mock_conn
+        mock_get_resources.return_value = sample_resource_types
 
-        response = self.client.put("/resource-types/capacities", json=update_data)
-        assert response.status_code == 422  # Validation error
+        response = self.client.put(
+            "/resource-types/capacities",
+            json={"capacities": {"R1_UAV": 10, "R3_PUMPS": 30}},
+        )
+        assert response.status_code == 200
+        assert loads(response)["data"]["updated_count"] == 2
+
+        mock_cursor.execute.assert_called_once()
+        query, params = mock_cursor.execute.call_args[0]
+        assert "FROM (VALUES (%s, %s::integer), (%s, %s::integer))" in query
+        assert params == ["R1_UAV", 10, "R3_PUMPS", 30]
+
+    @patch('app.db.get_connection')
+    def test_update_resource_capacities_failure_releases_connection(self, mock_get_conn):
+        """A failed UPDATE returns 500 and still hands the connection back."""
+        mock_conn = mock_get_conn.return_value
+        mock_conn.cursor.return_value.execute.side_effect = Exception("DB error")
+
+        response = self.client.put("/resource-types/capacities", json={"capacities": {"R1_UAV": 10}})
+
+        assert response.status_code == 500
+        mock_conn.commit.assert_not_called()
+        mock_conn.close.assert_called_once()
+
+    @pytest.mark.parametrize('path, payload', [
+        ("/resource-types/capacities", {"capacities": {}}),
+        ("/zones/parameters", {"zones": {}}),
+    ])
+    @patch('app.db.get_connection')
+    def test_empty_bulk_update_rejected_before_db(self, mock_get_conn, path, payload):
+        """Empty update maps fail validation without opening a connection."""
+        response = self.client.put(path, json=payload)
+
+        assert response.status_code == 422
+        mock_get_conn.assert_not_called()
+
+    @pytest.mark.parametrize("action", ["created", "updated"])
+    @patch('app.main.upsert_threshold_config')
+    def test_update_thresholds_single_upsert(self, mock_upsert, action):
+        """PUT /thresholds writes with one upsert and reports which case applied."""
+        mock_upsert.return_value = action
+
+        response = self.client.put("/thresholds", json={})
+        assert response.status_code == 200
+        assert loads(response)["message"] == f"Threshold configuration {action} successfully"
+        mock_upsert.assert_called_once()
+
+    @patch('app.main.upsert_threshold_config', return_value=None)
+    def test_update_thresholds_failure(self, mock_upsert):
+        """A failed upsert is a 500."""
+        response = self.client.put("/thresholds", json={})
+        assert response.status_code == 500
 
-    @patch('app.main.DataFetcher')
-    def test_gauges_endpoint(self, mock_data_fetcher):
+    def test_gauges_endpoint(self):
         """Test gauges endpoint."""
-        # Mock DataFetcher
-        mock_fetcher = Mock()
-        mock_fetcher.stations = {
-            "STL": {
+        # Replace the pre-encoded gauge rows
+        gauges = [
+            {
+                "id": "STL",
                 "name": "St. Louis Gauge",
                 "lat": 38.6270,
                 "lon": -90.1994,
-                "id": "07010000",
+                "usgs_id": "07010000",
             },
-            "HERMANN": {
+            {
+                "id": "HERMANN",
                 "name": "Hermann Gauge",
                 "lat": 38.7075,
                 "lon": -91.4497,
-                "id": "06934500",
+                "usgs_id": "06934500",
             },
-        }
-        mock_data_fetcher.return_value = mock_fetcher
+        ]
 
-        response = self.client.get("/gauges")
+        with patch('app.main._GAUGE_ROWS_JSON', dumps(gauges)):
+            response = self.client.get("/gauges")
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["success"] is True
         assert "rows" in data["data"]
         assert len(data["data"]["rows"]) == 2
         assert data["data"]["rows"][0]["id"] == "STL"
         assert data["data"]["rows"][0]["name"] == "St. Louis Gauge"
-
-    @patch('app.main.get_sqlalchemy_engine')
-    def test_zones_geo_endpoint(self, mock_engine):
-        """Test zones GeoJSON endpoint."""
-        # Mock database response
-        geo_data = {
-            'zone_id': ['ZONE_001', 'ZONE_002'],
-            'name': ['Downtown', 'West End'],
-            'river_proximity': [0.9, 0.6],
-            'elevation_risk': [0.3, 0.5],
-            'pop_density': [0.8, 0.4],
-            'crit_infra_score': [0.7, 0.3],
-            'hospital_count': [2, 0],
-            'critical_infra': [True, False],
-            'geojson': [
-                {"type": "Polygon", "coordinates": [[[-90.2, 38.6], [-90.1, 38.6], [-90.1, 38.7], [-90.2, 38.7]]]},
-                {"type": "Polygon", "coordinates": [[[-90.3, 38.5], [-90.2, 38.5], [-90.2, 38.6], [-90.3, 38.6]]]},
-            ]
+        assert data["message"] == "Gauges retrieved successfully"
+        assert "timestamp" in data
+
+    async def test_gauges_derived_from_stations(self, api_cache):
+        """Gauge rows mirror the DataFetcher station config."""
+        from app.prediction.data_fetcher import STATIONS
+
+        rows = (await api_cache.get_json("/gauges"))["data"]["rows"]
+        assert [row["id"] for row in rows] == list(STATIONS)
+        assert rows[0]["usgs_id"] == STATIONS[rows[0]["id"]]["id"]
+
+    @patch('app.main.fetch_records')
+    def test_zones_geo_endpoint(self, mock_fetch):
+        """The FeatureCollection assembled in SQL is returned verbatim."""
+        polygon = {"type": "Polygon", "coordinates": [[[-90.2, 38.6], [-90.1, 38.6], [-90.1, 38.7]]]}
+        collection = {
+            "type": "FeatureCollection",
+            "features": [{
+                "type": "Feature",
+                "geometry": polygon,
+                "properties": {
+                    "zone_id": "ZONE_001", "name": "Downtown", "river_proximity": 0.9,
+                    "elevation_risk": 0.3, "pop_density": 0.8, "crit_infra_score": 0.7,
+                    "hospital_count": 2, "critical_infra": True,
+                },
+            }],
         }
-        df = pd.DataFrame(geo_data)
-        mock_engine.return_value.read_sql_query.return_value = df
+        body = dumps(collection)
+        mock_fetch.return_value = [{"feature_collection": body.decode()}]
 
         response = self.client.get("/zones-geo")
         assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        # Byte-identical to the encoded collection, so there is nothing left to decode
+        assert response.content == body
+        assert "zg.geojson->'geometry'" in mock_fetch.call_args.args[0]
+        # The whole-table aggregate runs under its own, longer statement timeout
+        from app.db import DB_BULK_READ_TIMEOUT_MS
+        assert mock_fetch.call_args.kwargs == {"timeout_ms": DB_BULK_READ_TIMEOUT_MS}
+
+    @patch('app.main.fetch_records')
+    def test_zones_geo_without_geometry(self, mock_fetch):
+        """geometry=none should skip the JSONB column and emit null geometries."""
+        mock_fetch.return_value = [{"feature_collection": '{"type": "FeatureCollection", "features": []}'}]
+
+        response = self.client.get("/zones-geo?geometry=none")
+        assert response.status_code == 200
+        assert loads(response)["features"] == []
+
+        query = mock_fetch.call_args.args[0]
+        assert "zg.geojson" not in query
+        assert "'geometry', NULL" in query
+
+    @patch('app.main.fetch_records')
+    def test_zones_geo_properties_built_in_sql(self, mock_fetch):
+        """Scores are cast in SQL and unmatched zones default critical_infra to false."""
+        mock_fetch.return_value = [{"feature_collection": '{"type": "FeatureCollection", "features": []}'}]
+
+        self.client.get("/zones-geo?geometry=none")
 
-        data = response.json()
-        assert data["type"] == "FeatureCollection"
-        assert len(data["features"]) == 2
-        assert data["features"][0]["properties"]["zone_id"] == "ZONE_001"
-        assert data["features"][0]["type"] == "Feature"
+        query = mock_fetch.call_args.args[0]
+        assert "z.river_proximity::float8" in query
+        assert "COALESCE(z.critical_infra, false)" in query
+        assert "'[]'::json" in query
+
+    @patch('app.main.fetch_records', side_effect=Exception("DB error"))
+    def test_zones_geo_database_error(self, mock_fetch):
+        """Database failures surface as 500s."""
+        response = self.client.get("/zones-geo")
+        assert response.status_code == 500
+        assert "Failed to load zone geometries" in loads(response)["detail"]
 
     @patch('app.main.get_last_30_days_raw_data')
     @patch('app.main.predict_next_days')
@@ -539,7 +883,7 @@ class TestAPIEndpoints:
         response = self.client.get("/predict?use_real_time_api=false")
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["use_real_time_api"] is False
         assert "database" in data["data_source"]
         assert len(data["predictions"]) == 1
@@ -570,10 +914,55 @@ class TestAPIEndpoints:
         response = self.client.get("/predict?use_real_time_api=true")
         assert response.status_code == 200
 
-        data = response.json()
+        data = loads(response)
         assert data["use_real_time_api"] is True
         assert "real-time APIs" in data["data_source"]
 
+    @patch.dict('app.main.PREDICT_CACHE', clear=True)
+    @patch('app.main.get_raw_data_version')
+    @patch('app.main.get_all_raw_data')
+    @patch('app.main.predict_next_days')
+    def test_predict_endpoint_serves_cached_response(self, mock_predict, mock_get_data, mock_version, sample_raw_data):
+        """Repeated requests against unchanged data reuse the cached response."""
+        from app.schemas import Prediction
+        mock_get_data.return_value = sample_raw_data
+        mock_version.return_value = ('2025-12-10', '2025-12-10T06:00:00', 30)
+        mock_predict.return_value = [Prediction(lead_time_days=1, forecast_date='2025-12-11')]
+
+        first = self.client.get("/predict")
+        second = self.client.get("/predict")
+        assert first.status_code == 200
+        assert loads(second) == loads(first)
+        mock_predict.assert_called_once()
+        # One version lookup per request, shared with the raw_data frame cache
+        assert mock_version.call_count == 2
+        mock_get_data.assert_called_once_with(mock_version.return_value)
+
+        # Rewritten raw data (same last date, newer write) invalidates the cached entry
+        mock_version.return_value = ('2025-12-10', '2025-12-10T07:00:00', 30)
+        third = self.client.get("/predict")
+        assert third.status_code == 200
+        assert mock_predict.call_count == 2
+
+    @patch.dict('app.main.PREDICT_CACHE', clear=True)
+    @patch('app.main.get_raw_data_version', return_value=('2025-12-10', '2025-12-10T06:00:00', 30))
+    @patch('app.main.get_all_raw_data')
+    @patch('app.main.predict_next_days')
+    def test_predict_endpoint_cache_expires(self, mock_predict, mock_get_data, mock_version,
+                                            sample_raw_data, time_travel):
+        """A cached /predict response is recomputed after PREDICT_CACHE_TTL."""
+        from app.main import PREDICT_CACHE_TTL
+        from app.schemas import Prediction
+        mock_get_data.return_value = sample_raw_data
+        mock_predict.return_value = [Prediction(lead_time_days=1, forecast_date='2025-12-11')]
+
+        self.client.get("/predict")
+        time_travel.shift(timedelta(seconds=PREDICT_CACHE_TTL))
+        response = self.client.get("/predict")
+
+        assert response.status_code == 200
+        assert mock_predict.call_count == 2
+
     @patch('app.main.get_last_30_days_raw_data')
     def test_predict_endpoint_insufficient_data(self, mock_get_data):
         """Test predict endpoint with insufficient data."""
@@ -584,4 +973,144 @@ class TestAPIEndpoints:
 
         response = self.client.get("/predict?use_real_time_api=false")
         assert response.status_code == 400
-        assert "Insufficient data" in response.json()["detail"]
+        assert "Insufficient data" in loads(response)["detail"]
+
+
+class TestPredictionOffloading:
+    """Test that model inference and database reads do not run on the event loop."""
+
+    @pytest.mark.parametrize("blocking_call, handler", [
+        ('app.main.predict_next_days', lambda main: main._run_predictions(pd.DataFrame(), [1])),
+        ('app.main.get_last_raw_data_date', lambda main: main.last_raw_data_date()),
+    ], ids=["inference", "db-read"])
+    async def test_blocking_calls_use_worker_thread(self, blocking_call, handler):
+        """Blocking inference and database reads execute outside the event loop thread."""
+        import threading
+        import app.main as main_module
+
+        worker_threads = []
+
+        def _record_thread(*args, **kwargs):
+            worker_threads.append(threading.get_ident())
+            return '2025-12-10T00:00:00'
+
+        with patch(blocking_call, side_effect=_record_thread) as mock_blocking:
+            await handler(main_module)
+
+        mock_blocking.assert_called_once()
+        assert worker_threads[0] != threading.get_ident()
+
+    @patch.dict('os.environ', {'PRELOAD_MODELS': 'true'})
+    @patch('app.main.ensure_default_threshold_config')
+    @patch('app.main.warm_predictors')
+    def test_startup_overlaps_model_preload_and_threshold_bootstrap(self, mock_warm, mock_ensure):
+        """Neither startup task waits for the other to finish."""
+        import threading
+
+        # Each side blocks until the other has started, so a sequential
+        # startup would time out on the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+        mock_warm.side_effect = lambda lead_times: barrier.wait()
+        mock_ensure.side_effect = lambda: barrier.wait()
+
+        with TestClient(app):
+            pass
+
+        mock_warm.assert_called_once_with([1, 2, 3])
+        mock_ensure.assert_called_once()
+
+
+class TestEventLoop:
+    """Test the event loop the async tests run on."""
+
+    async def test_async_tests_run_on_uvloop(self):
+        """pytest-asyncio picks up the uvloop policy set in conftest."""
+        uvloop = pytest.importorskip("uvloop")
+        assert isinstance(asyncio.get_running_loop(), uvloop.Loop)
+
+
+class TestVulnerabilityCategories:
+    """Test vulnerability bucketing used by rule-based dispatch."""
+
+    def test_vuln_categories_bins(self):
+        """Categories switch at 0.33 and 0.66, lower bound inclusive."""
+        from app.main import _vuln_categories
+
+        result = _vuln_categories({'a': 0.0, 'b': 0.329, 'c': 0.33, 'd': 0.659, 'e': 0.66, 'f': 1.0})
+
+        assert result == {'a': 'LOW', 'b': 'LOW', 'c': 'MEDIUM', 'd': 'MEDIUM', 'e': 'HIGH', 'f': 'HIGH'}
+        assert _vuln_categories({}) == {}
+
+
+class TestZoneMetrics:
+    """Test the per-zone pf/vulnerability/impact arrays used by rule-based dispatch."""
+
+    def test_zone_metrics_match_scalar_rounding(self):
+        """Array results agree with rounding each zone's values individually."""
+        from types import SimpleNamespace
+        from app.main import _zone_metrics
+
+        zones = [
+            SimpleNamespace(id='Z1', vulnerability=0.71234),
+            SimpleNamespace(id='Z2', vulnerability=0.2),
+            SimpleNamespace(id='Z3', vulnerability=0.55555),
+        ]
+        pf_by_zone = {'Z1': 0.812345, 'Z2': 0.1}
+
+        metrics = _zone_metrics(zones, pf_by_zone)
+
+        for zone in zones:
+            pf = round(pf_by_zone.get(zone.id, 0.0), 4)
+            vulnerability = round(zone.vulnerability, 3)
+            assert metrics[zone.id] == pytest.approx((pf, vulnerability, round(pf * vulnerability, 4)))
+        assert metrics['Z3'][0] == 0.0
+        assert _zone_metrics([], {}) == {}
+
+
+class TestSafeDfRecords:
+    """Test DataFrame to JSON-safe record conversion."""
+
+    def test_safe_df_records_sanitizes_values(self):
+        """NaN/inf become None, datetimes become ISO strings and ints stay ints."""
+        import numpy as np
+        from app.main import _safe_df_records
+
+        df = pd.DataFrame({
+            'count': [1, 2],
+            'level': [1.5, np.inf],
+            'date': pd.to_datetime(['2025-01-01', '2025-01-02']),
+            'name': ['a', None],
+        })
+
+        records = _safe_df_records(df)
+
+        assert records == [
+            {'count': 1, 'level': 1.5, 'date': '2025-01-01T00:00:00', 'name': 'a'},
+            {'count': 2, 'level': None, 'date': '2025-01-02T00:00:00', 'name': None},
+        ]
+        assert isinstance(records[0]['count'], int)
+
+
+class TestSafeJSONResponse:
+    """Test the default response renderer."""
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_json_backends_match(self, use_orjson):
+        """orjson and the stdlib fallback render the same body and decode it back alike."""
+        import numpy as np
+        import app.json_compat as json_compat
+        from app.main import SafeJSONResponse
+
+        if use_orjson and not json_compat.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+
+        content = {
+            'level': float('nan'), 'peak': np.float64(np.inf), 'huge': [1e150, -1e101, 2.5],
+            'count': np.int64(3), 'label': 'ok',
+        }
+        with patch.object(json_compat, 'HAS_ORJSON', use_orjson):
+            body = SafeJSONResponse(content).body
+            decoded = json_compat.loads(body)
+
+        assert body == b'{"level":null,"peak":null,"huge":[null,null,2.5],"count":3,"label":"ok"}'
+        assert decoded == {'level': None, 'peak': None, 'huge': [None, None, 2.5], 'count': 3, 'label': 'ok'}
@@ -1,10 +1,15 @@
 """
 Test database setup utilities for pytest fixtures.
 """
+import hashlib
+import inspect
+from functools import lru_cache
 import pytest
 import psycopg2
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 import os
+from datetime import date, timedelta
 
 # Test database configuration
 TEST_DB_CONFIG = {
@@ -16,43 +21,134 @@ TEST_DB_CONFIG = {
 }
 
 
-@pytest.fixture(scope='session')
-def test_db_engine():
-    """Create test database engine."""
-    db_url = (
+# Seed rows are dated from a fixed day rather than today, so the template
+# built by one run still holds the same rows the next run's tests expect
+SEED_AS_OF_DATE = date(2025, 12, 10)
+
+SCHEMA_FILE = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'database', 'init', '01-schema.sql'
+)
+
+# Schema and seed rows are built once into a template database; each pytest
+# (xdist) process then clones its own database from it, which is a file copy
+# on the server instead of replaying the DDL and inserts every session.
+_TEMPLATE_LOCK_KEY = 7_010_000  # pg_advisory_lock key serializing template creation
+
+
+def _db_url(database):
+    return (
         f"postgresql://{TEST_DB_CONFIG['user']}:{TEST_DB_CONFIG['password']}"
-        f"@{TEST_DB_CONFIG['host']}:{TEST_DB_CONFIG['port']}/{TEST_DB_CONFIG['database']}"
+        f"@{TEST_DB_CONFIG['host']}:{TEST_DB_CONFIG['port']}/{database}"
     )
 
-    engine = create_engine(db_url)
 
-    # Initialize test schema
-    with engine.connect() as conn:
-        # Create schema from the actual schema file
-        schema_file = os.path.join(os.path.dirname(__file__), '..', 'database', 'init', '01-schema.sql')
-        if os.path.exists(schema_file):
-            with open(schema_file, 'r') as f:
-                schema_sql = f.read()
-                conn.execute(text(schema_sql))
+def _worker_db_name():
+    """Database for this pytest process (one per xdist worker)."""
+    return f"{TEST_DB_CONFIG['database']}_{os.getenv('PYTEST_XDIST_WORKER', 'main')}"
+
+
+@lru_cache(maxsize=None)
+def _template_db_name():
+    """Template name keyed on the schema and seed, so editing either rebuilds it."""
+    digest = hashlib.blake2b(digest_size=6)
+    with open(SCHEMA_FILE, 'rb') as f:
+        digest.update(f.read())
+    digest.update(inspect.getsource(_insert_test_data).encode())
+    digest.update(SEED_AS_OF_DATE.isoformat().encode())
+    return f"{TEST_DB_CONFIG['database']}_template_{digest.hexdigest()}"
+
+
+def _ensure_template(admin_cursor):
+    """Create and seed the template database unless an earlier run already did."""
+    template = _template_db_name()
+    # Workers start together; the lock makes the others wait for the first one
+    admin_cursor.execute("SELECT pg_advisory_lock(%s)", (_TEMPLATE_LOCK_KEY,))
+    try:
+        admin_cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (template,))
+        if admin_cursor.fetchone() is not None:
+            return
+        # Start from the configured database so anything its init scripts set
+        # up (extensions, schema) carries over
+        admin_cursor.execute(
+            f'CREATE DATABASE "{template}" TEMPLATE "{TEST_DB_CONFIG["database"]}"'
+        )
+        try:
+            engine = create_engine(_db_url(template), poolclass=NullPool)
+            try:
+                with engine.begin() as conn:
+                    # Create schema from the actual schema file
+                    with open(SCHEMA_FILE, 'r') as f:
+                        conn.exec_driver_sql(f.read())
+
+                    # Insert test data
+                    _insert_test_data(conn)
+            finally:
+                engine.dispose()
+        except Exception:
+            # A half-built template would otherwise be reused by every later run
+            admin_cursor.execute(f'DROP DATABASE IF EXISTS "{template}" WITH (FORCE)')
+            raise
+    finally:
+        admin_cursor.execute("SELECT pg_advisory_unlock(%s)", (_TEMPLATE_LOCK_KEY,))
 
-        # Insert test data
-        _insert_test_data(conn)
 
-    yield engine
+@pytest.fixture(scope='session')
+def test_db_config():
+    """Connection settings for this process's database, cloned from the template."""
+    admin = psycopg2.connect(**{**TEST_DB_CONFIG, 'database': 'postgres'})
+    admin.autocommit = True  # CREATE/DROP DATABASE can't run in a transaction
+    cursor = admin.cursor()
+    worker_db = _worker_db_name()
+    try:
+        _ensure_template(cursor)
+        cursor.execute(f'DROP DATABASE IF EXISTS "{worker_db}" WITH (FORCE)')
+        cursor.execute(f'CREATE DATABASE "{worker_db}" TEMPLATE "{_template_db_name()}"')
+
+        yield {**TEST_DB_CONFIG, 'database': worker_db}
+
+        cursor.execute(f'DROP DATABASE IF EXISTS "{worker_db}" WITH (FORCE)')
+    finally:
+        cursor.close()
+        admin.close()
+
+
+@pytest.fixture(scope='session')
+def test_db_engine(test_db_config):
+    """Create test database engine, with the app pointed at the same database."""
+    from unittest.mock import patch
+    import app.db as db_module
+
+    # The tests use their own psycopg2 connection, so there is nothing to pool or ping
+    engine = create_engine(_db_url(test_db_config['database']), poolclass=NullPool, pool_pre_ping=False)
+    with patch.dict(db_module.DB_CONFIG, {'database': test_db_config['database']}), \
+            patch.object(db_module, '_engine', None):
+        yield engine
 
     # Cleanup
     engine.dispose()
 
 
-@pytest.fixture
-def test_db_connection(test_db_engine):
-    """Create test database connection."""
-    conn = psycopg2.connect(**TEST_DB_CONFIG)
-    conn.autocommit = True
+@pytest.fixture(scope='session')
+def _test_db_shared_connection(test_db_engine, test_db_config):
+    """One psycopg2 connection reused by every test in the session."""
+    conn = psycopg2.connect(**test_db_config)
     yield conn
     conn.close()
 
 
+@pytest.fixture
+def test_db_connection(_test_db_shared_connection):
+    """
+    Test database connection whose writes are discarded after each test.
+
+    Each test runs inside the connection's implicit transaction, which is rolled
+    back on teardown; tests must not commit, so no rows leak between them.
+    """
+    conn = _test_db_shared_connection
+    yield conn
+    conn.rollback()
+
+
 def _insert_test_data(conn):
     """Insert test data for integration tests."""
     # Insert test zones
@@ -63,7 +159,7 @@ def _insert_test_data(conn):
     ]
 
     for zone_data in zones_data:
-        conn.execute("""
+        conn.exec_driver_sql("""
             INSERT INTO zones (zone_id, name, river_proximity, elevation_risk, pop_density, crit_infra_score, hospital_count, critical_infra)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             ON CONFLICT (zone_id) DO NOTHING
@@ -81,22 +177,20 @@ def _insert_test_data(conn):
     ]
 
     for resource in resource_data:
-        conn.execute("""
+        conn.exec_driver_sql("""
             INSERT INTO resource_types (resource_id, name, description, icon, display_order, capacity)
             VALUES (%s, %s, %s, %s, %s, %s)
             ON CONFLICT (resource_id) DO NOTHING
         """, resource)
 
     # Insert test raw data
-    from datetime import datetime, timedelta
-
-    base_date = datetime.now() - timedelta(days=30)
+    base_date = SEED_AS_OF_DATE - timedelta(days=30)
     raw_data = []
 
     for i in range(30):
         date = base_date + timedelta(days=i)
         raw_data.append((
-            date.date(),
+            date,
             0.1 + i * 0.01,  # daily_precip
             20.0 + i * 0.1,  # daily_temp_avg
             0.0,  # daily_snowfall
@@ -108,7 +202,7 @@ def _insert_test_data(conn):
             8.0 + i * 0.1,   # grafton_level
         ))
 
-    conn.executemany("""
+    conn.exec_driver_sql("""
         INSERT INTO raw_data (date, daily_precip, daily_temp_avg, daily_snowfall, daily_humidity, daily_wind, soil_deep_30d, target_level_max, hermann_level, grafton_level)
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         ON CONFLICT (date) DO NOTHING
@@ -118,9 +212,9 @@ def _insert_test_data(conn):
     prediction_data = []
     for lead_time in [1, 2, 3]:
         for i in range(5):  # 5 predictions per lead time
-            date = datetime.now() + timedelta(days=lead_time + i)
+            date = SEED_AS_OF_DATE + timedelta(days=lead_time + i)
             prediction_data.append((
-                date.date(),
+                date,
                 lead_time,
                 f"v1.0.0-test",
                 10.0 + lead_time + i * 0.5,  # predicted_level
@@ -130,7 +224,7 @@ def _insert_test_data(conn):
                 "ensemble"  # model_type
             ))
 
-    conn.executemany("""
+    conn.exec_driver_sql("""
         INSERT INTO predictions (date, days_ahead, model_version, predicted_level, lower_bound_80, upper_bound_80, flood_probability, model_type)
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         ON CONFLICT (date, days_ahead) DO NOTHING
@@ -4,6 +4,7 @@ Tests for database operations and models.
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import pandas as pd
+from datetime import datetime, timedelta
 
 from app.db import (
     get_connection,
@@ -18,6 +19,7 @@ from app.db import (
     insert_resource_type,
     insert_raw_data_batch,
     get_all_resource_types_typed,
+    ensure_default_threshold_config,
 )
 from app.db_models import (
     PredictionInsert,
@@ -35,23 +37,50 @@ class TestDatabaseConnection:
     """Test database connection functions."""
 
     @patch('app.db.psycopg2.connect')
-    def test_get_connection_success(self, mock_connect):
-        """Test successful database connection."""
-        mock_conn = Mock()
-        mock_connect.return_value = mock_conn
-
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_get_connection_success(self, mock_engine, mock_connect):
+        """Connections are checked out of the engine pool, not opened per call."""
         conn = get_connection()
-        assert conn == mock_conn
-        mock_connect.assert_called_once()
+        assert conn is mock_engine.return_value.raw_connection.return_value
+        mock_connect.assert_not_called()
 
-    @patch('app.db.psycopg2.connect')
-    def test_get_connection_failure(self, mock_connect):
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_get_connection_failure(self, mock_engine):
         """Test database connection failure."""
-        mock_connect.side_effect = Exception("Connection failed")
+        mock_engine.return_value.raw_connection.side_effect = Exception("Connection failed")
 
         with pytest.raises(Exception):
             get_connection()
 
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_fetch_records_returns_dicts_and_releases_connection(self, mock_engine):
+        """Rows are zipped with the cursor's column names; the pooled connection is returned."""
+        from app.db import fetch_records
+        mock_conn = mock_engine.return_value.raw_connection.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.description = [('zone_id',), ('score',)]
+        mock_cursor.fetchall.return_value = [('Z1', 0.5), ('Z2', None)]
+
+        rows = fetch_records("SELECT zone_id, score FROM zones", None, timeout_ms=0)
+
+        assert rows == [{'zone_id': 'Z1', 'score': 0.5}, {'zone_id': 'Z2', 'score': None}]
+        mock_cursor.execute.assert_called_once_with("SELECT zone_id, score FROM zones", None)
+        mock_cursor.close.assert_called_once()
+        mock_conn.close.assert_called_once()
+
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_fetch_records_scopes_statement_timeout(self, mock_engine):
+        """The timeout is SET LOCAL on the reading transaction only."""
+        from app.db import fetch_records
+        mock_cursor = mock_engine.return_value.raw_connection.return_value.cursor.return_value
+        mock_cursor.description = [('zone_id',)]
+        mock_cursor.fetchall.return_value = []
+
+        fetch_records("SELECT zone_id FROM zones", timeout_ms=2500)
+
+        assert mock_cursor.execute.call_args_list[0].args == ("SET LOCAL statement_timeout = %s", (2500,))
+        assert mock_cursor.execute.call_args_list[1].args == ("SELECT zone_id FROM zones", None)
+
     @patch('app.db.get_connection')
     def test_test_connection_success(self, mock_get_conn):
         """Test successful connection test."""
@@ -71,6 +100,80 @@ class TestDatabaseConnection:
         assert result is False
 
 
+    @patch('app.db.event')
+    @patch('app.db.create_engine')
+    def test_sqlalchemy_engine_pool_settings(self, mock_create_engine, mock_event):
+        """Engine should be created once with a tuned, self-healing pool."""
+        import app.db as db_module
+        with patch.object(db_module, '_engine', None):
+            engine = db_module.get_sqlalchemy_engine()
+            assert db_module.get_sqlalchemy_engine() is engine
+
+        mock_create_engine.assert_called_once()
+        kwargs = mock_create_engine.call_args.kwargs
+        assert kwargs['pool_pre_ping'] is True
+        assert kwargs['pool_use_lifo'] is True
+        assert kwargs['pool_size'] == db_module.DB_POOL_SIZE
+        assert kwargs['max_overflow'] == db_module.DB_MAX_OVERFLOW
+        # The statement timeout is per query, not engine-wide
+        assert 'connect_args' not in kwargs
+        mock_event.listen.assert_called_once_with(engine, "connect", db_module._prepare_statements)
+
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_get_pool_status(self, mock_engine):
+        """Pool counters are read straight off the engine's pool."""
+        from app.db import get_pool_status
+        pool = mock_engine.return_value.pool
+        pool.size.return_value = 8
+        pool.checkedin.return_value = 3
+        pool.checkedout.return_value = 2
+        pool.overflow.return_value = -6
+        pool.status.return_value = "Pool size: 8"
+
+        status = get_pool_status()
+
+        assert status['checked_out'] == 2
+        assert status['overflow'] == -6
+        assert status['status'] == "Pool size: 8"
+
+    def test_prepare_statements_on_connect(self):
+        """Every hot lookup is PREPAREd on a new pooled connection."""
+        from app.db import _prepare_statements, PREPARED_STATEMENTS
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        _prepare_statements(mock_conn, None)
+
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert executed == [f"PREPARE {name} {body}" for name, body in PREPARED_STATEMENTS.items()]
+        mock_conn.commit.assert_called_once()
+        mock_cursor.close.assert_called_once()
+
+    def test_prepare_statements_failure_keeps_connection(self):
+        """A failed PREPARE is rolled back instead of breaking the connection."""
+        from app.db import _prepare_statements
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.execute.side_effect = Exception("relation does not exist")
+        mock_conn.cursor.return_value = mock_cursor
+
+        _prepare_statements(mock_conn, None)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    def test_register_json_decoders(self):
+        """json/jsonb columns are decoded with the shared loads()."""
+        import app.db as db_module
+        with patch('app.db.psycopg2.extras.register_default_json') as mock_json, \
+                patch('app.db.psycopg2.extras.register_default_jsonb') as mock_jsonb:
+            db_module._register_json_decoders()
+
+        mock_json.assert_called_once_with(globally=True, loads=db_module.loads)
+        mock_jsonb.assert_called_once_with(globally=True, loads=db_module.loads)
+
+
 class TestPredictionOperations:
     """Test prediction-related database operations."""
 
@@ -97,6 +200,19 @@ class TestPredictionOperations:
         assert 'date' in result.columns
         mock_read_sql.assert_called_once()
 
+    @patch('app.db.pd.read_sql_query')
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_last_30_days_ordered_in_sql(self, mock_engine, mock_read_sql, sample_raw_data):
+        """The window comes back oldest first from the query itself, unreversed."""
+        from app.db import _fetch_last_30_days_raw_data
+        mock_read_sql.return_value = sample_raw_data.copy()
+
+        result = _fetch_last_30_days_raw_data()
+
+        query = mock_read_sql.call_args.args[0]
+        assert query.index("ORDER BY date DESC") < query.index("LIMIT 30") < query.index("ORDER BY date ASC")
+        assert result['date'].tolist() == sample_raw_data['date'].tolist()
+
     @patch('app.db.get_sqlalchemy_engine')
     def test_get_last_30_days_raw_data_failure(self, mock_engine):
         """Test failure case for raw data retrieval."""
@@ -105,17 +221,83 @@ class TestPredictionOperations:
         result = get_last_30_days_raw_data()
         assert result is None
 
+    @patch('app.db._fetch_last_30_days_raw_data')
+    @patch('app.db.get_raw_data_version')
+    def test_get_last_30_days_raw_data_cached_until_new_data(self, mock_version, mock_fetch, sample_raw_data):
+        """Repeat reads are served from the cache until raw_data gains or rewrites rows."""
+        from datetime import date
+        written = datetime(2025, 1, 30, 6, 0)
+        mock_version.return_value = (date(2025, 1, 30), written, 30)
+        mock_fetch.return_value = sample_raw_data
+
+        first = get_last_30_days_raw_data()
+        first.loc[0, 'daily_precip'] = -1.0  # callers get their own copy
+        second = get_last_30_days_raw_data()
+
+        assert mock_fetch.call_count == 1
+        assert second.loc[0, 'daily_precip'] == sample_raw_data.loc[0, 'daily_precip']
+
+        # An out-of-process reload rewrites existing dates: MAX(date) is unchanged
+        mock_version.return_value = (date(2025, 1, 30), written + timedelta(hours=1), 30)
+        get_last_30_days_raw_data()
+        assert mock_fetch.call_count == 2
+
+        # A version the caller already looked up is reused instead of queried again
+        mock_version.reset_mock()
+        get_last_30_days_raw_data(mock_version.return_value)
+        mock_version.assert_not_called()
+        assert mock_fetch.call_count == 2
+
+    @patch('app.db._fetch_all_raw_data')
+    @patch('app.db.get_raw_data_version')
+    def test_get_all_raw_data_not_cached_without_version(self, mock_version, mock_fetch):
+        """An empty table (no version) always goes to the database."""
+        mock_version.return_value = None
+        mock_fetch.return_value = pd.DataFrame()
+
+        get_all_raw_data()
+        get_all_raw_data()
+
+        assert mock_fetch.call_count == 2
+
+    @patch('app.db.fetch_records')
+    def test_get_raw_data_version(self, mock_fetch):
+        """The marker combines the latest date, the latest write and the row count."""
+        from datetime import date
+        from app.db import get_raw_data_version
+        written = datetime(2025, 1, 30, 6, 0)
+        mock_fetch.return_value = [{'last_date': date(2025, 1, 30), 'last_write': written, 'row_count': 30}]
+
+        assert get_raw_data_version() == (date(2025, 1, 30), written, 30)
+        query = mock_fetch.call_args.args[0]
+        assert "MAX(created_at)" in query and "COUNT(*)" in query
+
+        mock_fetch.return_value = [{'last_date': None, 'last_write': None, 'row_count': 0}]
+        assert get_raw_data_version() is None
+        mock_fetch.side_effect = Exception("DB error")
+        assert get_raw_data_version() is None
+
+    @patch('app.db.pd.read_sql_query')
+    @patch('app.db.get_sqlalchemy_engine')
+    def test_get_raw_data_page_limits_in_sql(self, mock_engine, mock_read_sql):
+        """Paging and the as-of cutoff are bound into the query."""
+        from app.db import get_raw_data_page
+        mock_read_sql.return_value = pd.DataFrame({'date': ['2025-01-02']})
+
+        df = get_raw_data_page(10, 20, '2025-01-31')
+
+        query = mock_read_sql.call_args.args[0]
+        assert "WHERE date <= %s" in query
+        assert "LIMIT %s OFFSET %s" in query
+        assert mock_read_sql.call_args.kwargs['params'] == ('2025-01-31', 10, 20)
+        assert str(df['date'].dtype).startswith('datetime64')
+
+    @patch('app.db.psycopg2.extras.execute_values')
     @patch('app.db.get_connection')
-    def test_insert_prediction_success(self, mock_get_conn, sample_prediction_record):
-        """Test successful prediction insertion."""
-        # Setup mock
-        mock_conn = Mock()
-        mock_cursor = Mock()
-        mock_cursor.rowcount = 1  # Simulate update
-        mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+    def test_insert_prediction_success(self, mock_get_conn, mock_execute_values, sample_prediction_record):
+        """A single prediction goes through the batch upsert as one row."""
+        mock_conn = mock_get_conn.return_value
 
-        # Test
         insert_prediction(
             forecast_date="2025-12-11",
             predicted_level=13.2,
@@ -125,88 +307,164 @@ class TestPredictionOperations:
             upper_bound_80=13.6
         )
 
-        # Verify
-        mock_cursor.execute.assert_called()
+        mock_execute_values.assert_called_once()
+        values = mock_execute_values.call_args.args[2]
+        assert [row[:2] for row in values] == [("2025-12-11", 1)]
         mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called_once()
 
-    @patch('app.db.get_sqlalchemy_engine')
-    def test_get_prediction_success(self, mock_engine):
-        """Test successful prediction retrieval."""
-        # Setup mock data
-        data = {
-            'predicted_level': [13.2],
-            'lower_bound_80': [12.8],
-            'upper_bound_80': [13.6],
-            'flood_probability': [0.1],
-            'days_ahead': [1],
-            'date': ['2025-12-11'],
-            'created_at': ['2025-12-10 12:00:00'],
-        }
-        df = pd.DataFrame(data)
+    @patch('app.db.psycopg2.extras.execute_values')
+    @patch('app.db.get_connection')
+    def test_insert_predictions_single_round_trip(self, mock_get_conn, mock_execute_values):
+        """A batch of predictions is one execute_values call and one commit."""
+        from app.db import insert_predictions
+        from app.db_models import PredictionInsert
+        mock_conn = mock_get_conn.return_value
+        records = [
+            PredictionInsert(forecast_date="2025-12-11", predicted_level=13.2, flood_probability=0.1, days_ahead=lead)
+            for lead in (1, 2, 3)
+        ]
 
-        # Setup mock
-        mock_read_sql = Mock(return_value=df)
-        mock_engine.return_value.read_sql_query = mock_read_sql
+        assert insert_predictions(records) == 3
+
+        mock_execute_values.assert_called_once()
+        query, values = mock_execute_values.call_args.args[1:3]
+        assert "ON CONFLICT (date, days_ahead)" in query
+        assert [row[:2] for row in values] == [("2025-12-11", 1), ("2025-12-11", 2), ("2025-12-11", 3)]
+        mock_conn.commit.assert_called_once()
+        assert insert_predictions([]) == 0
+        mock_get_conn.assert_called_once()
+
+    @patch('app.db.fetch_records')
+    def test_get_prediction_success(self, mock_fetch):
+        """Test successful prediction retrieval."""
+        from datetime import date
+        mock_fetch.return_value = [{
+            'predicted_level': 13.2,
+            'lower_bound_80': 12.8,
+            'upper_bound_80': 13.6,
+            'flood_probability': 0.1,
+            'days_ahead': 1,
+            'date': date(2025, 12, 11),
+            'created_at': '2025-12-10 12:00:00',
+        }]
 
         result = get_prediction("2025-12-11", 1)
 
         assert result is not None
         assert result['predicted_level'] == 13.2
         assert result['flood_probability'] == 0.1
-        mock_read_sql.assert_called_once()
+        assert result['forecast_date'] == '2025-12-11'
+        mock_fetch.assert_called_once_with("EXECUTE get_prediction(%s, %s)", ("2025-12-11", 1))
 
-    @patch('app.db.get_sqlalchemy_engine')
-    def test_get_prediction_not_found(self, mock_engine):
+    @patch('app.db.fetch_records', return_value=[])
+    def test_get_prediction_not_found(self, mock_fetch):
         """Test prediction retrieval when not found."""
-        # Setup empty mock data
-        df = pd.DataFrame()
-        mock_read_sql = Mock(return_value=df)
-        mock_engine.return_value.read_sql_query = mock_read_sql
-
         result = get_prediction("2025-12-11", 1)
 
         assert result is None
 
+    @patch('app.db.fetch_records')
+    def test_get_cached_prediction_keys(self, mock_fetch):
+        """Cached keys come back as (ISO date, lead time) pairs from one query."""
+        from datetime import date
+        from app.db import get_cached_prediction_keys
+        mock_fetch.return_value = [
+            {'date': date(2025, 12, 11), 'days_ahead': 1},
+            {'date': date(2025, 12, 12), 'days_ahead': 3},
+        ]
 
-class TestZoneOperations:
-    """Test zone-related database operations."""
+        keys = get_cached_prediction_keys([1, 3])
+
+        assert keys == {('2025-12-11', 1), ('2025-12-12', 3)}
+        mock_fetch.assert_called_once()
+        assert mock_fetch.call_args[0][1] == ([1, 3],)
+
+    @patch('app.db.fetch_records', side_effect=Exception("DB error"))
+    def test_get_cached_prediction_keys_failure(self, mock_fetch):
+        """A failed prefetch returns None so callers fall back to point lookups."""
+        from app.db import get_cached_prediction_keys
+
+        assert get_cached_prediction_keys([1]) is None
 
+    @pytest.mark.parametrize('days_ahead, statement, params', [
+        (2, "EXECUTE get_latest_prediction_by_lead(%s)", (2,)),
+        (None, "EXECUTE get_latest_prediction", None),
+    ])
+    @patch('app.db.fetch_records', return_value=[])
+    def test_get_latest_prediction_uses_prepared_statement(self, mock_fetch, days_ahead, statement, params):
+        """The optional lead-time filter selects a prepared statement, not a new SQL string."""
+        from app.db import get_latest_prediction
+
+        assert get_latest_prediction(days_ahead=days_ahead) is None
+        mock_fetch.assert_called_once_with(statement, params)
+
+
+    @patch('app.db.pd.read_sql_query')
     @patch('app.db.get_sqlalchemy_engine')
-    def test_get_all_zones_success(self, mock_engine):
-        """Test successful zone retrieval."""
-        # Setup mock data
-        data = {
-            'zone_id': ['ZONE_001', 'ZONE_002'],
-            'name': ['Downtown', 'West End'],
-            'river_proximity': [0.9, 0.6],
-            'elevation_risk': [0.3, 0.5],
-            'pop_density': [0.8, 0.4],
-            'crit_infra_score': [0.7, 0.3],
-            'hospital_count': [2, 0],
-            'critical_infra': [True, False],
-        }
-        df = pd.DataFrame(data)
+    def test_prediction_history_pages_before_joining_actuals(self, mock_engine, mock_read_sql):
+        """LIMIT/OFFSET apply to predictions before raw_data is joined in."""
+        from app.db import get_prediction_history_with_actuals
+        mock_read_sql.return_value = pd.DataFrame({'forecast_date': ['2024-01-01']})
 
-        # Setup mock
-        mock_read_sql = Mock(return_value=df)
-        mock_engine.return_value.read_sql_query = mock_read_sql
+        get_prediction_history_with_actuals(limit=10, offset=20)
+
+        query = mock_read_sql.call_args.args[0]
+        assert query.index("LIMIT %s OFFSET %s") < query.index("LEFT JOIN raw_data")
+        assert mock_read_sql.call_args.kwargs['params'] == (10, 20)
+
+
+class TestZoneOperations:
+    """Test zone-related database operations."""
+
+    @patch('app.db.fetch_records')
+    def test_get_all_zones_success(self, mock_fetch):
+        """Test successful zone retrieval; NULL defaults are applied in SQL."""
+        mock_fetch.return_value = [
+            {'zone_id': 'ZONE_001', 'name': 'Downtown', 'river_proximity': 0.9, 'elevation_risk': 0.3,
+             'pop_density': 0.8, 'crit_infra_score': 0.7, 'hospital_count': 2, 'critical_infra': True},
+            {'zone_id': 'ZONE_002', 'name': 'West End', 'river_proximity': 0.6, 'elevation_risk': 0.5,
+             'pop_density': 0.4, 'crit_infra_score': 0.3, 'hospital_count': 0, 'critical_infra': False},
+        ]
 
         result = get_all_zones()
 
-        assert len(result) == 2
-        assert result[0]['zone_id'] == 'ZONE_001'
-        assert result[0]['name'] == 'Downtown'
+        assert result == mock_fetch.return_value
+        query = mock_fetch.call_args.args[0]
+        assert "COALESCE(hospital_count, 0) AS hospital_count" in query
+        assert "COALESCE(critical_infra, FALSE) AS critical_infra" in query
 
-    @patch('app.db.get_sqlalchemy_engine')
-    def test_get_all_zones_empty(self, mock_engine):
+    @patch('app.db.fetch_records', return_value=[])
+    def test_get_all_zones_empty(self, mock_fetch):
         """Test zone retrieval with no data."""
-        df = pd.DataFrame()
-        mock_read_sql = Mock(return_value=df)
-        mock_engine.return_value.read_sql_query = mock_read_sql
-
         result = get_all_zones()
         assert result == []
 
+    @patch('app.db.fetch_records', side_effect=Exception("DB error"))
+    def test_get_all_zones_failure_is_none_and_not_cached(self, mock_fetch):
+        """A failed read is distinguishable from an empty table and is retried."""
+        assert get_all_zones() is None
+        assert get_all_zones() is None
+        assert mock_fetch.call_count == 2
+
+    @patch('app.db.fetch_records')
+    def test_get_all_zones_scores_vulnerability_in_sql(self, mock_fetch):
+        """Vulnerability weights become a bound-parameter SQL expression."""
+        mock_fetch.return_value = [{'zone_id': 'Z1', 'vulnerability': 0.5}]
+
+        result = get_all_zones({'river_proximity': 0.6, 'pop_density': 0.4})
+
+        query, params = mock_fetch.call_args.args
+        assert "%(w_river_proximity)s * river_proximity::float8 + %(w_pop_density)s * pop_density::float8" in query
+        assert "AS vulnerability" in query
+        assert params == {'w_river_proximity': 0.6, 'w_pop_density': 0.4}
+        assert result[0]['vulnerability'] == 0.5
+
+    def test_get_all_zones_rejects_unknown_weight_column(self):
+        """Only the zone score columns can be weighted."""
+        with pytest.raises(ValueError):
+            get_all_zones({'zone_id; DROP TABLE zones': 1.0})
+
     @patch('app.db.get_connection')
     def test_insert_zone_success(self, mock_get_conn):
         """Test successful zone insertion."""
@@ -237,32 +495,110 @@ class TestZoneOperations:
         mock_conn.commit.assert_called_once()
 
 
+    @patch('app.db.get_connection')
+    def test_insert_zone_failure_releases_connection(self, mock_get_conn):
+        """A failed insert still hands the pooled connection back."""
+        mock_conn = mock_get_conn.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.execute.side_effect = Exception("DB error")
+
+        zone = ZoneInsert(
+            zone_id="ZONE_001", name="Test Zone", river_proximity=0.8,
+            elevation_risk=0.4, pop_density=0.6, crit_infra_score=0.5
+        )
+
+        assert insert_zone(zone) is False
+        mock_conn.commit.assert_not_called()
+        mock_cursor.close.assert_called_once()
+        mock_conn.close.assert_called_once()
+
 class TestResourceTypeOperations:
     """Test resource type-related database operations."""
 
-    @patch('app.db.get_sqlalchemy_engine')
-    def test_get_all_resource_types_success(self, mock_engine):
+    @patch('app.db.get_connection')
+    def test_get_all_resource_types_success(self, mock_get_conn):
         """Test successful resource type retrieval."""
-        # Setup mock data
-        data = {
-            'resource_id': ['R1_UAV', 'R2_ENGINEERING'],
-            'name': ['UAV', 'Engineering'],
-            'description': ['Test UAV', 'Test Engineering'],
-            'icon': ['drone', 'engineering'],
-            'display_order': [1, 2],
-            'capacity': [5, 10],
-        }
-        df = pd.DataFrame(data)
-
-        # Setup mock
-        mock_read_sql = Mock(return_value=df)
-        mock_engine.return_value.read_sql_query = mock_read_sql
+        # Postgres returns the rows already aggregated into one json array
+        rows = [
+            {'resource_id': 'R1_UAV', 'name': 'UAV', 'description': 'Test UAV',
+             'icon': 'drone', 'display_order': 1, 'capacity': 5},
+            {'resource_id': 'R2_ENGINEERING', 'name': 'Engineering', 'description': 'Test Engineering',
+             'icon': 'engineering', 'display_order': 2, 'capacity': 10},
+        ]
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (rows,)
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_conn.return_value = mock_conn
 
         result = get_all_resource_types()
 
         assert len(result) == 2
         assert result[0]['resource_id'] == 'R1_UAV'
         assert result[0]['name'] == 'UAV'
+        assert 'json_agg' in mock_cursor.execute.call_args[0][0]
+        mock_conn.close.assert_called_once()
+
+    @patch('app.db.get_connection')
+    def test_get_all_resource_types_empty(self, mock_get_conn):
+        """An empty table yields an empty list."""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = ([],)
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_conn.return_value = mock_conn
+
+        assert get_all_resource_types() == []
+
+    @patch('app.db.get_connection')
+    def test_get_all_resource_types_failure_releases_connection(self, mock_get_conn):
+        """A failed read still closes the cursor and hands the connection back."""
+        mock_conn = mock_get_conn.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.execute.side_effect = Exception("DB error")
+
+        assert get_all_resource_types() == []
+        mock_cursor.close.assert_called_once()
+        mock_conn.close.assert_called_once()
+
+    @patch('app.db._fetch_all_resource_types')
+    def test_get_all_resource_types_cached_until_cleared(self, mock_fetch):
+        """Rows are served from the cache until a write clears it; callers get copies."""
+        from app.db import clear_metadata_cache
+        mock_fetch.return_value = [{'resource_id': 'R1_UAV', 'capacity': 5}]
+
+        first = get_all_resource_types()
+        first[0]['capacity'] = 99
+        assert get_all_resource_types() == [{'resource_id': 'R1_UAV', 'capacity': 5}]
+        assert mock_fetch.call_count == 1
+
+        clear_metadata_cache()
+        get_all_resource_types()
+        assert mock_fetch.call_count == 2
+
+    @patch('app.db._fetch_all_resource_types')
+    def test_get_all_resource_types_cache_expires(self, mock_fetch, time_travel):
+        """Cached rows are reloaded once METADATA_CACHE_TTL has elapsed."""
+        from app.db import METADATA_CACHE_TTL
+        mock_fetch.return_value = [{'resource_id': 'R1_UAV', 'capacity': 5}]
+
+        get_all_resource_types()
+        time_travel.shift(timedelta(seconds=METADATA_CACHE_TTL - 1))
+        get_all_resource_types()
+        assert mock_fetch.call_count == 1
+
+        time_travel.shift(timedelta(seconds=1))
+        get_all_resource_types()
+        assert mock_fetch.call_count == 2
+
+    @patch('app.db._fetch_all_resource_types')
+    def test_get_all_resource_types_empty_not_cached(self, mock_fetch):
+        """An empty (or failed) read is retried on the next call."""
+        mock_fetch.return_value = []
+
+        get_all_resource_types()
+        get_all_resource_types()
+        assert mock_fetch.call_count == 2
 
     @patch('app.db.get_connection')
     def test_insert_resource_type_success(self, mock_get_conn):
@@ -324,12 +660,14 @@ class TestBatchOperations:
         ]
 
         # Test
-        result = insert_raw_data_batch(records)
+        with patch('app.db.clear_raw_data_cache') as mock_clear:
+            result = insert_raw_data_batch(records)
 
         # Verify
         assert result == 3
         mock_cursor.executemany.assert_called_once()
         mock_conn.commit.assert_called_once()
+        mock_clear.assert_called_once()
 
     def test_insert_raw_data_batch_empty(self):
         """Test batch insertion with empty records."""
@@ -337,6 +675,58 @@ class TestBatchOperations:
         assert result == 0
 
 
+class TestThresholdOperations:
+    """Test threshold configuration writes."""
+
+    @pytest.mark.parametrize('inserted, expected', [(True, 'created'), (False, 'updated')])
+    @patch('app.db.get_connection')
+    def test_upsert_threshold_config(self, mock_get_conn, inserted, expected):
+        """Create-or-update is a single statement reporting which one happened."""
+        from app.db import upsert_threshold_config
+        from app.schemas import ThresholdConfig
+        mock_cursor = mock_get_conn.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (inserted,)
+
+        result = upsert_threshold_config(ThresholdConfig(), 'default', 'administrator')
+
+        assert result == expected
+        mock_cursor.execute.assert_called_once()
+        assert "ON CONFLICT (config_name) DO UPDATE" in mock_cursor.execute.call_args[0][0]
+        mock_get_conn.return_value.commit.assert_called_once()
+
+    @patch('app.db.get_connection', side_effect=Exception("DB error"))
+    def test_upsert_threshold_config_failure(self, mock_get_conn):
+        """Failures are reported as None."""
+        from app.db import upsert_threshold_config
+        from app.schemas import ThresholdConfig
+
+        assert upsert_threshold_config(ThresholdConfig()) is None
+
+    @patch('app.db.get_connection')
+    def test_upsert_threshold_config_failure_releases_connection(self, mock_get_conn):
+        """A failed statement still hands the connection back."""
+        from app.db import upsert_threshold_config
+        from app.schemas import ThresholdConfig
+        mock_conn = mock_get_conn.return_value
+        mock_conn.cursor.return_value.execute.side_effect = Exception("DB error")
+
+        assert upsert_threshold_config(ThresholdConfig()) is None
+        mock_conn.commit.assert_not_called()
+        mock_conn.close.assert_called_once()
+
+    @patch('app.db.create_threshold_config')
+    @patch('app.db.get_threshold_config')
+    def test_ensure_default_creates_missing_row(self, mock_get, mock_create):
+        """The startup bootstrap creates the default row when it is missing."""
+        mock_get.return_value = None
+        mock_create.return_value = True
+
+        config = ensure_default_threshold_config()
+
+        mock_create.assert_called_once()
+        assert config.flood_minor == 16.0
+
+
 class TestTypedOperations:
     """Test typed database operations with Pydantic models."""
 
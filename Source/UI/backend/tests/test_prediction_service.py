@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
 
 from app.prediction_service import (
     predict_next_days,
@@ -116,6 +117,145 @@ class TestPredictionHelpers:
         assert prediction.forecast is None
 
 
+class TestFloodProbability:
+    """Test the quantile-based flood probability estimate."""
+
+    @pytest.mark.parametrize("q10,q50,q90,threshold,expected", [
+        (20.0, 25.0, 30.0, 19.0, 0.95),
+        (20.0, 25.0, 30.0, 31.0, 0.05),
+        (20.0, 25.0, 30.0, 25.0, 0.5),
+        (20.0, 25.0, 30.0, 22.5, 0.7),
+        (20.0, 25.0, 30.0, 27.5, 0.3),
+        # Crossed quantiles are ordered before interpolating
+        (20.0, 32.0, 30.0, 25.0, 0.5),
+    ])
+    def test_interpolates_between_quantiles(self, q10, q50, q90, threshold, expected):
+        from app.prediction.inference_api import FloodPredictorV2
+
+        prob = FloodPredictorV2._calculate_flood_probability(None, q10, q50, q90, threshold)
+        assert prob == pytest.approx(expected)
+
+    def test_prob_below_matches_np_interp(self):
+        from app.prediction.inference_api import _prob_below
+
+        rng = np.random.default_rng(0)
+        for q10, q50, q90, threshold in rng.uniform(10.0, 40.0, size=(200, 4)):
+            levels = np.array([q10, q50, q90])
+            order = np.argsort(levels, kind='stable')
+            expected = np.interp(threshold, levels[order], np.array([0.1, 0.5, 0.9])[order])
+            assert _prob_below(q10, q50, q90, threshold) == pytest.approx(expected)
+
+
+class TestCompiledKernels:
+    """
+    Run the numba-compiled kernels on the inputs their call sites build.
+
+    The kernels are compiled against explicit signatures, so an input whose
+    dtype or layout drifts from them fails dispatch only when numba is
+    installed; each compiled result is checked against the pure-Python body.
+    """
+
+    @pytest.fixture(autouse=True)
+    def _require_numba(self):
+        from app.numba_compat import HAS_NUMBA
+        if not HAS_NUMBA:
+            pytest.skip("numba not installed")
+
+    def test_window_stats_on_feature_engineer_columns(self, sample_raw_data):
+        import app.prediction.feature_engineer as fe_module
+        from app.prediction.feature_engineer import FeatureEngineer
+
+        # Missing readings arrive as None/NaN in object or float columns
+        sample_raw_data['daily_precip'] = sample_raw_data['daily_precip'].astype(object)
+        sample_raw_data.loc[3, 'daily_precip'] = None
+        sample_raw_data.loc[5, 'soil_deep_30d'] = np.nan
+
+        engineer = FeatureEngineer.__new__(FeatureEngineer)
+        engineer.feature_order = [
+            'precip_7d', 'precip_30d', 'soil_deep_30d', 'precip_14d_lag3d',
+            'soil_deep_30d_lag10d', 'hermann_ma3d', 'grafton_ma14d',
+        ]
+        compiled = engineer.create_features(sample_raw_data)
+        with patch.object(fe_module, '_window_stats', fe_module._window_stats.py_func):
+            interpreted = engineer.create_features(sample_raw_data)
+
+        pd.testing.assert_frame_equal(compiled, interpreted)
+
+    def test_prob_below_on_ensemble_quantiles(self):
+        import app.prediction.inference_api as api_module
+        from app.prediction.inference_api import FloodPredictorV2
+
+        predictor = FloodPredictorV2.__new__(FloodPredictorV2)
+        predictor.flood_threshold = 30.0
+        # The ensemble reduces float32 model outputs to Python floats
+        q10, q50, q90 = (float(q) for q in np.array([27.5, 29.25, 33.0], dtype=np.float32))
+
+        compiled = predictor._calculate_flood_probability(q10, q50, q90, predictor.flood_threshold)
+        with patch.object(api_module, '_prob_below', api_module._prob_below.py_func):
+            interpreted = predictor._calculate_flood_probability(q10, q50, q90, predictor.flood_threshold)
+
+        assert compiled == pytest.approx(interpreted)
+
+    def test_fuzzy_kernels_on_allocation_inputs(self, sample_zone_data):
+        import app.rule_based.allocations as alloc_module
+        from app.rule_based.allocations import allocate_resources, recommend_resources_fuzzy
+        from app.rule_based.zones import zones_for_global_pf
+
+        interpreted_kernels = {
+            name: getattr(alloc_module, name).py_func
+            for name in ('_tri_mf', '_fuzzy_fraction', '_fuzzy_fractions')
+        }
+        # Zones as the dispatch endpoint builds them, from no risk to certain flooding
+        for global_pf in (0.0, 0.3, 0.55, 0.8, 1.0):
+            _, zones = zones_for_global_pf(sample_zone_data, global_pf)
+            # allocate_resources hands the kernel these arrays
+            iz = np.array([z.pf * z.vulnerability for z in zones], dtype=np.float64)
+            critical_infra = np.array([z.is_critical_infra for z in zones], dtype=bool)
+
+            compiled = (
+                alloc_module._fuzzy_fractions(iz, critical_infra),
+                allocate_resources(zones, 50, mode="fuzzy"),
+                [recommend_resources_fuzzy(zone, 50) for zone in zones],
+            )
+            with patch.multiple(alloc_module, **interpreted_kernels):
+                interpreted = (
+                    alloc_module._fuzzy_fractions(iz, critical_infra),
+                    allocate_resources(zones, 50, mode="fuzzy"),
+                    [recommend_resources_fuzzy(zone, 50) for zone in zones],
+                )
+
+            np.testing.assert_allclose(compiled[0], interpreted[0])
+            assert compiled[1:] == interpreted[1:]
+
+        # Every membership breakpoint, and the critical-infra bonus above 0.8
+        iz = np.linspace(0.0, 1.0, 101)
+        critical_infra = np.arange(101) % 2 == 0
+        with patch.multiple(alloc_module, **interpreted_kernels):
+            expected = alloc_module._fuzzy_fractions(iz, critical_infra)
+        np.testing.assert_allclose(alloc_module._fuzzy_fractions(iz, critical_infra), expected)
+        for x in (0.0, 0.2, 0.3, 0.45, 0.6, 0.7, 0.9, 1.0):
+            assert alloc_module._tri_mf(x, 0.2, 0.45, 0.7) == pytest.approx(
+                interpreted_kernels['_tri_mf'](x, 0.2, 0.45, 0.7))
+            assert alloc_module._fuzzy_fraction(x, True) == pytest.approx(
+                interpreted_kernels['_fuzzy_fraction'](x, True))
+
+
+class TestSummaryStats:
+    """Test the backfill summary reduction."""
+
+    def test_summary_stats_skips_missing(self):
+        from app.prediction_service import _summary_stats
+
+        stats = _summary_stats([12.0, None, 10.0, 14.0, 11.0])
+
+        assert stats == {"min": 10.0, "max": 14.0, "mean": 11.75, "median": 11.5}
+
+    def test_summary_stats_empty(self):
+        from app.prediction_service import _summary_stats
+
+        assert _summary_stats([None, None]) == {"min": None, "max": None, "mean": None, "median": None}
+
+
 class TestNaiveFallbackPrediction:
     """Test naive fallback prediction functionality."""
 
@@ -250,6 +390,49 @@ class TestPredictNextDays:
             mock_naive.assert_called_once()
 
 
+    @patch('app.prediction_service.insert_predictions')
+    @patch('app.prediction_service._missing_model_files')
+    @patch('app.prediction_service.FloodPredictorV2')
+    @patch('app.prediction_service.get_prediction')
+    def test_predict_next_days_reuses_predictor(self, mock_get_pred, mock_predictor, mock_missing, mock_insert, sample_raw_data):
+        """Models for a lead time should be loaded once and reused across calls."""
+        mock_missing.return_value = []
+        mock_get_pred.return_value = None
+        mock_predictor.return_value.predict_from_raw_data.return_value = {
+            'forecast': {'median': 13.2},
+            'prediction_interval_80pct': {'lower': 12.8, 'upper': 13.6, 'width': 0.8},
+            'conformal_interval_80pct': None,
+            'flood_risk': {'probability': 0.1, 'threshold_ft': 30.0}
+        }
+
+        predict_next_days(sample_raw_data, [1])
+        predict_next_days(sample_raw_data, [1])
+
+        assert mock_predictor.call_count == 1
+        assert mock_predictor.return_value.predict_from_raw_data.call_count == 2
+
+
+    @patch('app.prediction_service.insert_predictions')
+    @patch('app.prediction_service._missing_model_files', return_value=[])
+    @patch('app.prediction_service.FloodPredictorV2')
+    @patch('app.prediction_service.get_prediction', return_value=None)
+    def test_predict_next_days_caches_in_one_batch(self, mock_get_pred, mock_predictor, mock_missing,
+                                                   mock_insert, sample_raw_data):
+        """Fresh predictions for every lead time are written back with one insert."""
+        mock_predictor.return_value.predict_from_raw_data.return_value = {
+            'forecast': {'median': 13.2},
+            'prediction_interval_80pct': {'lower': 12.8, 'upper': 13.6, 'width': 0.8},
+            'conformal_interval_80pct': None,
+            'flood_risk': {'probability': 0.1, 'threshold_ft': 30.0}
+        }
+
+        predict_next_days(sample_raw_data, [1, 2, 3])
+
+        mock_insert.assert_called_once()
+        records = mock_insert.call_args.args[0]
+        assert [record.days_ahead for record in records] == [1, 2, 3]
+
+
 class TestPredictAllHistorical:
     """Test predict_all_historical functionality."""
 
@@ -353,6 +536,67 @@ class TestPredictAllHistorical:
         assert len(progress_calls) > 0
         assert 'percent' in progress_calls[0]
 
+    @patch('app.prediction_service.predict_next_days')
+    @patch('app.db.get_prediction')
+    @patch('app.db.get_cached_prediction_keys')
+    @patch('app.db.get_all_raw_data')
+    def test_predict_all_historical_prefetches_cached_keys(
+        self, mock_get_all, mock_cached_keys, mock_get_pred, mock_predict
+    ):
+        """Cached windows are skipped from one key prefetch, not per-row lookups."""
+        dates = pd.date_range('2025-01-01', periods=31, freq='D')
+        mock_get_all.return_value = pd.DataFrame(
+            [{'date': date, 'target_level_max': 10.0} for date in dates]
+        )
+        # Windows end on 01-30 and 01-31; only the first forecast is cached
+        mock_cached_keys.return_value = {('2025-01-31', 1)}
+        mock_predict.return_value = [Prediction(
+            lead_time_days=1,
+            forecast_date='2025-02-01',
+            forecast=Forecast(median=13.2),
+            flood_risk=FloodRisk(probability=0.1)
+        )]
+
+        result = predict_all_historical(lead_times=[1], skip_cached=True)
+
+        mock_cached_keys.assert_called_once_with([1])
+        mock_get_pred.assert_not_called()
+        assert result['skipped_cached'] == 1
+        assert result['total_predictions'] == 1
+
+    @patch('app.prediction_service.insert_predictions')
+    @patch('app.prediction_service.predict_next_days')
+    @patch('app.db.get_cached_prediction_keys')
+    @patch('app.db.get_all_raw_data')
+    def test_predict_all_historical_writes_back_in_pages(
+        self, mock_get_all, mock_cached_keys, mock_predict, mock_insert
+    ):
+        """Windows queue their predictions and the backfill writes them in pages."""
+        dates = pd.date_range('2025-01-01', periods=33, freq='D')
+        mock_get_all.return_value = pd.DataFrame(
+            [{'date': date, 'target_level_max': 10.0} for date in dates]
+        )
+
+        def fake_predict(window_data, lead_times, cache_sink):
+            cache_sink.append(PredictionInsert(
+                forecast_date='2025-02-01', predicted_level=13.2,
+                flood_probability=0.1, days_ahead=lead_times[0],
+            ))
+            return [Prediction(
+                lead_time_days=lead_times[0],
+                forecast_date='2025-02-01',
+                forecast=Forecast(median=13.2),
+                flood_risk=FloodRisk(probability=0.1)
+            )]
+        mock_predict.side_effect = fake_predict
+
+        with patch('app.prediction_service.HISTORICAL_CACHE_PAGE_SIZE', 3):
+            result = predict_all_historical(lead_times=[1, 2], skip_cached=False)
+
+        # 4 windows x 2 lead times: two full pages, nothing written per window
+        assert result['total_predictions'] == 8
+        assert [len(call.args[0]) for call in mock_insert.call_args_list] == [3, 3, 2]
+
     @patch('app.prediction_service.get_all_raw_data')
     def test_predict_all_historical_cancel_check(self, mock_get_all):
         """Test historical prediction with cancellation."""
@@ -374,7 +618,7 @@ class TestPredictAllHistorical:
 class TestPredictionIntegration:
     """Integration tests for prediction service."""
 
-    @patch('app.prediction_service.insert_prediction')
+    @patch('app.prediction_service.insert_predictions')
     def test_prediction_caching_integration(self, mock_insert):
         """Test that predictions are properly cached."""
         # This would require more complex setup with actual database integration
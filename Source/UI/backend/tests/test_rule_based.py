@@ -8,6 +8,7 @@ import numpy as np
 from app.rule_based.zones import (
     compute_vulnerability,
     compute_pf_by_zone_from_global,
+    zones_for_global_pf,
     build_zones_from_data,
     _ensure_float,
 )
@@ -16,6 +17,7 @@ from app.rule_based.allocations import (
     recommend_resources_crisp,
     recommend_resources_fuzzy,
     classify_impact,
+    classify_impacts,
     _crisp_fraction,
     _fuzzy_fraction,
     resource_priority_list,
@@ -28,6 +30,16 @@ from app.rule_based.allocations import (
 )
 from app.schemas import Zone, AllocationMode, ImpactLevel
 
+_RESOURCE_TYPE_KEYS = frozenset(RESOURCE_TYPES)
+_DISPATCH_FIELDS = frozenset({
+    "zone_id", "zone_name", "impact_level", "allocation_mode", "units_allocated",
+})
+_OPTIMIZED_FIELDS = frozenset({"satisfaction_level", "fairness_level"})
+_PRIORITY_LIST_FIELDS = frozenset({
+    "zone_id", "zone_name", "priority_index", "resource_scores", "resource_priority",
+})
+_RESOURCE_ALLOCATION_FIELDS = frozenset({"resource_units", "resource_priority"})
+
 
 class TestZoneHelpers:
     """Test zone helper functions."""
@@ -85,6 +97,43 @@ class TestZoneHelpers:
 
         assert pf_by_zone["ZONE_001"] == 0.25  # Base weight
 
+    def test_compute_pf_by_zone_from_global_matches_scalar_formula(self):
+        """Vectorized pf matches the per-row formula; rows without an id are skipped."""
+        rows = [
+            {"zone_id": "Z1", "river_proximity": 0.8},
+            {"zone_id": "Z2", "river_proximity": None},
+            {"zone_id": None, "river_proximity": 0.4},
+            {"zone_id": "Z3", "river_proximity": "0.2"},
+        ]
+        pf_by_zone = compute_pf_by_zone_from_global(rows, 0.9)
+
+        assert set(pf_by_zone) == {"Z1", "Z2", "Z3"}
+        assert pf_by_zone["Z1"] == pytest.approx(0.9)
+        assert pf_by_zone["Z2"] == pytest.approx(0.45)
+        assert pf_by_zone["Z3"] == pytest.approx(0.9 * (0.5 + 0.5 * 0.25))
+        assert all(isinstance(pf, float) for pf in pf_by_zone.values())
+
+    def test_zones_for_global_pf_memoized(self):
+        """Repeated rows and pf reuse the built zones; a new pf rebuilds them."""
+        rows = [
+            {"zone_id": "Z1", "name": "One", "river_proximity": 0.9, "elevation_risk": 0.5,
+             "pop_density": 0.4, "crit_infra_score": 0.3, "hospital_count": 1, "critical_infra": True},
+            {"zone_id": "Z2", "name": "Two", "river_proximity": 0.3, "elevation_risk": 0.2,
+             "pop_density": 0.6, "crit_infra_score": 0.1, "hospital_count": 0, "critical_infra": False},
+        ]
+        pf_by_zone, zones = zones_for_global_pf(rows, 0.4)
+
+        assert pf_by_zone == compute_pf_by_zone_from_global(rows, 0.4)
+        assert [z.pf for z in zones] == [pf_by_zone["Z1"], pf_by_zone["Z2"]]
+
+        again_pf, again_zones = zones_for_global_pf([dict(r) for r in rows], 0.4)
+        assert again_pf == pf_by_zone and again_pf is not pf_by_zone
+        assert again_zones[0] is zones[0]
+
+        _, other = zones_for_global_pf(rows, 0.8)
+        assert other[0] is not zones[0]
+        assert other[0].pf == pytest.approx(0.8)
+
     def test_build_zones_from_data(self, sample_zone_data):
         """Test building Zone objects from data."""
         pf_by_zone = {"ZONE_001": 0.6, "ZONE_002": 0.4, "ZONE_003": 0.2}
@@ -97,6 +146,14 @@ class TestZoneHelpers:
         assert zones[0].vulnerability > 0
         assert zones[0].is_critical_infra is True  # Has hospitals
 
+    def test_build_zones_uses_precomputed_vulnerability(self, sample_zone_data):
+        """A vulnerability scored in SQL is used as-is; rows without one are scored here."""
+        rows = [dict(sample_zone_data[0], vulnerability=0.42), sample_zone_data[1]]
+        zones = build_zones_from_data(rows, {})
+
+        assert zones[0].vulnerability == 0.42
+        assert zones[1].vulnerability == pytest.approx(compute_vulnerability(sample_zone_data[1]))
+
 
 class TestImpactClassification:
     """Test impact level classification."""
@@ -119,6 +176,16 @@ class TestImpactClassification:
         impact = classify_impact(0.9, 0.9)  # iz = 0.81
         assert impact == ImpactLevel.CRITICAL
 
+    def test_classify_impacts_matches_scalar(self):
+        """Vectorized classification agrees with classify_impact, including at the bin edges."""
+        pairs = [(0.1, 0.1), (1.0, 0.3), (0.5, 0.9), (1.0, 0.6), (0.7, 1.0), (0.9, 0.9), (1.0, 1.0)]
+        zones = [Mock(id=f"Z{i}", pf=pf, vulnerability=v) for i, (pf, v) in enumerate(pairs)]
+
+        impacts = classify_impacts(zones)
+
+        assert impacts == {z.id: classify_impact(z.pf, z.vulnerability) for z in zones}
+        assert classify_impacts([]) == {}
+
     def test_crisp_fraction(self):
         """Test crisp fraction computation."""
         # Test NORMAL impact
@@ -156,6 +223,15 @@ class TestImpactClassification:
         fraction_critical = _fuzzy_fraction(0.85, True)
         assert fraction_critical > fraction_regular
 
+    def test_fuzzy_fractions_matches_scalar(self):
+        """The batch kernel agrees with _fuzzy_fraction zone by zone."""
+        from app.rule_based.allocations import _fuzzy_fractions
+        iz = np.array([0.0, 0.2, 0.45, 0.7, 0.85, 1.0])
+        critical = np.array([False, True, False, True, True, False])
+
+        expected = [_fuzzy_fraction(float(i), bool(c)) for i, c in zip(iz, critical)]
+        assert _fuzzy_fractions(iz, critical).tolist() == pytest.approx(expected)
+
 
 class TestResourceAllocation:
     """Test resource allocation functions."""
@@ -241,6 +317,45 @@ class TestResourceAllocation:
         total_allocated = sum(a["units_allocated"] for a in allocations)
         assert total_allocated <= total_units
 
+    @staticmethod
+    def _zones(specs):
+        return [
+            Zone(id=f"Z{i}", name=f"Zone {i}", pf=pf, vulnerability=1.0,
+                 is_critical_infra=crit, hospital_count=0, river_proximity=0.5,
+                 elevation_risk=0.5, pop_density=0.5, crit_infra_score=0.5)
+            for i, (pf, crit) in enumerate(specs)
+        ]
+
+    @pytest.mark.parametrize("mode,recommend", [
+        ("crisp", recommend_resources_crisp),
+        ("fuzzy", recommend_resources_fuzzy),
+    ])
+    def test_allocate_resources_matches_per_zone_rules(self, mode, recommend):
+        """Vectorized allocation keeps each zone's scalar recommendation when none is scaled."""
+        # At 10 units these zones request exactly 10, so nothing is rescaled
+        zones = self._zones([(0.1, False), (0.45, False), (0.65, True), (0.95, True)])
+        expected = [recommend(z, 10) for z in zones]
+
+        assert allocate_resources(zones, 10, mode=mode) == expected
+
+    def test_allocate_resources_vectorized_levels(self):
+        """Impact levels and minimum-unit floors follow the scalar thresholds."""
+        zones = self._zones([(0.1, False), (0.3, False), (0.65, False), (0.9, True)])
+        allocations = allocate_resources(zones, 4, mode="crisp")
+
+        assert [a["impact_level"] for a in allocations] == [
+            classify_impact(z.pf, z.vulnerability) for z in zones
+        ]
+        assert [a["units_allocated"] for a in allocations] == [0, 1, 1, 2]
+        assert all(isinstance(a["units_allocated"], int) for a in allocations)
+
+    def test_allocate_resources_rebalances_highest_impact_first(self):
+        """Leftover units go to the highest-impact zones, ties in input order."""
+        zones = self._zones([(0.4, False), (0.9, False), (0.4, False)])
+        allocations = allocate_resources(zones, 5, mode="proportional", max_units_per_zone=2)
+
+        assert [a["units_allocated"] for a in allocations] == [2, 2, 1]
+
     def test_allocate_resources_invalid_mode(self, sample_zones):
         """Test resource allocation with invalid mode."""
         with pytest.raises(ValueError):
@@ -266,11 +381,7 @@ class TestResourcePriority:
         zone = sample_zones[0]
         priority_list = resource_priority_list(zone)
 
-        assert "zone_id" in priority_list
-        assert "zone_name" in priority_list
-        assert "priority_index" in priority_list
-        assert "resource_scores" in priority_list
-        assert "resource_priority" in priority_list
+        assert _PRIORITY_LIST_FIELDS.issubset(priority_list), _PRIORITY_LIST_FIELDS - priority_list.keys()
 
         assert priority_list["zone_id"] == zone.id
         assert 0.0 <= priority_list["priority_index"] <= 1.0
@@ -284,10 +395,8 @@ class TestResourcePriority:
         scores = fuzzy_resource_scores(zone)
 
         assert isinstance(scores, dict)
-        for resource_type in RESOURCE_TYPES:
-            assert resource_type in scores
-            assert isinstance(scores[resource_type], float)
-            assert scores[resource_type] >= 0.0
+        assert _RESOURCE_TYPE_KEYS.issubset(scores), _RESOURCE_TYPE_KEYS - scores.keys()
+        assert all(isinstance(scores[rt], float) and scores[rt] >= 0.0 for rt in RESOURCE_TYPES)
 
     def test_old_rule_based_resource_scores(self, sample_zones):
         """Test old rule-based resource scoring."""
@@ -299,9 +408,8 @@ class TestResourcePriority:
         scores = old_rule_based_resource_scores(zone)
 
         assert isinstance(scores, dict)
-        for resource_type in RESOURCE_TYPES:
-            assert resource_type in scores
-            assert isinstance(scores[resource_type], (int, float))
+        assert _RESOURCE_TYPE_KEYS.issubset(scores), _RESOURCE_TYPE_KEYS - scores.keys()
+        assert all(isinstance(scores[rt], (int, float)) for rt in RESOURCE_TYPES)
 
         # High PF and vulnerability should trigger some resource allocation
         assert scores["R4_RESCUE"] > 0
@@ -333,12 +441,8 @@ class TestDispatchPlan:
         assert total_allocated <= total_units
 
         # Check structure of dispatch plan
-        for allocation in dispatch_plan:
-            assert "zone_id" in allocation
-            assert "zone_name" in allocation
-            assert "impact_level" in allocation
-            assert "allocation_mode" in allocation
-            assert "units_allocated" in allocation
+        missing = [_DISPATCH_FIELDS - allocation.keys() for allocation in dispatch_plan]
+        assert not any(missing), missing
 
     @patch('app.rule_based.allocations.optimize_fair_allocation')
     def test_build_dispatch_plan_optimized(self, mock_optimize, sample_zones, sample_resource_types):
@@ -368,10 +472,10 @@ class TestDispatchPlan:
         mock_optimize.assert_called_once()
 
         # Check optimized allocation structure
-        for allocation in dispatch_plan:
-            assert allocation["allocation_mode"] == "OPTIMIZED"
-            assert "satisfaction_level" in allocation
-            assert "fairness_level" in allocation
+        modes = {allocation["allocation_mode"] for allocation in dispatch_plan}
+        assert modes == {"OPTIMIZED"}, modes
+        missing = [_OPTIMIZED_FIELDS - allocation.keys() for allocation in dispatch_plan]
+        assert not any(missing), missing
 
     @patch('app.rule_based.allocations.optimize_fair_allocation')
     def test_build_dispatch_plan_optimizer_fallback(self, mock_optimize, sample_zones, sample_resource_types):
@@ -393,6 +497,23 @@ class TestDispatchPlan:
         # First allocation should indicate fallback occurred
         # (This depends on implementation details)
 
+    @patch('app.rule_based.allocations.allocate_resources')
+    def test_heuristic_dispatch_round_robins_units(self, mock_allocate):
+        """Units cycle through the priority list, earlier resources taking the remainder."""
+        from app.rule_based.allocations import _build_heuristic_dispatch
+        mock_allocate.return_value = [{"zone_id": "Z1", "units_allocated": 7}]
+        priorities = {"Z1": {
+            "priority_index": 0.5,
+            "resource_priority": ["R4_RESCUE", "R1_UAV", "R5_EVAC"],
+            "resource_scores": {},
+        }}
+
+        dispatch = _build_heuristic_dispatch([], 7, "fuzzy", None, priorities)
+
+        units = dispatch[0]["resource_units"]
+        assert (units["R4_RESCUE"], units["R1_UAV"], units["R5_EVAC"]) == (3, 2, 2)
+        assert sum(units.values()) == 7
+
     def test_dispatch_plan_resource_aggregation(self, sample_zones):
         """Test resource aggregation in dispatch plan."""
         total_units = 30
@@ -403,8 +524,7 @@ class TestDispatchPlan:
         # Check that resource units are properly distributed
         for allocation in dispatch_plan:
             if allocation["units_allocated"] > 0:
-                assert "resource_units" in allocation
-                assert "resource_priority" in allocation
+                assert _RESOURCE_ALLOCATION_FIELDS.issubset(allocation), allocation.keys()
 
                 # Should have resource allocations
                 total_resource_units = sum(allocation["resource_units"].values())
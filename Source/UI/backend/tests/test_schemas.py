@@ -50,17 +50,13 @@ class TestZoneSchema:
         assert zone.hospital_count == 2
         assert zone.critical_infra is True
 
-    def test_invalid_zone_river_proximity(self, sample_zone_data):
-        """Test Zone with invalid river_proximity (> 1.0)."""
-        zone_data = sample_zone_data[0].copy()
-        zone_data['river_proximity'] = 1.5
-        with pytest.raises(ValidationError):
-            Zone(**zone_data)
-
-    def test_invalid_zone_negative_values(self, sample_zone_data):
-        """Test Zone with negative values."""
-        zone_data = sample_zone_data[0].copy()
-        zone_data['hospital_count'] = -1
+    @pytest.mark.parametrize("field, value", [
+        ("river_proximity", 1.5),  # above 1.0
+        ("hospital_count", -1),
+    ])
+    def test_invalid_zone_field(self, sample_zone_data, field, value):
+        """Test Zone rejects an out-of-range field."""
+        zone_data = {**sample_zone_data[0], field: value}
         with pytest.raises(ValidationError):
             Zone(**zone_data)
 
@@ -77,17 +73,13 @@ class TestResourceTypeSchema:
         assert resource.display_order == 1
         assert resource.capacity == 5
 
-    def test_invalid_resource_capacity(self, sample_resource_types):
-        """Test ResourceType with negative capacity."""
-        resource_data = sample_resource_types[0].copy()
-        resource_data['capacity'] = -5
-        with pytest.raises(ValidationError):
-            ResourceType(**resource_data)
-
-    def test_invalid_display_order(self, sample_resource_types):
-        """Test ResourceType with negative display_order."""
-        resource_data = sample_resource_types[0].copy()
-        resource_data['display_order'] = -1
+    @pytest.mark.parametrize("field, value", [
+        ("capacity", -5),
+        ("display_order", -1),
+    ])
+    def test_invalid_resource_type_field(self, sample_resource_types, field, value):
+        """Test ResourceType rejects a negative capacity or display_order."""
+        resource_data = {**sample_resource_types[0], field: value}
         with pytest.raises(ValidationError):
             ResourceType(**resource_data)
 
@@ -119,6 +111,13 @@ class TestPredictionSchemas:
         assert high_risk.risk_level == "HIGH"
         assert high_risk.risk_indicator == "🔴"
 
+    @pytest.mark.parametrize("probability,level", [
+        (0.0, "LOW"), (0.2999, "LOW"), (0.3, "MODERATE"), (0.6999, "MODERATE"), (0.7, "HIGH"), (1.0, "HIGH"),
+    ])
+    def test_flood_risk_band_boundaries(self, probability, level):
+        """Band thresholds are inclusive lower bounds."""
+        assert FloodRisk(probability=probability).risk_level == level
+
     def test_invalid_flood_risk_probability(self):
         """Test FloodRisk with invalid probability."""
         with pytest.raises(ValidationError):
@@ -228,17 +227,13 @@ class TestJobStatusSchema:
         assert job.total == 1000
         assert job.cancel_requested is False
 
-    def test_invalid_job_status_percent(self, sample_job_status):
-        """Test JobStatus with invalid percent (> 100)."""
-        job_data = sample_job_status.model_dump()
-        job_data['percent'] = 150.0
-        with pytest.raises(ValidationError):
-            JobStatus(**job_data)
-
-    def test_invalid_job_status_completed_negative(self, sample_job_status):
-        """Test JobStatus with negative completed count."""
-        job_data = sample_job_status.model_dump()
-        job_data['completed'] = -10
+    @pytest.mark.parametrize("field, value", [
+        ("percent", 150.0),  # above 100
+        ("completed", -10),
+    ])
+    def test_invalid_job_status_field(self, sample_job_status, field, value):
+        """Test JobStatus rejects an out-of-range percent or completed count."""
+        job_data = {**sample_job_status.model_dump(), field: value}
         with pytest.raises(ValidationError):
             JobStatus(**job_data)
 
@@ -312,6 +307,30 @@ class TestDatabaseModels:
                 days_ahead=1
             )
 
+    @pytest.mark.parametrize("value,valid", [
+        ("2025-12-11", True),
+        ("2025-1-5", True),
+        ("2024-02-29", True),
+        ("2025-02-29", False),
+        ("2025-13-01", False),
+        ("2025-12-11T00:00", False),
+        ("20251211", False),
+    ])
+    def test_prediction_insert_date_matches_strptime(self, value, valid):
+        """The precompiled date check accepts exactly what strptime did."""
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+            assert valid
+        except ValueError:
+            assert not valid
+
+        if valid:
+            pred = PredictionInsert(forecast_date=value, predicted_level=13.2, flood_probability=0.1)
+            assert pred.forecast_date == value
+        else:
+            with pytest.raises(ValidationError):
+                PredictionInsert(forecast_date=value, predicted_level=13.2, flood_probability=0.1)
+
     def test_invalid_prediction_insert_probability(self):
         """Test PredictionInsert with invalid probability."""
         with pytest.raises(ValidationError):
@@ -26,6 +26,17 @@ CREATE TABLE IF NOT EXISTS predictions (
     CONSTRAINT predictions_pkey PRIMARY KEY (date, days_ahead)
 );
 
+-- Latest prediction per horizon: top-1 by created_at is an index scan
+-- instead of a sort over every stored prediction. Carrying date makes the
+-- backfill's cached (date, days_ahead) prefetch an index-only scan.
+CREATE INDEX IF NOT EXISTS idx_predictions_days_ahead_created_at
+    ON predictions (days_ahead, created_at DESC) INCLUDE (date);
+
+-- Newest-first reads across all horizons (prediction history paging and the
+-- unfiltered latest prediction) walk this index instead of sorting the table
+CREATE INDEX IF NOT EXISTS idx_predictions_created_at
+    ON predictions (created_at DESC);
+
 -- Zone metadata
 CREATE TABLE IF NOT EXISTS zones (
     zone_id VARCHAR(4) PRIMARY KEY,
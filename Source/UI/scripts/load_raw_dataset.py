@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import argparse
 import csv
+import io
 import os
 from pathlib import Path
 from typing import Any, Dict
@@ -35,6 +36,7 @@ FEATURE_COLUMNS = [
     "grafton_level",
 ]
 MAX_MISSING_FEATURES = 2
+STAGE_COLUMNS = ["date", *FEATURE_COLUMNS]
 
 
 def load_rows(csv_path: Path):
@@ -48,12 +50,11 @@ def load_rows(csv_path: Path):
 
 
 def sanitize_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
-    missing = []
-    for feature in FEATURE_COLUMNS:
-        value = row.get(feature)
-        if value is None or (isinstance(value, str) and value.strip() == ""):
-            missing.append(feature)
-            row[feature] = 0
+    # DictReader yields str values (None for short rows), so a falsy or
+    # blank-after-strip value is missing; no per-value type checks needed
+    missing = [feature for feature in FEATURE_COLUMNS if not (row.get(feature) or "").strip()]
+    for feature in missing:
+        row[feature] = 0
     if missing:
         date = row.get("date", "<unknown date>")
         print(
@@ -67,33 +68,55 @@ def sanitize_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
     return row
 
 
-def upsert_rows(conn, rows):
-    sql = """
-    INSERT INTO raw_data (
-        date,
-        daily_precip,
-        daily_temp_avg,
-        daily_snowfall,
-        daily_humidity,
-        daily_wind,
-        soil_deep_30d,
-        target_level_max,
-        hermann_level,
-        grafton_level,
-        created_at
-    ) VALUES (
-        %(date)s,
-        %(daily_precip)s,
-        %(daily_temp_avg)s,
-        %(daily_snowfall)s,
-        %(daily_humidity)s,
-        %(daily_wind)s,
-        %(soil_deep_30d)s,
-        %(target_level_max)s,
-        %(hermann_level)s,
-        %(grafton_level)s,
-        NOW()
-    )
+class CsvRowStream(io.TextIOBase):
+    """Read-only text stream that renders rows as CSV lines on demand for COPY."""
+
+    def __init__(self, rows):
+        self.count = 0
+        self._lines = self._render(rows)
+        self._pending = ""
+
+    def _render(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in STAGE_COLUMNS])
+            self.count += 1
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._pending += line
+        if size < 0:
+            chunk, self._pending = self._pending, ""
+        else:
+            chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def upsert_rows(conn, rows) -> int:
+    """
+    Stream the rows through COPY into a temp staging table, then upsert them
+    in one statement. Returns the number of CSV rows loaded.
+    """
+    stream = CsvRowStream(rows)
+    columns = ", ".join(STAGE_COLUMNS)
+    # Later rows win for repeated dates, as with a row-by-row upsert (a single
+    # INSERT ... SELECT cannot update the same row twice); seq records the
+    # order rows arrived in.
+    sql = f"""
+    INSERT INTO raw_data ({columns}, created_at)
+    SELECT DISTINCT ON (date) {columns}, NOW()
+    FROM raw_data_stage
+    ORDER BY date, seq DESC
     ON CONFLICT (date) DO UPDATE SET
         daily_precip = EXCLUDED.daily_precip,
         daily_temp_avg = EXCLUDED.daily_temp_avg,
@@ -107,8 +130,14 @@ def upsert_rows(conn, rows):
         created_at = NOW();
     """
     with conn.cursor() as cur:
-        cur.executemany(sql, rows)
+        cur.execute(
+            "CREATE TEMP TABLE raw_data_stage (LIKE raw_data INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cur.execute("ALTER TABLE raw_data_stage ADD COLUMN seq BIGSERIAL")
+        cur.copy_expert(f"COPY raw_data_stage ({columns}) FROM STDIN WITH (FORMAT csv)", stream)
+        cur.execute(sql)
     conn.commit()
+    return stream.count
 
 
 def main() -> None:
@@ -134,12 +163,11 @@ def main() -> None:
     )
 
     try:
-        rows = list(load_rows(csv_path))
-        upsert_rows(conn, rows)
+        loaded = upsert_rows(conn, load_rows(csv_path))
     finally:
         conn.close()
 
-    print(f"Inserted/updated {len(rows)} rows into raw_data")
+    print(f"Inserted/updated {loaded} rows into raw_data")
 
 
 if __name__ == "__main__":
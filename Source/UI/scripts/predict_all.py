@@ -38,7 +38,9 @@ def main():
     skip_cached = args.skip_cached
 
     # update sys.path to import backend modules
-    sys.path.insert(0, os.path.join(REPO_ROOT, 'UI', 'backend'))
+    backend_dir = os.path.join(REPO_ROOT, 'UI', 'backend')
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
     try:
         from app import prediction_service
     except Exception as e: